@@ -2,44 +2,652 @@ import subprocess
 import sys
 import json
 import os
+import re
+import queue
+import shutil
+import socket
+import threading
+from collections import Counter
 from datetime import datetime, timedelta
+from urllib.parse import unquote
+
+from brvm_cache import is_table
+from brvm_driver import DRIVER_OPTIONS, DriverManager
+from brvm_files import write_json_atomic
+from brvm_metrics import RunMetrics
+
+# Packages nécessaires (nom pip -> nom du module importé)
+required_packages = {
+    "selenium": "selenium",
+    "beautifulsoup4": "bs4",
+    "pandas": "pandas",
+    "webdriver-manager": "webdriver_manager",
+    "requests": "requests",
+    "lxml": "lxml",
+}
 
 # Fonction pour installer les packages
 def install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
-# Installation automatique des packages
-required_packages = ["selenium", "beautifulsoup4", "pandas", "webdriver-manager"]
+def install_missing_packages():
+    """Installe les packages manquants (appel explicite, jamais à l'import du module)"""
+    for package, module in required_packages.items():
+        try:
+            __import__(module)
+        except ImportError:
+            install(package)
 
-for package in required_packages:
+# Modules lourds chargés au premier scraping : l'import de ce module reste instantané
+webdriver = By = WebDriverWait = Select = EC = TimeoutException = None
+lxml_html = np = pd = None
+
+def load_dependencies():
+    """Charge pandas, numpy et lxml à la première utilisation"""
+    global lxml_html, np, pd
+    if pd is not None:
+        return
     try:
-        __import__(package if package != "beautifulsoup4" else "bs4")
-    except ImportError:
-        install(package)
+        from lxml import html as lxml_html
+        import numpy as np
+        import pandas as pd
+    except ImportError as e:
+        raise ImportError(f"{e}. Installez les dépendances : pip install {' '.join(required_packages)}") from e
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
-import pandas as pd
+def load_selenium():
+    """Charge Selenium uniquement lorsqu'un navigateur est nécessaire"""
+    global webdriver, By, WebDriverWait, Select, EC, TimeoutException
+    if webdriver is not None:
+        return
+    try:
+        from selenium import webdriver
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait, Select
+        from selenium.webdriver.support import expected_conditions as EC
+    except ImportError as e:
+        raise ImportError(f"{e}. Installez les dépendances : pip install {' '.join(required_packages)}") from e
 
 sys.stdout.reconfigure(encoding='utf-8')
 
+BASE_URL = "https://www.sikafinance.com"
+ARTICLES_PATH = "/premium/articles"
+NO_DATA_MESSAGE = "Pas de données à ces dates là"
+
+# Session légère : ressources non essentielles et traceurs bloqués par le navigateur
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*googlesyndication.com*",
+    "*doubleclick.net*", "*adservice.google.*", "*facebook.net*", "*facebook.com/tr*",
+    "*connect.facebook.*", "*platform.twitter.com*", "*hotjar.com*", "*addthis.com*",
+]
+LEAN_BLOCKED_STYLESHEETS = ["*.css"]
+
+# Messages d'erreur Selenium indiquant une session de navigateur morte
+SESSION_LOST_MARKERS = (
+    'invalid session id', 'session deleted', 'chrome not reachable', 'disconnected',
+    'no such window', 'target window already closed', 'connection refused', 'max retries exceeded',
+)
+# Compteurs des métriques selon l'origine du navigateur (DriverManager.acquire)
+DRIVER_COUNTERS = {'warm': 'driver_reuses', 'started': 'driver_starts', 'recycled': 'driver_recycles'}
+
+# Colonnes conservées en texte, toutes les autres sont converties en nombres
+TEXT_COLUMNS = ('Date', 'ACTION')
+
+# Lit la table directement dans le navigateur : un seul aller-retour, sans page_source
+TABLE_SCRIPT = """
+var table = document.getElementById('tblhistos');
+if (!table) { return null; }
+return {
+    headers: Array.from(table.querySelectorAll('thead th'), function (th) { return th.textContent.trim(); }),
+    rows: Array.from(table.querySelectorAll('tbody tr'), function (tr) {
+        return Array.from(tr.querySelectorAll('td'), function (td) { return td.textContent; });
+    })
+};
+"""
+
+# Remplit les dates, clique sur le bouton et attend dans la page que le corps de
+# 'tblhistos' change ou que l'alerte "Pas de données" apparaisse. Le résultat
+# (état + cellules) revient en un seul aller-retour WebDriver.
+REFRESH_SCRIPT = """
+var dateFrom = arguments[0], dateTo = arguments[1], timeoutMs = arguments[2], noData = arguments[3];
+var done = arguments[arguments.length - 1];
+
+function tbody() {
+    var table = document.getElementById('tblhistos');
+    return table ? table.querySelector('tbody') : null;
+}
+function readTable() {
+    var table = document.getElementById('tblhistos');
+    if (!table) { return {headers: [], rows: []}; }
+    return {
+        headers: Array.from(table.querySelectorAll('thead th'), function (th) { return th.textContent.trim(); }),
+        rows: Array.from(table.querySelectorAll('tbody tr'), function (tr) {
+            return Array.from(tr.querySelectorAll('td'), function (td) { return td.textContent; });
+        })
+    };
+}
+function alertShown() {
+    var notif = document.querySelector('.notif_err');
+    var msg = document.getElementById('alertMsg');
+    return !!(notif && msg && getComputedStyle(notif).display !== 'none' && msg.textContent.indexOf(noData) >= 0);
+}
+
+// L'alerte de la fenêtre précédente est effacée : seule une nouvelle alerte compte
+var notif = document.querySelector('.notif_err');
+var msg = document.getElementById('alertMsg');
+if (notif) { notif.style.display = 'none'; }
+if (msg) { msg.textContent = ''; }
+
+var body = tbody();
+var before = body ? body.innerHTML : null;
+var finished = false, observer = null, timer = null;
+
+function finish(state) {
+    if (finished) { return; }
+    finished = true;
+    if (observer) { observer.disconnect(); }
+    clearTimeout(timer);
+    var result = readTable();
+    result.state = state;
+    done(result);
+}
+function check() {
+    if (alertShown()) { return finish('empty'); }
+    var current = tbody();
+    if (current && (current !== body || current.innerHTML !== before)) { finish('data'); }
+}
+
+observer = new MutationObserver(check);
+observer.observe(document.body, {childList: true, subtree: true, characterData: true, attributes: true, attributeFilter: ['style', 'class']});
+timer = setTimeout(function () { finish('timeout'); }, timeoutMs);
+
+document.getElementById('datefrom').value = dateFrom;
+document.getElementById('dateto').value = dateTo;
+document.getElementById('btnChange').click();
+"""
+
+# Changement d'action sur place (session légère) : 'pending' tant que l'ancienne vue
+# (marquée par window.__brvmView) est affichée ou que la nouvelle se charge, 'view' si la
+# page chargée est la vue HISTORIQUES de l'action demandée (option sélectionnée ou adresse
+# de la page), 'other' pour toute autre page
+SWITCH_STATE_SCRIPT = """
+var code = arguments[0], label = arguments[1];
+if (window.__brvmView === true || document.readyState !== 'complete') { return 'pending'; }
+var select = document.getElementById('dpShares');
+var option = select && select.selectedIndex >= 0 ? select.options[select.selectedIndex] : null;
+var shown = !!option && ((code && option.value === code) || option.text.trim() === label);
+var url = !!code && window.location.pathname.indexOf(code) >= 0;
+return document.getElementById('datefrom') && (shown || url) ? 'view' : 'other';
+"""
+
+TABLE_START_RE = re.compile(r'<table[^>]*\bid=["\']?tblhistos\b', re.I)
+
+def clean_histos_frame(data):
+    """
+    Nettoie les colonnes par opérations vectorisées : espaces (y compris insécables)
+    retirés, virgule décimale remplacée et conversion en types numériques.
+    Toutes les colonnes numériques sont traitées en un seul passage ;
+    une colonne qui ne se convertit pas entièrement reste en texte.
+    """
+    load_dependencies()
+    for column in TEXT_COLUMNS:
+        if column in data.columns:
+            data[column] = data[column].astype(str).str.strip()
+
+    numeric_columns = [column for column in data.columns if column not in TEXT_COLUMNS]
+    if not numeric_columns or data.empty:
+        return data
+
+    # Une seule série pour toutes les cellules numériques (colonne par colonne)
+    cells = pd.Series(data[numeric_columns].to_numpy(dtype=object).ravel(order='F')).astype(str)
+    cells = cells.str.replace('[\\s\xa0\u202f]', '', regex=True).str.replace(',', '.', regex=False)
+    numbers = pd.to_numeric(cells, errors='coerce').to_numpy()
+
+    shape = (len(data), len(numeric_columns))
+    texts = cells.to_numpy(dtype=object).reshape(shape, order='F')
+    numbers = numbers.reshape(shape, order='F')
+    for i, column in enumerate(numeric_columns):
+        column_numbers = numbers[:, i]
+        parsed = ~np.isnan(column_numbers)
+        if parsed.sum() != (texts[:, i] != '').sum():
+            data[column] = texts[:, i]
+        elif parsed.all() and not any('.' in text or 'e' in text.lower() for text in texts[:, i]):
+            data[column] = column_numbers.astype('int64')
+        else:
+            data[column] = column_numbers
+    return data
+
+def histos_frame(headers, rows):
+    """Construit le DataFrame d'une fenêtre à partir des textes des cellules"""
+    load_dependencies()
+    rows = [cells for cells in rows if len(cells) == len(headers)]
+    if not headers or not rows:
+        return pd.DataFrame(columns=headers or [])
+    return clean_histos_frame(pd.DataFrame(rows, columns=headers))
+
+def histos_fragment(html):
+    """Fragment HTML de la table 'tblhistos' d'un document ('' si elle est absente)"""
+    match = TABLE_START_RE.search(html)
+    if not match:
+        return ''
+    end = html.find('</table>', match.start())
+    return html[match.start():end + len('</table>') if end >= 0 else len(html)]
+
+def parse_histos_html(html):
+    """
+    Extrait la table 'tblhistos' d'un document HTML sous forme de DataFrame.
+    Seul le fragment HTML de la table est analysé (avec lxml).
+    """
+    load_dependencies()
+    fragment = histos_fragment(html)
+    if not fragment:
+        return pd.DataFrame()
+
+    table = lxml_html.fragment_fromstring(fragment)
+    headers = [th.text_content().strip() for th in table.iterfind('.//thead//th')]
+    rows = [
+        [td.text_content() for td in tr.iterfind('td')]
+        for tr in table.iterfind('.//tbody/tr')
+    ]
+    return histos_frame(headers, rows)
+
+def raw_frame(kind, payload):
+    """
+    DataFrame d'une fenêtre à partir de sa réponse brute (kind, payload) :
+    'html' (fragment de la table), 'cells' (en-têtes et cellules lus dans le
+    navigateur) ou 'empty' (pas de données, renvoie None).
+    """
+    if kind == 'empty':
+        return None
+    if kind == 'html':
+        return parse_histos_html(payload)
+    return histos_frame(payload['headers'], payload['rows'])
+
+def window_rows(data, date_from, date_to):
+    """
+    Lignes de data dont la date tombe dans la fenêtre [date_from, date_to] (AAAA-MM-JJ),
+    les autres sont écartées. Une table non vide sans aucune ligne dans la fenêtre lève
+    ValueError : le site a ignoré les dates demandées (paramètres ou formulaire changés)
+    et renvoyé une autre période, la fenêtre ne doit pas être marquée couverte.
+    """
+    if data is None or data.empty or 'Date' not in data.columns:
+        return data
+    days = pd.to_datetime(data['Date'], format='%d/%m/%Y', errors='coerce')
+    inside = days.between(pd.Timestamp(date_from), pd.Timestamp(date_to))
+    if not inside.any():
+        raise ValueError(f"{len(data)} lignes reçues, aucune entre {date_from} et {date_to} "
+                         f"(du {days.min():%Y-%m-%d} au {days.max():%Y-%m-%d}) : dates ignorées par le site")
+    if inside.all():
+        return data
+    return data[inside.to_numpy()].reset_index(drop=True)
+
+class ChunkJournal:
+    """
+    Journal en ajout seul des fenêtres scrapées : chaque fenêtre est écrite
+    une seule fois à la fin du fichier temporaire, sans réécriture complète.
+    Sans base locale, les fenêtres sont aussi réparties dans les partitions
+    par action de spool (brvm_output.PartitionSpool) pour la fusion finale.
+    Les doublons exacts sont rejetés à l'arrivée (brvm_output.RowIndex) :
+    records compte déjà les lignes distinctes pendant le run.
+    """
+    def __init__(self, path='stock_data_temp.csv', resume=False, spool=None):
+        load_dependencies()
+        from brvm_output import RowIndex
+        self.path = path
+        self.spool = spool
+        self.rows = RowIndex()
+        self._lock = threading.Lock()
+        self._header_written = False
+
+        # Reprise : les fenêtres d'un run interrompu restent dans le journal (voir replay)
+        self._resumed = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        if self._resumed:
+            self._header_written = True
+            self._file = open(path, 'a', encoding='utf-8-sig', newline='')
+        else:
+            self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+
+    @property
+    def records(self):
+        return self.rows.records
+
+    @property
+    def duplicates(self):
+        return self.rows.duplicates
+
+    def add_base(self, frame):
+        """Ajoute des données déjà sauvegardées (non réécrites dans le journal)"""
+        if self.spool is not None and not frame.empty:
+            frame = self.rows.filter(frame)
+            self.spool.append(frame)
+
+    def replay(self, chunksize=50000):
+        """Reverse dans les partitions les fenêtres d'un run interrompu, par blocs"""
+        if not self._resumed or self.spool is None:
+            return
+        self._file.flush()
+        for chunk in pd.read_csv(self.path, dtype=str, keep_default_na=False,
+                                 encoding='utf-8-sig', chunksize=chunksize):
+            self.spool.append(self.rows.filter(clean_histos_frame(chunk)))
+
+    def append(self, frame):
+        """
+        Ajoute une fenêtre au journal (un seul flush par fenêtre), sans ses doublons
+        exacts. Renvoie les lignes effectivement écrites.
+        """
+        if frame.empty:
+            return frame
+        with self._lock:
+            frame = self.rows.filter(frame)
+            if frame.empty:
+                return frame
+            frame.to_csv(self._file, header=not self._header_written, index=False)
+            self._file.flush()
+            self._header_written = True
+            if self.spool is not None:
+                self.spool.append(frame)
+        return frame
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self):
+        """Supprime le journal (et les partitions) une fois intégrés au fichier final"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        if self.spool is not None:
+            self.spool.discard()
+
+class CoverageIndex:
+    """
+    Index persistant des périodes déjà collectées, par action.
+    Les périodes sont stockées en intervalles de dates inclusifs et fusionnés.
+    """
+    def __init__(self, path='stock_data_coverage.json'):
+        self.path = path
+        self.spans = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.spans = {
+                    action: [(datetime.strptime(a, '%Y-%m-%d').date(), datetime.strptime(b, '%Y-%m-%d').date())
+                             for a, b in spans]
+                    for action, spans in json.load(f).items()
+                }
+
+    def save(self):
+        data = {
+            action: [[a.isoformat(), b.isoformat()] for a, b in spans]
+            for action, spans in self.spans.items()
+        }
+        write_json_atomic(self.path, data)
+
+    def clear(self):
+        with self._lock:
+            self.spans = {}
+            self.save()
+
+    def add(self, action, date_from, date_to, save=True):
+        """
+        Enregistre la période [date_from, date_to] comme collectée et sauvegarde l'index
+        (save=False pour regrouper plusieurs ajouts avant un seul save()).
+        """
+        if date_to < date_from:
+            return
+        with self._lock:
+            merged = []
+            for a, b in sorted(self.spans.get(action, []) + [(date_from, date_to)]):
+                if merged and a <= merged[-1][1] + timedelta(days=1):
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], b))
+                else:
+                    merged.append((a, b))
+            self.spans[action] = merged
+            if save:
+                self.save()
+
+    def missing(self, action, date_from, date_to):
+        """Renvoie les sous-périodes de [date_from, date_to] non encore collectées"""
+        gaps = []
+        current = date_from
+        for a, b in self.spans.get(action, []):
+            if b < current:
+                continue
+            if a > date_to:
+                break
+            if a > current:
+                gaps.append((current, a - timedelta(days=1)))
+            current = max(current, b + timedelta(days=1))
+        if current <= date_to:
+            gaps.append((current, date_to))
+        return gaps
+
+class AdaptiveWindows:
+    """
+    Taille de fenêtre apprise par action : elle grandit tant que le nombre de lignes
+    reste sous la limite de la page du site et se réduit dès qu'une table est tronquée.
+    """
+    # Remplissage visé, pour garder une marge sous la limite de la page
+    TARGET_FILL = 0.8
+
+    def __init__(self, path='stock_data_windows.json', initial_days=30, page_limit=100, min_days=1, max_days=365):
+        self.path = path
+        self.initial_days = initial_days
+        self.page_limit = page_limit
+        self.min_days = min_days
+        self.max_days = max_days
+        self.sizes = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.sizes = json.load(f)
+
+    def size(self, action):
+        """Nombre de jours ajoutés à la date de début pour la prochaine fenêtre"""
+        return self.sizes.get(action, self.initial_days)
+
+    def estimate(self, action, date_from, date_to):
+        """Nombre de fenêtres estimé pour couvrir la période avec la taille apprise"""
+        days = (date_to - date_from).days + 1
+        return max(1, -(-days // (self.size(action) + 1)))
+
+    def record(self, action, days, rows):
+        """
+        Ajuste la taille d'après le nombre de lignes reçues pour une fenêtre de days jours.
+        Renvoie True si la table a atteint la limite de la page (probablement tronquée).
+        """
+        truncated = rows >= self.page_limit
+        if truncated:
+            new_size = days // 2
+        elif rows == 0:
+            new_size = days * 2
+        else:
+            # Croissance proportionnelle à la densité observée, bornée à x2
+            new_size = min(int(days * self.page_limit * self.TARGET_FILL / rows), days * 2)
+        if not truncated and days < self.size(action):
+            # Fenêtre raccourcie par la fin de période : pas assez d'information pour réduire
+            new_size = max(new_size, self.size(action))
+        with self._lock:
+            self.sizes[action] = max(self.min_days, min(self.max_days, max(new_size, 1)))
+        return truncated
+
+    def save(self):
+        with self._lock:
+            write_json_atomic(self.path, self.sizes)
+
+class FailedWindows:
+    """
+    Registre des fenêtres en échec, reprises en fin de run. Le nombre de tentatives
+    est conservé par fenêtre ; les échecs définitifs sont sauvegardés dans path.
+    """
+    def __init__(self, path='stock_data_failed.json'):
+        self.path = path
+        self.entries = {}
+        self.attempts = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def record(self, option_index, action, date_from, date_to, error):
+        key = (action, date_from, date_to)
+        with self._lock:
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            self.entries[key] = {'option_index': option_index, 'error': str(error).strip().splitlines()[0][:200]
+                                 if str(error).strip() else type(error).__name__}
+
+    def take_all(self):
+        """Retire et renvoie les fenêtres en échec, triées par action puis par date"""
+        with self._lock:
+            entries = sorted(self.entries.items(), key=lambda item: (item[1]['option_index'], item[0][1]))
+            self.entries = {}
+        return [(info['option_index'], action, date_from, date_to) for (action, date_from, date_to), info in entries]
+
+    def report(self):
+        with self._lock:
+            return [
+                {'action': action, 'from': date_from.strftime('%Y-%m-%d'), 'to': date_to.strftime('%Y-%m-%d'),
+                 'attempts': self.attempts[(action, date_from, date_to)], 'error': info['error']}
+                for (action, date_from, date_to), info in sorted(self.entries.items(), key=lambda item: item[0])
+            ]
+
+    def save(self):
+        """Écrit les fenêtres irrécupérables (ou supprime le fichier s'il n'y en a plus)"""
+        report = self.report()
+        if not report:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            return report
+        write_json_atomic(self.path, report, indent=1)
+        return report
+
+class TickerUniverse:
+    """
+    Liste des actions (libellé -> code) mise en cache avec la date de son dernier
+    rafraîchissement. Tant qu'elle a moins de ttl_hours, un run n'a pas besoin de
+    parcourir la liste déroulante de la page principale.
+    """
+    def __init__(self, path='stock_data_tickers.json', ttl_hours=24):
+        self.path = path
+        self.ttl = timedelta(hours=ttl_hours)
+        self.codes = {}
+        self.refreshed_at = None
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                self.codes = {entry['name']: entry['code'] for entry in data['tickers']}
+                self.refreshed_at = datetime.fromisoformat(data['refreshed_at'])
+            except (OSError, ValueError, KeyError, TypeError):
+                # Cache illisible : la liste sera relue sur le site
+                self.codes, self.refreshed_at = {}, None
+
+    @property
+    def fresh(self):
+        return bool(self.codes) and self.refreshed_at is not None and datetime.now() - self.refreshed_at < self.ttl
+
+    def covers(self, tickers):
+        """Toutes les actions demandées (libellé ou code, sans tenir compte de la casse) sont-elles connues ?"""
+        known = {name.strip().upper() for name in self.codes} | {str(code).upper() for code in self.codes.values()}
+        return all(str(ticker).strip().upper() in known for ticker in tickers)
+
+    def update(self, codes):
+        self.codes = dict(codes)
+        self.refreshed_at = datetime.now()
+        self.save()
+
+    def save(self):
+        data = {
+            'refreshed_at': self.refreshed_at.isoformat(timespec='seconds'),
+            'tickers': [{'code': code, 'name': name} for name, code in self.codes.items()],
+        }
+        write_json_atomic(self.path, data, indent=1)
+
+class ScrapeControl:
+    """
+    Jeton d'arrêt et de pause partagé entre l'interface, le scraper et ses workers.
+    Il est consulté entre deux fenêtres et entre deux actions.
+    """
+    def __init__(self):
+        self._stop = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    @property
+    def paused(self):
+        return not self._running.is_set()
+
+    def stop(self):
+        self._stop.set()
+        # Débloque un scraping en pause pour qu'il puisse se terminer
+        self._running.set()
+
+    def pause(self):
+        if not self.stopped:
+            self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def checkpoint(self):
+        """Attend tant que le scraping est en pause ; renvoie False si l'arrêt est demandé"""
+        self._running.wait()
+        return not self.stopped
+
+    def sleep(self, seconds):
+        """Attente interrompue par un arrêt ; renvoie False si l'arrêt est demandé"""
+        self._stop.wait(seconds)
+        return self.checkpoint()
+
 class BRVMScraper:
     def __init__(self, config=None):
         self.config = config or {}
         self.driver = None
+        self.http = None
+        self.coverage = None
+        self.sizer = None
+        self.store = None
+        self.cache = None
+        self.failures = None
+        # Navigateurs : gestionnaire partagé (navigateurs gardés chauds) fourni par
+        # l'interface ou la mise à jour quotidienne, sinon fermés en fin de run
+        self.drivers = DriverManager.from_config(self.config)
+        self.action_codes = {}
+        # Actions demandées introuvables sur le site (select_actions)
+        self.unknown_tickers = []
+        self.base_url = self.config.get('base_url', BASE_URL).rstrip('/')
+        self.metrics = RunMetrics()
+        self.control = ScrapeControl()
         self.progress_callback = None
         self.log_callback = None
+        self.metrics_callback = None
+        self.log_prefix = ""
+        self.worker_id = 0
+        # Appelé à la fin de chaque fenêtre de scrape_action (action, début, fin, statut, lignes)
+        self.on_window = None
+        self._progress_lock = threading.Lock()
+        self._total_combinations = 0
+        self._current_combination = 0
+        self._estimates = {}
+        self._drivers = set()
+        self._drivers_lock = threading.Lock()
         
-    def set_callbacks(self, progress_callback=None, log_callback=None):
+    def set_callbacks(self, progress_callback=None, log_callback=None, metrics_callback=None):
         self.progress_callback = progress_callback
         self.log_callback = log_callback
+        self.metrics_callback = metrics_callback
     
     def log(self, message):
         timestamp = datetime.now().strftime('%H:%M:%S')
-        log_message = f"[{timestamp}] {message}"
+        log_message = f"[{timestamp}] {self.log_prefix}{message}"
         print(log_message)
         if self.log_callback:
             self.log_callback(log_message)
@@ -48,7 +656,96 @@ class BRVMScraper:
         if self.progress_callback:
             self.progress_callback(value, message)
 
+    def stop(self):
+        """
+        Demande l'arrêt : les navigateurs sont fermés sans attendre la fin de la fenêtre
+        en cours, puis scrape_data sauvegarde les données déjà collectées.
+        """
+        self.control.stop()
+        self.log("🛑 Arrêt demandé : fermeture des navigateurs...")
+        with self._drivers_lock:
+            drivers = list(self._drivers)
+        for driver in drivers:
+            self.quit_driver(driver)
+
+    def pause(self):
+        """Suspend le scraping après la fenêtre en cours (les navigateurs restent ouverts)"""
+        self.control.pause()
+        self.log("⏸ Pause demandée (effective après la fenêtre en cours)")
+
+    def resume(self):
+        self.control.resume()
+        self.log("▶ Reprise du scraping")
+
+    def register_driver(self, driver):
+        """Référence un navigateur actif pour pouvoir le fermer à l'arrêt"""
+        with self._drivers_lock:
+            self._drivers.add(driver)
+        return driver
+
+    def quit_driver(self, driver):
+        with self._drivers_lock:
+            self._drivers.discard(driver)
+        self.drivers.forget(driver)
+        try:
+            driver.quit()
+        except Exception:
+            # Navigateur déjà fermé (arrêt demandé pendant une fenêtre)
+            pass
+
+    def driver_key(self):
+        """Clé du navigateur dans le gestionnaire : options du navigateur et numéro de worker"""
+        return json.dumps([self.config.get(option) for option in DRIVER_OPTIONS] + [self.worker_id])
+
+    def acquire_driver(self, tracker=None):
+        """Navigateur chaud du gestionnaire s'il est sain, sinon un nouveau navigateur"""
+        tracker = tracker or self
+        # Options changées depuis le préchauffage ou le run précédent (interface graphique) :
+        # les navigateurs chauds démarrés avec les anciennes ne serviront plus, ils sont fermés
+        options = json.loads(self.driver_key())[:-1]
+        self.drivers.close_idle(lambda key: json.loads(key)[:-1] == options)
+        driver, status = self.drivers.acquire(self.driver_key(), self.setup_driver, log=self.log)
+        self.metrics.count(DRIVER_COUNTERS[status])
+        return tracker.register_driver(driver)
+
+    def release_driver(self, tracker=None):
+        """
+        Rend le navigateur courant au gestionnaire en fin de run : il reste ouvert pour
+        le run suivant si le gestionnaire les garde chauds, sinon il est fermé.
+        """
+        tracker = tracker or self
+        driver, self.driver = self.driver, None
+        if driver is None:
+            return
+        if self.control.stopped:
+            tracker.quit_driver(driver)
+            return
+        with tracker._drivers_lock:
+            tracker._drivers.discard(driver)
+        self.drivers.release(driver)
+
+    def recycle_driver(self, tracker=None):
+        """Recycle le navigateur courant s'il a chargé trop de pages ou pris trop de mémoire"""
+        reason = self.drivers.recycle_reason(self.driver)
+        if reason is None:
+            return
+        tracker = tracker or self
+        with tracker._drivers_lock:
+            tracker._drivers.discard(self.driver)
+        with self.metrics.phase('recyclage'):
+            self.driver = tracker.register_driver(
+                self.drivers.recycle(self.driver, self.driver_key(), self.setup_driver, reason, log=self.log)
+            )
+        self.metrics.count('driver_recycles')
+
+    def count_page(self):
+        """Compte une page chargée (métriques, et recyclage du navigateur)"""
+        self.metrics.count('pages')
+        if self.driver is not None:
+            self.drivers.note_page(self.driver)
+
     def setup_driver(self):
+        load_selenium()
         options = webdriver.ChromeOptions()
         
         if self.config.get('headless', True):
@@ -58,8 +755,41 @@ class BRVMScraper:
         options.add_argument("--disable-dev-shm-usage")
         options.add_argument("--disable-gpu")
         options.add_argument("--window-size=1920,1080")
-        
-        return webdriver.Chrome(options=options)
+
+        lean = self.config.get('lean_session', False)
+        if lean:
+            # Pas d'images ni d'attente des ressources secondaires
+            options.page_load_strategy = 'eager'
+            options.add_argument("--blink-settings=imagesEnabled=false")
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+            })
+
+        profile_dir = self.config.get('profile_dir')
+        if profile_dir:
+            # Profil (et cache disque) conservé entre les runs, un par worker
+            profile_dir = os.path.abspath(os.path.join(profile_dir, f"w{self.worker_id}"))
+            options.add_argument(f"--user-data-dir={profile_dir}")
+            options.add_argument(f"--disk-cache-dir={os.path.join(profile_dir, 'cache')}")
+
+        with self.metrics.phase('driver'):
+            driver = webdriver.Chrome(options=options)
+            # Marge au-delà du délai géré dans la page par REFRESH_SCRIPT
+            driver.set_script_timeout(self.config.get('timeout', 10) + 5)
+            if lean:
+                self.block_resources(driver)
+        return driver
+
+    def block_resources(self, driver):
+        """Bloque les ressources non essentielles via l'interception réseau de Chrome (CDP)"""
+        patterns = LEAN_BLOCKED_URLS + list(self.config.get('blocked_urls', []))
+        if self.config.get('block_stylesheets', False):
+            patterns += LEAN_BLOCKED_STYLESHEETS
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        except Exception as e:
+            self.log(f"⚠ Blocage des ressources indisponible : {e}")
 
     def wait_for_element(self, by, value, timeout=None):
         timeout = timeout or self.config.get('timeout', 10)
@@ -72,12 +802,48 @@ class BRVMScraper:
         dropdown = Select(select_element)
         dropdown.select_by_visible_text(value_text)
 
+    def enter_action(self, option_text):
+        """
+        Ouvre la vue HISTORIQUES de l'action. En session légère, si la vue est déjà
+        affichée, l'action est changée sur place sans repasser par la page principale :
+        le changement n'est accepté que si la page chargée montre la nouvelle action
+        (SWITCH_STATE_SCRIPT), sinon la vue est rouverte par la page principale.
+        """
+        if self.config.get('lean_session', False) and self.driver.find_elements(By.ID, 'datefrom'):
+            try:
+                # Marqueur de page : il disparaît avec la navigation vers la nouvelle vue
+                self.driver.execute_script("window.__brvmView = true;")
+                self.select_dropdown_option(option_text)
+                code = str(self.action_codes.get(option_text, ''))
+
+                def switched(driver):
+                    state = driver.execute_script(SWITCH_STATE_SCRIPT, code, option_text)
+                    return None if state in (None, 'pending') else state
+
+                state = WebDriverWait(self.driver, self.config.get('switch_timeout', 5),
+                                      poll_frequency=0.05).until(switched)
+                if state == 'view':
+                    self.count_page()
+                    return True
+                self.log(f"⚠ Vue de '{option_text}' non reconnue après le changement sur place, rechargement de la page")
+            except TimeoutException:
+                self.log(f"⚠ Changement d'action sur place sans effet pour '{option_text}', rechargement de la page")
+            except Exception as e:
+                self.log(f"⚠ Changement d'action sur place impossible ({e}), rechargement de la page")
+            self.open_articles_page()
+
+        if not self.driver.find_elements(By.ID, 'dpShares'):
+            self.open_articles_page()
+        self.select_dropdown_option(option_text)
+        return self.click_historiques()
+
     def click_historiques(self):
         try:
             hist_link = WebDriverWait(self.driver, 10).until(
                 EC.element_to_be_clickable((By.LINK_TEXT, "HISTORIQUES"))
             )
             hist_link.click()
+            self.count_page()
             self.log("Clic sur 'HISTORIQUES' réussi.")
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.ID, 'datefrom'))
@@ -113,175 +879,1211 @@ class BRVMScraper:
             return not ('Pas de données à ces dates là' in msg)
         return True
 
-    def parse_table(self):
-        soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-        table = soup.find('table', id='tblhistos')
-        if not table:
-            return pd.DataFrame()
-        
-        headers = [th.text.strip() for th in table.find('thead').find_all('th')]
-        rows = []
-        for tr in table.find('tbody').find_all('tr'):
-            cells = [td.text.strip().replace('\xa0', '').replace(',', '.') for td in tr.find_all('td')]
-            if cells:
-                rows.append(cells)
+    def refresh_table(self, date_from, date_to):
+        """
+        Lance la recherche et attend dans la page le rafraîchissement de la table
+        (ou l'alerte "Pas de données"), sans sondage ni lecture d'une table périmée.
+        Renvoie la réponse brute : ('cells', table) ou ('empty', None).
+        """
+        timeout = self.config.get('timeout', 10)
+        result = self.driver.execute_async_script(
+            REFRESH_SCRIPT, date_from, date_to, int(timeout * 1000), NO_DATA_MESSAGE
+        )
+        if result['state'] == 'timeout':
+            raise TimeoutException(f"la table n'a pas été rafraîchie en {timeout}s")
+        if result['state'] == 'empty':
+            return 'empty', None
+        return 'cells', {'headers': result['headers'], 'rows': result['rows']}
+
+    def read_table_cells(self):
+        """Textes des en-têtes et des cellules de la table affichée : réponse brute ('cells', {...})"""
+        table = self.driver.execute_script(TABLE_SCRIPT) or {'headers': [], 'rows': []}
+        return 'cells', {'headers': table['headers'], 'rows': table['rows']}
+
+    def fetch_raw(self, option_text, date_from_str, date_to_str):
+        """Réponse brute (kind, payload) d'une fenêtre de l'action courante avec le backend actif"""
+        self.count_page()
+        if self.http:
+            with self.metrics.phase('http'):
+                return self.http.fetch_raw(option_text, date_from_str, date_to_str)
+
+        if self.config.get('event_wait', True):
+            with self.metrics.phase('rafraichissement'):
+                return self.refresh_table(date_from_str, date_to_str)
 
-        return pd.DataFrame(rows, columns=headers)
+        with self.metrics.phase('saisie_dates'):
+            self.fill_date_range(date_from_str, date_to_str)
+        with self.metrics.phase('verification'):
+            if not self.has_data():
+                return 'empty', None
+        with self.metrics.phase('lecture_table'):
+            return self.read_table_cells()
 
-    def scrape_data(self, start_date, end_date, interval_days=30):
+    def fetch_window(self, option_text, date_from_str, date_to_str):
         """
-        Fonction principale de scraping avec gestion des callbacks
+        Récupère une fenêtre de l'action courante, depuis le cache des réponses
+        brutes s'il est actif et la fenêtre close, sinon avec le backend actif (la réponse
+        est alors mise en cache une fois lue). Les lignes hors de la fenêtre sont écartées ;
+        une table sans aucune ligne dans la fenêtre est une erreur (window_rows).
+        Renvoie None lorsque le site n'a pas de données.
         """
-        self.driver = self.setup_driver()
-        all_data = pd.DataFrame()
-        
+        if self.cache is not None:
+            with self.metrics.phase('cache'):
+                cached = self.cache.get(option_text, date_from_str, date_to_str)
+            if cached is not None:
+                self.metrics.count('cache_hits')
+                with self.metrics.phase('analyse'):
+                    return window_rows(raw_frame(*cached), date_from_str, date_to_str)
+
+        kind, payload = self.fetch_raw(option_text, date_from_str, date_to_str)
+        with self.metrics.phase('analyse'):
+            data = window_rows(raw_frame(kind, payload), date_from_str, date_to_str)
+        # Seules les réponses validées (table lue dans la fenêtre, ou message 'Pas de données')
+        # sont mises en cache
+        if self.cache is not None and is_table(kind, payload):
+            with self.metrics.phase('cache'):
+                self.cache.put(option_text, date_from_str, date_to_str, kind, payload)
+        return data
+
+    def open_articles_page(self):
+        """Charge la page principale et attend la liste déroulante des actions"""
+        self.count_page()
+        with self.metrics.phase('page_principale'):
+            self.driver.get(self.base_url + ARTICLES_PATH)
+            return WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.ID, "dpShares"))
+            )
+
+    def list_actions(self):
+        """Renvoie le libellé de toutes les actions de la liste 'dpShares'"""
+        dropdown = Select(self.open_articles_page())
+        self.action_codes = {
+            opt.text: opt.get_attribute("value")
+            for opt in dropdown.options if opt.get_attribute("value")
+        }
+        return list(self.action_codes)
+
+    def select_actions(self, options_text, tickers):
+        """
+        Restreint la liste aux actions demandées, désignées par libellé ou par code
+        (sans tenir compte de la casse). Les actions inconnues sont signalées.
+        """
+        wanted = {str(ticker).strip().upper(): ticker for ticker in tickers}
+        selected = [
+            option_text for option_text in options_text
+            if option_text.strip().upper() in wanted
+            or str(self.action_codes.get(option_text, '')).upper() in wanted
+        ]
+        known = {option_text.strip().upper() for option_text in selected}
+        known |= {str(self.action_codes.get(option_text, '')).upper() for option_text in selected}
+        unknown = [ticker for key, ticker in wanted.items() if key not in known]
+        self.unknown_tickers = unknown
+        if unknown:
+            self.log(f"⚠ Actions introuvables sur le site : {', '.join(map(str, unknown))}")
+        return selected
+
+    @staticmethod
+    def date_windows(start_date, end_date, interval_days):
+        """Découpe la période en fenêtres (date_from, date_to) de interval_days jours"""
+        windows = []
+        current_start = start_date
+        while current_start < end_date:
+            current_end = min(current_start + timedelta(days=interval_days), end_date)
+            windows.append((current_start, current_end))
+            current_start = current_end + timedelta(days=1)
+        return windows
+
+    def mark_covered(self, option_text, current_start, current_end, save=True):
+        """
+        Enregistre une fenêtre terminée dans l'index de couverture.
+        Les derniers jours (refresh_days) restent ouverts et seront toujours rescrapés.
+        """
+        if self.coverage is None:
+            return
+        closed_until = datetime.today().date() - timedelta(days=self.config.get('refresh_days', 7))
+        self.coverage.add(option_text, current_start.date(), min(current_end.date(), closed_until), save=save)
+
+    def plan_windows(self, option_text, start_date, end_date, interval_days):
+        """
+        Fenêtres à scraper pour une action. En mode incrémental, seules les
+        périodes absentes de l'index de couverture sont découpées.
+        En mode adaptatif, les périodes sont renvoyées entières et découpées au fil du scraping.
+        """
+        if not self.config.get('incremental', False):
+            spans = [(start_date, end_date)] if start_date < end_date else []
+        else:
+            spans = [
+                (datetime.combine(gap_start, datetime.min.time()), datetime.combine(gap_end, datetime.min.time()))
+                for gap_start, gap_end in self.coverage.missing(option_text, start_date.date(), end_date.date())
+            ]
+
+        if self.sizer is not None:
+            return spans
+
+        windows = []
+        for span_start, span_end in spans:
+            windows.extend(self.date_windows(span_start, span_end, interval_days) or [(span_start, span_end)])
+        return windows
+
+    def advance_progress(self, option_text, date_from_str, date_to_str):
+        """Avance la progression d'une fenêtre (partagée entre les workers)"""
+        with self._progress_lock:
+            self._current_combination += 1
+            progress_percent = min(self._current_combination / max(self._total_combinations, 1), 1.0)
+        self.update_progress(
+            progress_percent,
+            f"Action: {option_text} | Période: {date_from_str} - {date_to_str}"
+        )
+
+    def report_metrics(self):
+        """Transmet le débit et le temps restant estimé au callback de métriques"""
+        if self.metrics_callback:
+            with self._progress_lock:
+                done, total = self._current_combination, self._total_combinations
+            self.metrics_callback(self.metrics.snapshot(done, total))
+
+    @staticmethod
+    def session_lost(error):
+        """Vrai si l'erreur indique que la session du navigateur est morte"""
+        if type(error).__name__ in ('InvalidSessionIdException', 'NoSuchWindowException'):
+            return True
+        message = str(error).lower()
+        return any(marker in message for marker in SESSION_LOST_MARKERS)
+
+    def driver_alive(self):
+        """Vérifie que la session du navigateur répond encore"""
         try:
-            self.log("🔍 Connexion au site BRVM...")
-            self.driver.get("https://www.sikafinance.com/premium/articles")
-            
-            wait = WebDriverWait(self.driver, 10)
-            select_element = wait.until(EC.presence_of_element_located((By.ID, "dpShares")))
-            dropdown = Select(select_element)
-            options_text = [opt.text for opt in dropdown.options if opt.get_attribute("value")]
-            
-            self.log(f"📋 {len(options_text)} actions trouvées")
-            
-            total_combinations = 0
-            current_combination = 0
-            
-            # Calculer le nombre total de combinaisons
-            for option_text in options_text:
-                current_start = start_date
-                while current_start < end_date:
-                    current_end = min(current_start + timedelta(days=interval_days), end_date)
-                    total_combinations += 1
-                    current_start = current_end + timedelta(days=1)
+            return self.driver is not None and self.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
 
-            for option_index, option_text in enumerate(options_text):
+    def recover_driver(self, option_text, tracker=None):
+        """
+        Remplace un navigateur dont la session est perdue par un nouveau driver
+        et revient sur la vue HISTORIQUES de l'action. Renvoie False en cas d'échec.
+        """
+        tracker = tracker or self
+        self.log("♻️ Session du navigateur perdue : redémarrage du driver")
+        self.metrics.count('driver_restarts')
+        if self.driver:
+            tracker.quit_driver(self.driver)
+            self.driver = None
+        try:
+            self.driver = self.acquire_driver(tracker)
+            self.open_articles_page()
+            return self.enter_action(option_text)
+        except Exception as e:
+            self.log(f"❌ ERREUR redémarrage du driver : {e}")
+            return False
+
+    def record_failure(self, option_index, option_text, current_start, current_end, error):
+        if self.failures is not None:
+            self.failures.record(option_index, option_text, current_start, current_end, error)
+
+    def update_estimate(self, option_text, windows_count):
+        """Met à jour l'estimation du nombre de fenêtres d'une action (fenêtres adaptatives)"""
+        with self._progress_lock:
+            self._estimates[option_text] = windows_count
+            self._total_combinations = sum(self._estimates.values())
+
+    def remaining_windows(self, option_text, pending):
+        """Estime le nombre de fenêtres restant à charger pour une action"""
+        if self.sizer is None:
+            return len(pending)
+        return sum(self.sizer.estimate(option_text, start, end) for start, end in pending)
+
+    def scrape_action(self, option_index, option_text, windows, journal, tracker=None, retry_round=0):
+        """
+        Scrape toutes les fenêtres d'une action avec le driver courant.
+        Chaque fenêtre est ajoutée au journal ; la sortie finale est triée par
+        (Date, ACTION) et ne dépend donc pas de l'ordre d'arrivée.
+        En mode adaptatif, windows contient des périodes découpées au fil de l'eau.
+        Les fenêtres en échec sont inscrites au registre pour la passe de reprise
+        (retry_round > 0 lors de cette passe).
+        """
+        tracker = tracker or self
+        self.metrics.set_action(option_text)
+        try:
+            if not self.http:
+                try:
+                    # Entre deux actions : recyclage après N pages ou au-delà du seuil mémoire
+                    if self.driver is not None:
+                        self.recycle_driver(tracker)
+                    with self.metrics.phase('navigation'):
+                        entered = self.enter_action(option_text)
+                except Exception as e:
+                    if self.control.stopped:
+                        return
+                    self.log(f"❌ ERREUR ouverture de l'action '{option_text}' : {e}")
+                    entered = False
+                if not entered and not self.control.stopped and not self.driver_alive():
+                    entered = self.recover_driver(option_text, tracker)
+                if not entered:
+                    if self.control.stopped:
+                        return
+                    self.metrics.count('errors')
+                    for current_start, current_end in windows:
+                        self.record_failure(option_index, option_text, current_start, current_end,
+                                            "vue HISTORIQUES inaccessible")
+                    return
+
+            pending = list(windows)
+            window_index = 0
+            while pending:
+                if not self.control.checkpoint():
+                    break
+                current_start, current_end = pending.pop(0)
+                if self.sizer is not None:
+                    window_end = min(current_start + timedelta(days=self.sizer.size(option_text)), current_end)
+                    if window_end < current_end:
+                        pending.insert(0, (window_end + timedelta(days=1), current_end))
+                    current_end = window_end
+
+                date_from_str = current_start.strftime('%Y-%m-%d')
+                date_to_str = current_end.strftime('%Y-%m-%d')
+
+                self.log(f"📅 Scraping du {date_from_str} au {date_to_str}")
+                tracker.advance_progress(option_text, date_from_str, date_to_str)
+
+                self.metrics.begin_window(option_text, date_from_str, date_to_str)
+                status, rows_kept = 'error', 0
                 try:
-                    self.log(f"\n📊 Traitement de l'action : {option_text} ({option_index + 1}/{len(options_text)})")
-                    self.select_dropdown_option(option_text)
+                    monthly_data = self.fetch_window(option_text, date_from_str, date_to_str)
+
+                    if self.sizer is not None:
+                        rows = 0 if monthly_data is None else len(monthly_data)
+                        truncated = self.sizer.record(option_text, (current_end - current_start).days, rows)
+                        if truncated and current_end > current_start:
+                            # Table tronquée : la fenêtre est redécoupée avec la nouvelle taille
+                            self.log(f"✂️ Table tronquée ({rows} lignes), fenêtre réduite à {self.sizer.size(option_text)} jours")
+                            pending.insert(0, (current_start, current_end))
+                            status = 'truncated'
+                            continue
 
-                    if not self.click_historiques():
+                    if monthly_data is None:
+                        self.log(f"⚠ Pas de données entre {date_from_str} et {date_to_str}")
+                        self.mark_covered(option_text, current_start, current_end)
+                        status = 'empty'
                         continue
 
-                    current_start = start_date
-                    while current_start < end_date:
-                        current_end = min(current_start + timedelta(days=interval_days), end_date)
-                        date_from_str = current_start.strftime('%Y-%m-%d')
-                        date_to_str = current_end.strftime('%Y-%m-%d')
-                        
-                        current_combination += 1
-                        progress_percent = current_combination / total_combinations
-                        
-                        self.log(f"📅 Scraping du {date_from_str} au {date_to_str}")
-                        self.update_progress(
-                            progress_percent, 
-                            f"Action: {option_text} | Période: {date_from_str} - {date_to_str}"
-                        )
-
-                        try:
-                            self.fill_date_range(date_from_str, date_to_str)
-
-                            if not self.has_data():
-                                self.log(f"⚠ Pas de données entre {date_from_str} et {date_to_str}")
-                                current_start = current_end + timedelta(days=1)
-                                continue
-
-                            monthly_data = self.parse_table()
-                            if not monthly_data.empty:
-                                monthly_data['ACTION'] = option_text
-                                all_data = pd.concat([all_data, monthly_data], ignore_index=True)
-                                
-                                # Sauvegarde temporaire
-                                all_data.to_csv('stock_data_temp.csv', index=False, encoding='utf-8-sig')
-                                self.log(f"✅ {len(monthly_data)} enregistrements ajoutés")
-                            else:
-                                self.log("⚠ Table vide détectée.")
-
-                        except Exception as e:
-                            self.log(f"❌ ERREUR scraping du {date_from_str} au {date_to_str} : {e}")
-                            current_start = current_end + timedelta(days=1)
-                            continue 
-
-                        current_start = current_end + timedelta(days=1)
-
-                    # Retourner à la page principale pour la prochaine action
-                    self.driver.get("https://www.sikafinance.com/premium/articles")
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.ID, "dpShares"))
-                    )
+                    if not monthly_data.empty:
+                        monthly_data['ACTION'] = option_text
+                        status, rows_kept = 'data', self.write_rows(monthly_data, journal)
+                    else:
+                        self.log("⚠ Table vide détectée.")
+                        status = 'empty'
+
+                    self.mark_covered(option_text, current_start, current_end)
 
                 except Exception as e:
-                    self.log(f"❌ ERREUR option '{option_text}' : {e}")
+                    if self.control.stopped:
+                        # Navigateur fermé par stop() : la fenêtre sera reprise au prochain run
+                        status = 'cancelled'
+                        break
+                    self.log(f"❌ ERREUR scraping du {date_from_str} au {date_to_str} : {e}")
+                    self.record_failure(option_index, option_text, current_start, current_end, e)
+                    if not self.http and self.session_lost(e) and not self.recover_driver(option_text, tracker):
+                        # Sans navigateur, les fenêtres restantes passent directement au registre
+                        for pending_start, pending_end in pending:
+                            self.record_failure(option_index, option_text, pending_start, pending_end, e)
+                        pending = []
                     continue
 
+                finally:
+                    self.metrics.end_window(status, rows_kept)
+                    if self.on_window is not None:
+                        self.on_window(option_text, current_start, current_end, status, rows_kept)
+                    window_index += 1
+                    if not retry_round:
+                        tracker.update_estimate(option_text, window_index + self.remaining_windows(option_text, pending))
+                    tracker.report_metrics()
+
+            # Retourner à la page principale pour la prochaine action
+            # (en session légère, la vue HISTORIQUES est conservée)
+            if not self.http and not self.config.get('lean_session', False) and not self.control.stopped:
+                self.open_articles_page()
+
+        except Exception as e:
+            if self.control.stopped:
+                return
+            self.metrics.count('errors')
+            self.log(f"❌ ERREUR option '{option_text}' : {e}")
+            if not self.http and self.session_lost(e):
+                self.recover_driver(option_text, tracker)
+
         finally:
-            if self.driver:
-                self.driver.quit()
+            if self.sizer is not None:
+                self.sizer.save()
+
+    def write_rows(self, data, journal):
+        """
+        Ajoute les lignes reçues au journal (doublons exacts rejetés) puis à la base
+        locale ; renvoie le nombre de lignes écrites.
+        """
+        # Sauvegarde temporaire (ajout en fin de journal), doublons exacts rejetés
+        with self.metrics.phase('journal'):
+            written = journal.append(data)
+        rejected = len(data) - len(written)
+        if rejected:
+            self.metrics.count('duplicate_rows', rejected)
+        new_rows = ""
+        if self.store is not None and not written.empty:
+            with self.metrics.phase('base'):
+                new_rows = f" ({self.store.upsert(written)} nouveaux)"
+        self.log(f"✅ {len(written)} enregistrements ajoutés{new_rows}"
+                 + (f", {rejected} doublons ignorés" if rejected else ""))
+        return len(written)
+
+    def retry_rounds(self, pending, label):
+        """
+        Tours de reprise des éléments en échec (fenêtres ou séances) : au plus retry_attempts
+        tours espacés d'un délai exponentiel (retry_delay, x2, x4...). pending() renvoie le
+        nombre d'éléments encore en échec ; les tours cessent quand il n'y en a plus ou à
+        l'arrêt. Génère le numéro de chaque tour, une fois le délai écoulé.
+        """
+        attempts = int(self.config.get('retry_attempts', 3))
+        delay = float(self.config.get('retry_delay', 2))
+        for retry_round in range(1, attempts + 1):
+            count = pending()
+            if not count or self.control.stopped:
+                return
+            wait = delay * 2 ** (retry_round - 1)
+            self.log(f"\n🔁 {count} {label} en échec : nouvelle tentative "
+                     f"({retry_round}/{attempts}) dans {wait:.0f}s")
+            if not self.control.sleep(wait):
+                return
+            with self._progress_lock:
+                self._total_combinations += count
+            self.metrics.count('retried_windows', count)
+            yield retry_round
 
-            # Post-traitement des données
+    def scrape_parallel(self, options_text, plan, journal, workers):
+        """
+        Répartit les actions entre plusieurs sessions Chrome.
+        Chaque worker possède son propre driver et prend les actions dans une file partagée.
+        """
+        tasks = queue.Queue()
+        for option_index, option_text in enumerate(options_text):
+            if plan[option_text]:
+                tasks.put((option_index, option_text))
+
+        def worker_loop(worker_id):
+            worker = type(self)(self.config)
+            worker.log_prefix = f"[W{worker_id}] "
+            worker.worker_id = worker_id
+            worker.set_callbacks(log_callback=self.log_callback)
+            # Le backend HTTP est partagé (liste des actions) ; chaque thread y a sa session
+            worker.http = self.http
+            worker.coverage = self.coverage
+            worker.sizer = self.sizer
+            worker.store = self.store
+            worker.cache = self.cache
+            worker.metrics = self.metrics
+            worker.control = self.control
+            worker.failures = self.failures
+            worker.drivers = self.drivers
             try:
-                if not all_data.empty:
-                    self.log("🔄 Post-traitement des données...")
-                    
-                    # Suppression des doublons
-                    initial_count = len(all_data)
-                    all_data.drop_duplicates(inplace=True)
-                    self.log(f"🗑 {initial_count - len(all_data)} doublons supprimés")
-                    
-                    # Tri par date
-                    all_data['Date'] = pd.to_datetime(all_data['Date'], format='%d/%m/%Y', errors='coerce')
-                    all_data = all_data.sort_values(by='Date')
-                    all_data['Date'] = all_data['Date'].dt.strftime('%d/%m/%Y')
-                    all_data.reset_index(drop=True, inplace=True)
-
-                    # Sauvegarde finale
-                    all_data.to_csv('stock_data.csv', index=False, encoding='utf-8-sig')
-                    self.log(f"✅ Fichier final 'stock_data.csv' généré avec {len(all_data)} enregistrements.")
-                    
-                    return {
-                        'success': True,
-                        'records': len(all_data),
-                        'actions': all_data['ACTION'].nunique() if 'ACTION' in all_data.columns else 0,
-                        'file': 'stock_data.csv'
-                    }
-                else:
-                    self.log("⚠ Aucune donnée collectée.")
-                    return {'success': False, 'message': 'Aucune donnée collectée'}
-                    
+                if not worker.http:
+                    worker.driver = worker.acquire_driver(tracker=self)
+                    worker.open_articles_page()
             except Exception as e:
-                self.log(f"⚠ Erreur post-traitement : {e}")
-                all_data.to_csv('stock_data_fallback.csv', index=False, encoding='utf-8-sig')
-                self.log("⚠ Données sauvegardées dans 'stock_data_fallback.csv' sans tri.")
-                return {
-                    'success': False, 
-                    'message': f'Erreur post-traitement: {e}',
-                    'fallback_file': 'stock_data_fallback.csv'
-                }
+                if not self.control.stopped:
+                    worker.log(f"❌ ERREUR démarrage du driver : {e}")
+                if worker.driver:
+                    self.quit_driver(worker.driver)
+                return
 
-"""def main():
-    """    """Fonction principale pour utilisation en standalone""""""
-    # Configuration par défaut
-    config = {
-        'headless': True,
-        'timeout': 10,
-        'retry_attempts': 3
-    }
-    
-    scraper = BRVMScraper(config)
-    
-    # Dates par défaut
-    start_date = datetime(2023, 1, 1)
-    end_date = datetime.today()
-    
-    result = scraper.scrape_data(start_date, end_date, interval_days=30)
-    
-    if result['success']:
-        print(f"✅ Scraping terminé avec succès: {result['records']} enregistrements")
-    else:
-        print(f"❌ Erreur lors du scraping: {result.get('message', 'Erreur inconnue')}")
+            try:
+                while self.control.checkpoint():
+                    try:
+                        option_index, option_text = tasks.get_nowait()
+                    except queue.Empty:
+                        break
+                    worker.log(f"\n📊 Traitement de l'action : {option_text} ({option_index + 1}/{len(options_text)})")
+                    worker.scrape_action(option_index, option_text, plan[option_text], journal, tracker=self)
+            finally:
+                worker.release_driver(tracker=self)
+
+        threads = [
+            threading.Thread(target=worker_loop, args=(worker_id + 1,), daemon=True)
+            for worker_id in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not tasks.empty() and not self.control.stopped:
+            self.log(f"⚠ {tasks.qsize()} actions non traitées (aucun worker disponible)")
+
+    def retry_failed(self, journal):
+        """
+        Passe de reprise en fin de run : seules les fenêtres en échec sont rechargées,
+        en au plus retry_attempts tours espacés d'un délai exponentiel (retry_delay, x2, x4...).
+        """
+        for retry_round in self.retry_rounds(lambda: len(self.failures), 'fenêtres'):
+            entries = self.failures.take_all()
+            if not self.http and not self.driver_alive():
+                if self.driver:
+                    self.quit_driver(self.driver)
+                    self.driver = None
+                try:
+                    self.driver = self.acquire_driver()
+                    self.open_articles_page()
+                except Exception as e:
+                    self.log(f"❌ ERREUR démarrage du driver : {e}")
+                    for option_index, option_text, date_from, date_to in entries:
+                        self.failures.record(option_index, option_text, date_from, date_to, e)
+                    continue
+
+            by_action = {}
+            for option_index, option_text, date_from, date_to in entries:
+                by_action.setdefault((option_index, option_text), []).append((date_from, date_to))
+            for (option_index, option_text), windows in by_action.items():
+                if not self.control.checkpoint():
+                    return
+                self.log(f"🔁 {option_text} : {len(windows)} fenêtres à reprendre")
+                self.scrape_action(option_index, option_text, windows, journal, retry_round=retry_round)
+
+    def scrape_by_action(self, options_text, start_date, end_date, interval_days, journal):
+        """Parcours action par action, fenêtre par fenêtre (backends Selenium et HTTP)"""
+        # Calculer le nombre total de combinaisons (estimation en mode adaptatif)
+        plan = {
+            option_text: self.plan_windows(option_text, start_date, end_date, interval_days)
+            for option_text in options_text
+        }
+        self._estimates = {
+            option_text: self.remaining_windows(option_text, windows)
+            for option_text, windows in plan.items()
+        }
+        self._total_combinations = sum(self._estimates.values())
+        self._current_combination = 0
+        if self.config.get('incremental', False):
+            self.log(f"♻️ {self._total_combinations} fenêtres manquantes à scraper")
+
+        workers = min(max(1, int(self.config.get('workers', 1))), len(options_text) or 1)
+        if workers > 1:
+            self.log(f"⚡ Scraping parallèle avec {workers} workers")
+            # Chaque worker ouvre sa propre session
+            self.release_driver()
+            self.scrape_parallel(options_text, plan, journal, workers)
+        else:
+            if not self.http and self.driver is None and any(plan.values()):
+                self.driver = self.acquire_driver()
+            for option_index, option_text in enumerate(options_text):
+                if not self.control.checkpoint():
+                    break
+                if not plan[option_text]:
+                    continue
+                self.log(f"\n📊 Traitement de l'action : {option_text} ({option_index + 1}/{len(options_text)})")
+                self.scrape_action(option_index, option_text, plan[option_text], journal)
+
+        # Reprise ciblée des fenêtres en échec
+        self.retry_failed(journal)
+
+    def snapshot_days(self, options_text, start_date, end_date):
+        """
+        Jours ouvrés de la période (les jours fériés sont reconnus ensuite à la date
+        de séance affichée). En mode incrémental, seuls les jours encore manquants
+        pour au moins une action sont gardés.
+        """
+        days = []
+        day = start_date
+        while day <= end_date:
+            if day.weekday() < 5:
+                days.append(day)
+            day += timedelta(days=1)
+        if not self.config.get('incremental', False):
+            return days
+        return [
+            day for day in days
+            if any(self.coverage.missing(option_text, day.date(), day.date()) for option_text in options_text)
+        ]
+
+    def scrape_day(self, day, options_text, journal, selected=False):
+        """
+        Charge la page des cotations d'une séance et ajoute toutes ses lignes au journal.
+        Renvoie None si le jour est traité (y compris sans séance), sinon l'erreur.
+        """
+        date_str = day.strftime('%Y-%m-%d')
+        self.log(f"📅 Séance du {date_str}")
+        self.advance_progress('Toutes les actions', date_str, date_str)
+        self.metrics.begin_window('*', date_str, date_str)
+        status, rows_kept = 'error', 0
+        try:
+            self.metrics.count('pages')
+            with self.metrics.phase('http'):
+                page = self.http.fetch_page(day)
+            with self.metrics.phase('analyse'):
+                data = self.http.parse_day(day, page)
+
+            if data is None:
+                self.log(f"⚠ Pas de séance le {date_str}")
+                status = 'empty'
+            elif not data.empty:
+                if selected:
+                    data = data[data['ACTION'].isin(options_text)]
+                status, rows_kept = 'data', self.write_rows(data, journal)
+            else:
+                self.log("⚠ Table vide détectée.")
+                status = 'empty'
+
+            # Le lundi couvre aussi le week-end : les périodes de l'index restent contiguës
+            covered_from = day - timedelta(days=2) if day.weekday() == 0 else day
+            for option_text in options_text:
+                self.mark_covered(option_text, covered_from, day, save=False)
+            if self.coverage is not None:
+                self.coverage.save()
+            return None
+
+        except Exception as e:
+            if self.control.stopped:
+                status = 'cancelled'
+                return None
+            self.log(f"❌ ERREUR séance du {date_str} : {e}")
+            return e
+
+        finally:
+            self.metrics.end_window(status, rows_kept)
+            self.report_metrics()
+
+    def scrape_by_day(self, options_text, start_date, end_date, journal, selected=False):
+        """
+        Parcours jour de bourse par jour de bourse (backend "snapshot") : une page par
+        séance donne les cotations de toutes les actions, au lieu d'une requête par
+        action et par fenêtre. Sans sélection (selected=False), toutes les actions de
+        la page sont gardées. Les séances en échec sont reprises en fin de parcours
+        (retry_attempts tours, délai exponentiel) puis inscrites au registre des échecs.
+        """
+        # Liste des actions lue avec Selenium : les séances passent quand même par HTTP
+        self.release_driver()
+        if self.http is None and self.start_http_backend(self.action_codes) is None:
+            raise RuntimeError("backend snapshot indisponible")
+
+        days = self.snapshot_days(options_text, start_date, end_date)
+        self._total_combinations = len(days)
+        self._current_combination = 0
+        self.log(f"🗓️ {len(days)} jours de bourse à charger (une page par séance pour toutes les actions)")
+
+        failed = []
+        for day in days:
+            if not self.control.checkpoint():
+                break
+            error = self.scrape_day(day, options_text, journal, selected)
+            if error is not None:
+                failed.append((day, error))
+
+        for _ in self.retry_rounds(lambda: len(failed), 'séances'):
+            retry, failed = failed, []
+            for day, _ in retry:
+                if not self.control.checkpoint():
+                    failed.extend(entry for entry in retry if entry[0] >= day)
+                    break
+                error = self.scrape_day(day, options_text, journal, selected)
+                if error is not None:
+                    failed.append((day, error))
+
+        for day, error in failed:
+            self.failures.record(0, '*', day, day, error)
+
+    def start_http_backend(self, codes=None):
+        """
+        Active le backend HTTP (sans navigateur) et renvoie la liste des actions,
+        lue sur le site ou reprise de codes (libellé -> code) sans requête.
+        Renvoie None en cas d'échec : le scraping repasse alors par Selenium.
+        """
+        try:
+            if self.config.get('backend') == 'snapshot':
+                from brvm_snapshot import SnapshotBackend as HttpBackend
+            else:
+                from brvm_http import HttpBackend
+            self.http = HttpBackend(self.config, base_url=self.base_url)
+            if codes:
+                self.http.tickers = dict(codes)
+                options_text = list(codes)
+            else:
+                options_text = self.http.list_actions()
+            self.action_codes = self.http.tickers
+            self.log("🌐 Backend HTTP actif (sans navigateur)")
+            return options_text
+        except Exception as e:
+            self.log(f"⚠ Backend HTTP indisponible ({e}), repli sur Selenium")
+            if self.http:
+                self.http.close()
+                self.http = None
+            return None
+
+    def open_actions(self, tickers=None):
+        """
+        Active le backend et renvoie les actions à scraper (liste en cache si elle est
+        à jour, sinon relue sur le site), restreintes à tickers s'il est donné.
+        """
+        self.log("🔍 Connexion au site BRVM...")
+        # Liste des actions en cache : pas de passage par la liste déroulante
+        universe = self.ticker_universe()
+        cached = self.cached_actions(universe, tickers)
+        options_text = None
+        if self.config.get('backend', 'selenium') in ('http', 'snapshot'):
+            with self.metrics.phase('liste_actions'):
+                options_text = self.start_http_backend(self.action_codes if cached else None)
+            if options_text is not None and cached is None:
+                universe.update(self.action_codes)
+
+        if options_text is None and cached is not None:
+            options_text = cached
+        elif options_text is None:
+            self.driver = self.acquire_driver()
+            with self.metrics.phase('liste_actions'):
+                options_text = self.list_actions()
+            universe.update(self.action_codes)
+
+        self.log(f"📋 {len(options_text)} actions trouvées")
+        if tickers:
+            options_text = self.select_actions(options_text, tickers)
+            self.log(f"🎯 {len(options_text)} actions sélectionnées")
+        return options_text
+
+    def ticker_universe(self):
+        return TickerUniverse(
+            self.config.get('tickers_file', 'stock_data_tickers.json'),
+            ttl_hours=self.config.get('tickers_ttl_hours', 24)
+        )
+
+    def cached_actions(self, universe, tickers=None):
+        """
+        Liste des actions du cache si elle est à jour et contient toutes les actions
+        demandées ; sinon None (la liste sera relue sur le site).
+        """
+        if not universe.fresh or (tickers and not universe.covers(tickers)):
+            return None
+        self.action_codes = dict(universe.codes)
+        self.log(f"📋 Liste des actions en cache (mise à jour le {universe.refreshed_at:%Y-%m-%d %H:%M})")
+        return list(universe.codes)
+
+    def refresh_universe(self):
+        """Relit la liste des actions sur le site et met le cache à jour ; renvoie {libellé: code}"""
+        load_dependencies()
+        universe = self.ticker_universe()
+        options_text = None
+        try:
+            if self.config.get('backend', 'selenium') in ('http', 'snapshot'):
+                options_text = self.start_http_backend()
+            if options_text is None:
+                self.driver = self.acquire_driver()
+                self.list_actions()
+        finally:
+            self.release_driver()
+            if self.http:
+                self.http.close()
+                self.http = None
+        universe.update(self.action_codes)
+        self.log(f"📋 {len(universe.codes)} actions enregistrées dans '{universe.path}'")
+        return dict(universe.codes)
+
+    def iter_partitions(self, spool):
+        """Partitions finales, une action à la fois (base locale ou partitions du journal)"""
+        if self.store is not None:
+            for action in self.store.actions():
+                yield self.store.read_frame(actions=[action])
+        else:
+            for data in spool.iter_partitions():
+                yield clean_histos_frame(data)
+
+    def save_output(self, spool=None):
+        """
+        Écrit le résultat final : CSV et/ou jeu de données colonnaire typé,
+        partitionné par ACTION et par année (config 'output_format').
+        Le CSV est produit en flux (export trié de la base, ou fusion k-voies des
+        partitions triées) et le jeu colonnaire action par action.
+        Renvoie le chemin de la sortie principale.
+        """
+        output_format = self.config.get('output_format', 'csv')
+        output_file = 'stock_data.csv'
+
+        if output_format == 'csv' or self.config.get('csv_export', True):
+            if self.store is not None:
+                records = self.store.export_csv('stock_data.csv')
+            else:
+                records = spool.merge_csv('stock_data.csv')
+            self.log(f"✅ Fichier final 'stock_data.csv' généré avec {records} enregistrements.")
+
+        if output_format != 'csv':
+            from brvm_output import write_partitioned_stream
+            partitions = write_partitioned_stream(self.iter_partitions(spool), 'stock_data', output_format)
+            self.log(f"✅ Jeu de données '{output_format}' généré dans 'stock_data/' ({partitions} partitions)")
+            if not self.config.get('csv_export', True):
+                output_file = 'stock_data'
+
+        series_root = self.config.get('series_dir')
+        if series_root:
+            from brvm_query import write_series
+            actions = write_series(self.iter_partitions(spool), series_root)
+            self.log(f"✅ Séries mappées pour les requêtes générées dans '{series_root}/' ({actions} actions)")
+
+        return output_file
+
+    def iter_saved_data(self, chunksize=50000):
+        """Relit par blocs les données finales déjà sauvegardées (CSV, sinon jeu de données partitionné)"""
+        if os.path.exists('stock_data.csv'):
+            for chunk in pd.read_csv('stock_data.csv', dtype=str, keep_default_na=False,
+                                     encoding='utf-8-sig', chunksize=chunksize):
+                yield clean_histos_frame(chunk)
+        elif os.path.isdir('stock_data'):
+            from brvm_output import list_partitions, read_partitioned
+            actions = sorted({
+                os.path.relpath(path, 'stock_data').split(os.sep)[0][len('ACTION='):]
+                for path in list_partitions('stock_data')
+            })
+            for action in actions:
+                data = read_partitioned('stock_data', action=unquote(action))
+                if not data.empty:
+                    data['Date'] = data['Date'].dt.strftime('%d/%m/%Y')
+                    data['ACTION'] = data['ACTION'].astype(str)
+                    yield clean_histos_frame(data.drop(columns=['year'], errors='ignore'))
+
+    def finalize(self, journal):
+        """
+        Post-traitement et sauvegarde finale en mémoire bornée. Avec la base locale,
+        les données sont déjà dédoublonnées à l'insertion et relues triées par l'index ;
+        sinon chaque partition du journal est dédoublonnée et triée séparément avant
+        la fusion. L'historique complet n'est jamais chargé en un seul bloc.
+        """
+        journal.close()
+        self.metrics.set_action(None)
+        try:
+            with self.metrics.phase('fusion'):
+                if self.store is not None:
+                    records, actions = self.store.count(), self.store.actions_count()
+                else:
+                    records, actions, duplicates = journal.spool.sort_partitions()
+
+            if not records:
+                self.log("⚠ Aucune donnée collectée.")
+                return {'success': False, 'message': 'Aucune donnée collectée'}
+
+            self.log("🔄 Post-traitement des données...")
+            if self.store is None:
+                self.log(f"🗑 {duplicates} doublons supprimés")
+
+            # Sauvegarde finale
+            with self.metrics.phase('ecriture'):
+                output_file = self.save_output(journal.spool)
+            journal.discard()
+
+            return {
+                'success': True,
+                'records': records,
+                'actions': actions,
+                'file': output_file
+            }
+
+        except Exception as e:
+            self.log(f"⚠ Erreur post-traitement : {e}")
+            # Le journal contient toutes les fenêtres du run, telles que reçues
+            if os.path.exists(journal.path):
+                shutil.copyfile(journal.path, 'stock_data_fallback.csv')
+            self.log("⚠ Données sauvegardées dans 'stock_data_fallback.csv' sans tri.")
+            return {
+                'success': False,
+                'message': f'Erreur post-traitement: {e}',
+                'fallback_file': 'stock_data_fallback.csv'
+            }
+
+    def scrape_data(self, start_date, end_date, interval_days=30, tickers=None):
+        """
+        Fonction principale de scraping avec gestion des callbacks.
+        tickers : libellés ou codes des actions à scraper (toutes si None).
+        """
+        load_dependencies()
+        self.metrics = RunMetrics(keep_trace=self.config.get('metrics_trace', True))
+        self.failures = FailedWindows(self.config.get('failed_file', 'stock_data_failed.json'))
+        incremental = self.config.get('incremental', False)
+        self.coverage = CoverageIndex(self.config.get('coverage_file', 'stock_data_coverage.json'))
+        if self.config.get('store', 'stock_data.db'):
+            from brvm_store import QuoteStore
+            self.store = QuoteStore(self.config.get('store', 'stock_data.db'))
+        spool = None
+        if self.store is None:
+            from brvm_output import PartitionSpool
+            spool = PartitionSpool(self.config.get('spool_dir', 'stock_data_parts'))
+        journal = ChunkJournal('stock_data_temp.csv', resume=incremental and self.store is None, spool=spool)
+        self.cache = self.open_cache()
+        if self.config.get('adaptive_windows', False):
+            self.sizer = AdaptiveWindows(
+                self.config.get('window_sizes_file', 'stock_data_windows.json'),
+                initial_days=interval_days,
+                page_limit=self.config.get('page_limit', 100),
+                max_days=self.config.get('max_interval_days', 365)
+            )
+
+        if incremental and self.store is not None:
+            # La base conserve tout ; un ancien stock_data.csv y est importé une seule fois
+            if self.store.count() == 0:
+                for chunk in self.iter_saved_data():
+                    self.store.upsert(chunk)
+            self.log(f"♻️ Mode incrémental : {self.store.count()} enregistrements existants")
+        elif incremental:
+            # Les données déjà sauvegardées sont conservées et complétées, puis les
+            # fenêtres d'un run interrompu (plus récentes) sont rejouées par-dessus
+            for chunk in self.iter_saved_data():
+                journal.add_base(chunk)
+            journal.replay()
+            self.log(f"♻️ Mode incrémental : {journal.records} enregistrements existants")
+        elif self.store is None:
+            # Sans base locale, un scraping complet réécrit stock_data.csv à partir de ce seul
+            # run : l'index ne doit couvrir que les périodes de ce nouveau fichier
+            self.coverage.clear()
+        # Avec la base locale, les lignes des runs précédents restent dans la base et dans
+        # l'export : l'index de couverture est conservé et complété par ce run
+        
+        try:
+            options_text = self.open_actions(tickers)
+            if self.config.get('backend', 'selenium') == 'snapshot':
+                self.scrape_by_day(options_text, start_date, end_date, journal, selected=bool(tickers))
+            else:
+                self.scrape_by_action(options_text, start_date, end_date, interval_days, journal)
+
+        finally:
+            self.release_driver()
+            if self.http:
+                self.http.close()
+                self.http = None
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+
+            failed = self.failures.save()
+            if failed and not self.control.stopped:
+                self.log(f"⚠ {len(failed)} fenêtres irrécupérables (détail dans '{self.failures.path}') :")
+                for entry in failed:
+                    self.log(f"   - {entry['action']} du {entry['from']} au {entry['to']} "
+                             f"({entry['attempts']} tentatives) : {entry['error']}")
+
+            # Après un arrêt, les données déjà collectées suivent le post-traitement normal
+            result = self.finalize(journal)
+            if failed:
+                result['failed_windows'] = failed
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+            if self.control.stopped:
+                result['cancelled'] = True
+                self.log("⏹ Scraping interrompu : données partielles sauvegardées, "
+                         "relancer en mode incrémental pour reprendre après la dernière fenêtre terminée")
+            result['metrics'] = self.write_metrics()
+            if self.drivers.started or self.drivers.reused:
+                result['drivers'] = self.report_drivers(result['metrics'])
+            return result
+
+    def open_cache(self):
+        """Cache des réponses brutes (config 'raw_cache'), ou None s'il est désactivé"""
+        root = self.config.get('raw_cache', 'stock_data_cache')
+        if not root:
+            return None
+        from brvm_cache import RawCache
+        return RawCache(
+            root,
+            closed_days=self.config.get('refresh_days', 7),
+            wal=not self.config.get('network_storage', False)
+        )
+
+    def reparse_cache(self, tickers=None):
+        """
+        Reconstruit le jeu de données hors ligne à partir du cache des réponses brutes,
+        avec le parseur et les règles de nettoyage actuels, sans accéder au site.
+        Les lignes existantes de la base locale sont remplacées par les valeurs relues.
+        """
+        load_dependencies()
+        self.metrics = RunMetrics(keep_trace=self.config.get('metrics_trace', True))
+        root = self.config.get('raw_cache', 'stock_data_cache')
+        if not root or not os.path.isdir(root):
+            self.log("⚠ Aucun cache de réponses brutes à relire.")
+            return {'success': False, 'message': 'Cache des réponses brutes introuvable'}
+
+        self.cache = self.open_cache()
+        if self.config.get('store', 'stock_data.db'):
+            from brvm_store import QuoteStore
+            self.store = QuoteStore(self.config.get('store', 'stock_data.db'))
+        spool = None
+        if self.store is None:
+            from brvm_output import PartitionSpool
+            spool = PartitionSpool(self.config.get('spool_dir', 'stock_data_parts'))
+        journal = ChunkJournal('stock_data_temp.csv', spool=spool)
+
+        try:
+            actions = self.select_actions(self.cache.actions(), tickers) if tickers else None
+            self._total_combinations = self.cache.count(actions)
+            self._current_combination = 0
+            self.log(f"♻️ Relecture de {self._total_combinations} fenêtres en cache")
+
+            for action, date_from, date_to, kind, payload in self.cache.entries(actions):
+                if not self.control.checkpoint():
+                    break
+                self.advance_progress(action, date_from, date_to)
+                self.metrics.begin_window(action, date_from, date_to)
+                status, rows = 'error', 0
+                try:
+                    with self.metrics.phase('analyse'):
+                        data = raw_frame(kind, payload)
+                    if data is None or data.empty:
+                        status = 'empty'
+                        continue
+                    data['ACTION'] = action
+                    with self.metrics.phase('journal'):
+                        data = journal.append(data)
+                    if self.store is not None and not data.empty:
+                        with self.metrics.phase('base'):
+                            self.store.upsert(data)
+                    status, rows = 'data', len(data)
+                except Exception as e:
+                    self.log(f"❌ ERREUR relecture {action} du {date_from} au {date_to} : {e}")
+                finally:
+                    self.metrics.end_window(status, rows)
+                    self.report_metrics()
+
+        finally:
+            self.cache.close()
+            self.cache = None
+            result = self.finalize(journal)
+            if self.store is not None:
+                self.store.close()
+                self.store = None
+            if self.control.stopped:
+                result['cancelled'] = True
+            result['metrics'] = self.write_metrics()
+            return result
+
+    def enqueue_backfill(self, task_queue, start_date, end_date, interval_days=30, tickers=None):
+        """
+        Découpe la période en fenêtres (action, date_from, date_to) avec plan_windows et
+        les ajoute à la file partagée task_queue (brvm_workqueue.WorkQueue). En mode incrémental,
+        seules les périodes absentes de l'index de couverture sont ajoutées.
+        """
+        load_dependencies()
+        self.coverage = CoverageIndex(self.config.get('coverage_file', 'stock_data_coverage.json'))
+        try:
+            options_text = self.open_actions(tickers)
+        except Exception as e:
+            self.log(f"❌ ERREUR liste des actions : {e}")
+            return {'success': False, 'message': f'Liste des actions indisponible: {e}'}
+        finally:
+            self.release_driver()
+            if self.http:
+                self.http.close()
+                self.http = None
+
+        windows = [
+            (option_text, current_start.strftime('%Y-%m-%d'), current_end.strftime('%Y-%m-%d'))
+            for option_text in options_text
+            for current_start, current_end in self.plan_windows(option_text, start_date, end_date, interval_days)
+        ]
+        added = task_queue.enqueue(windows)
+        self.log(f"📥 {added} fenêtres ajoutées à la file '{task_queue.path}' ({len(windows) - added} déjà présentes)")
+        return {'success': True, 'planned': len(windows), 'added': added, 'queue': task_queue.stats()}
+
+    def work_queue(self, task_queue, worker=None):
+        """
+        Worker de la file partagée : réserve des lots de fenêtres d'une même action
+        (config 'queue_batch'), les scrape avec scrape_action dans la base locale commune
+        et marque chaque fenêtre terminée dans la file. Les baux du lot sont prolongés en
+        tâche de fond ; une fenêtre en échec est rendue à la file pour une nouvelle tentative.
+        Le worker s'arrête quand la file est vide : les tâches d'un worker arrêté
+        brutalement sont reprises à l'expiration de leur bail.
+        """
+        from brvm_workqueue import LeaseKeeper
+
+        load_dependencies()
+        worker = worker or f"{socket.gethostname()}-{os.getpid()}"
+        tag = re.sub(r'[^\w.-]', '_', worker)
+        self.log_prefix = f"[{worker}] "
+        # Un fichier de métriques par worker (plusieurs processus dans le même dossier)
+        self.config = {'metrics_file': f'stock_data_metrics_{tag}.json', **self.config}
+        self.metrics = RunMetrics(keep_trace=self.config.get('metrics_trace', True))
+        self.failures = FailedWindows()
+        if not self.config.get('store', 'stock_data.db'):
+            self.log("⚠ La file partagée écrit dans la base locale : config 'store' requise.")
+            return {'success': False, 'message': "Base locale requise (config 'store')"}
+        from brvm_store import QuoteStore
+        self.store = QuoteStore(self.config.get('store', 'stock_data.db'),
+                                wal=not self.config.get('network_storage', False))
+        self.cache = self.open_cache()
+        journal = ChunkJournal(f'stock_data_temp_{tag}.csv')
+        batch = max(1, int(self.config.get('queue_batch', 10)))
+        poll = float(self.config.get('queue_poll_seconds', 2))
+        counts = Counter()
+        result = {'success': True}
+
+        try:
+            self.open_actions()
+            if not self.http and self.driver is None:
+                self.driver = self.acquire_driver()
+            with LeaseKeeper(task_queue) as keeper:
+                while self.control.checkpoint():
+                    tasks = task_queue.claim(worker, limit=batch)
+                    if not tasks:
+                        if task_queue.drained():
+                            break
+                        # Fenêtres en cours chez d'autres workers ou en attente de nouvelle tentative
+                        self.control.sleep(poll)
+                        continue
+                    keeper.hold(tasks)
+                    self.run_tasks(task_queue, tasks, journal, worker, keeper, counts)
+        except Exception as e:
+            if not self.control.stopped:
+                self.log(f"❌ ERREUR worker : {e}")
+                result = {'success': False, 'message': f'Erreur worker: {e}'}
+        finally:
+            self.release_driver()
+            if self.http:
+                self.http.close()
+                self.http = None
+            if self.cache is not None:
+                self.cache.close()
+                self.cache = None
+            journal.discard()
+            self.store.close()
+            self.store = None
+
+        stats = task_queue.stats()
+        self.log(f"🏁 {counts['done']} fenêtres terminées, {counts['pending']} à reprendre, "
+                 f"{counts['dead']} abandonnées | file : {stats['done']}/{stats['total']} terminées")
+        result.update({'worker': worker, 'windows': dict(counts), 'queue': stats})
+        if self.control.stopped:
+            result['cancelled'] = True
+        result['metrics'] = self.write_metrics()
+        if self.drivers.started or self.drivers.reused:
+            result['drivers'] = self.report_drivers(result['metrics'])
+        return result
+
+    def run_tasks(self, task_queue, tasks, journal, worker, keeper, counts):
+        """
+        Scrape un lot de tâches d'une même action. Chaque fenêtre est marquée terminée dès
+        qu'elle est écrite ; les fenêtres en échec sont rendues à la file avec leur erreur
+        et celles qui n'ont pas été traitées (arrêt demandé) sont rendues sans tentative.
+        """
+        action = tasks[0].action
+        pending = {(task.date_from, task.date_to): task for task in tasks}
+        for task in tasks:
+            if task.reclaimed_from:
+                self.log(f"♻️ Bail expiré de {task.reclaimed_from} repris : {action} "
+                         f"du {task.date_from} au {task.date_to}")
+
+        def finished(option_text, current_start, current_end, status, rows):
+            if status not in ('data', 'empty'):
+                return
+            task = pending.pop((current_start.strftime('%Y-%m-%d'), current_end.strftime('%Y-%m-%d')), None)
+            if task is not None:
+                keeper.drop(task)
+                task_queue.complete(task, rows, worker)
+                counts['done'] += 1
+
+        windows = [(datetime.strptime(task.date_from, '%Y-%m-%d'), datetime.strptime(task.date_to, '%Y-%m-%d'))
+                   for task in tasks]
+        self.log(f"\n📊 Traitement de l'action : {action} ({len(tasks)} fenêtres)")
+        self.on_window = finished
+        try:
+            self.scrape_action(0, action, windows, journal)
+        finally:
+            self.on_window = None
+            errors = {
+                (date_from.strftime('%Y-%m-%d'), date_to.strftime('%Y-%m-%d')): info['error']
+                for (option_text, date_from, date_to), info in self.failures.entries.items()
+            }
+            self.failures.take_all()
+            released = []
+            for key, task in pending.items():
+                keeper.drop(task)
+                if self.control.stopped:
+                    released.append(task)
+                    continue
+                status = task_queue.fail(task, errors.get(key, "fenêtre non traitée"))
+                if status == 'dead':
+                    self.log(f"⛔ {action} du {task.date_from} au {task.date_to} abandonnée "
+                             f"après {task.attempts} tentatives")
+                counts[status or 'lost'] += 1
+            task_queue.release(released)
+            counts['released'] += len(released)
+
+    def export_queue(self, task_queue):
+        """
+        Sortie consolidée d'une file partagée : les fenêtres terminées sont inscrites à
+        l'index de couverture (pour les runs incrémentaux suivants), puis la base locale
+        commune est exportée comme en fin de run. Les fenêtres abandonnées sont renvoyées
+        comme fenêtres irrécupérables.
+        """
+        load_dependencies()
+        self.metrics = RunMetrics(keep_trace=False)
+        stats = task_queue.stats()
+        result = {'queue': stats}
+        if stats['pending'] or stats['leased']:
+            self.log(f"⚠ File non terminée : {stats['pending']} fenêtres en attente, {stats['leased']} en cours")
+            result['pending_windows'] = stats['pending'] + stats['leased']
+
+        self.coverage = CoverageIndex(self.config.get('coverage_file', 'stock_data_coverage.json'))
+        for action, date_from, date_to in task_queue.done_windows():
+            self.mark_covered(action, datetime.strptime(date_from, '%Y-%m-%d'),
+                              datetime.strptime(date_to, '%Y-%m-%d'), save=False)
+        self.coverage.save()
+
+        if not self.config.get('store', 'stock_data.db'):
+            return dict(result, success=False, message="Base locale requise (config 'store')")
+        from brvm_store import QuoteStore
+        self.store = QuoteStore(self.config.get('store', 'stock_data.db'),
+                                wal=not self.config.get('network_storage', False))
+        try:
+            records, actions = self.store.count(), self.store.actions_count()
+            if not records:
+                self.log("⚠ Aucune donnée collectée.")
+                return dict(result, success=False, message='Aucune donnée collectée')
+            output_file = self.save_output()
+        finally:
+            self.store.close()
+            self.store = None
+
+        result.update({'success': True, 'records': records, 'actions': actions, 'file': output_file})
+        dead = task_queue.dead_tasks()
+        if dead:
+            self.log(f"⚠ {len(dead)} fenêtres abandonnées par les workers :")
+            for entry in dead:
+                self.log(f"   - {entry['action']} du {entry['from']} au {entry['to']} "
+                         f"({entry['attempts']} tentatives) : {entry['error']}")
+            result['failed_windows'] = dead
+        return result
+
+    def report_drivers(self, summary):
+        """Journalise les démarrages, réutilisations et recyclages du run ; renvoie le bilan du gestionnaire"""
+        counters = summary['counters']
+        startup = summary['phases'].get('driver')
+        if startup or counters.get('driver_reuses'):
+            self.log(
+                f"🚗 Navigateurs : {startup['count'] if startup else 0} démarrages"
+                + (f" ({startup['seconds'] / startup['count']:.1f}s en moyenne, max {startup['max']:.1f}s)" if startup else "")
+                + f", {counters.get('driver_reuses', 0)} réutilisés à chaud, {counters.get('driver_recycles', 0)} recyclés"
+            )
+        return self.drivers.report()
+
+    def write_metrics(self):
+        """Écrit le résumé et la trace du run en JSON (config 'metrics_file') et renvoie le résumé"""
+        path = self.config.get('metrics_file', 'stock_data_metrics.json')
+        try:
+            summary = self.metrics.write(path) if path else self.metrics.summary()
+        except Exception as e:
+            self.log(f"⚠ Écriture des métriques impossible : {e}")
+            summary = self.metrics.summary()
+        summary.pop('trace', None)
+
+        slowest = sorted(summary['phases'].items(), key=lambda item: item[1]['seconds'], reverse=True)[:3]
+        self.log(
+            f"⏱ {summary['counters'].get('windows', 0)} fenêtres en {summary['elapsed_s']:.1f}s "
+            f"({summary['windows_per_s']:.2f} fenêtres/s) | "
+            + ", ".join(f"{name} {stats['seconds']:.1f}s" for name, stats in slowest)
+        )
+        return summary
+
+def main():
+    """Point d'entrée en ligne de commande (options : python brvm_cli.py --help)"""
+    from brvm_cli import main as cli_main
+    return cli_main()
 
 if __name__ == "__main__":
-    main()
-"""
\ No newline at end of file
+    sys.exit(main())
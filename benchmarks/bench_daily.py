@@ -0,0 +1,57 @@
+"""
+Mise à jour quotidienne (brvm_cli.py daily --once) lancée plusieurs fois de suite le
+même jour contre le serveur local : la fenêtre des derniers jours est encore ouverte,
+chaque run doit la redemander au site (une séance a pu s'y ajouter entre-temps), même
+si un run précédent a mis la même fenêtre dans le cache des réponses brutes.
+
+Usage : python benchmarks/bench_daily.py [nb_actions]
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+from fixture_server import SyntheticSite, bench_workdir, serving
+
+CLI = os.path.join(ROOT_DIR, 'brvm_cli.py')
+
+
+def daily(workdir, tickers):
+    t0 = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, CLI, 'daily', '--once', '--backend', 'http', '--tickers', ','.join(tickers),
+         '--config', 'config.json'],
+        cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    ).stdout
+    summary = json.loads(out)
+    summary['elapsed_s'] = time.perf_counter() - t0
+    return summary
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    site = SyntheticSite(count)
+    tickers = [code for code, _ in site.tickers]
+    with serving(site=site) as base_url, bench_workdir(prefix='brvm_bench_daily_', chdir=False) as workdir:
+        with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump({'base_url': base_url, 'metrics_trace': False}, f)
+        # Le premier run complète la couverture : les suivants demandent la même fenêtre
+        runs = [daily(workdir, tickers) for _ in range(3)]
+
+    ok = True
+    print(f"{'run':<6}{'sortie':>8}{'pages':>8}{'cache':>8}{'durée (s)':>11}")
+    for i, summary in enumerate(runs, 1):
+        counters = summary.get('metrics', {}).get('counters', {})
+        pages, hits = counters.get('pages', 0), counters.get('cache_hits', 0)
+        # Chaque action n'a qu'une fenêtre, ouverte : tout doit venir du site
+        ok &= summary['exit_code'] == 0 and pages >= len(tickers) and hits == 0
+        print(f"{i:<6}{summary['exit_code']:>8}{pages:>8}{hits:>8}{summary['elapsed_s']:>11.2f}")
+    print(f"Fenêtres ouvertes redemandées au site à chaque run -> {'OK' if ok else 'ÉCART'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
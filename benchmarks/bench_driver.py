@@ -0,0 +1,68 @@
+"""
+Runs courts successifs (backend Selenium) contre le serveur local : navigateur
+démarré à froid à chaque run, ou gardé chaud entre les runs par un DriverManager
+partagé (comme l'interface graphique et la mise à jour quotidienne).
+Affiche la durée de chaque run et le bilan des démarrages et recyclages.
+
+Usage : python benchmarks/bench_driver.py [nb_runs] [max_pages]
+"""
+import contextlib
+import os
+import shutil
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+from BRVM_scraper import BRVMScraper
+from brvm_driver import DriverManager
+from fixture_server import RecordedSite, bench_workdir, serving
+
+
+def runs(base_url, count, drivers=None):
+    """Durée de count runs d'une fenêtre par action (dernière semaine des pages enregistrées)"""
+    config = {'base_url': base_url, 'headless': True, 'store': None, 'raw_cache': None,
+              'metrics_trace': False, 'metrics_file': None}
+    durations = []
+    for _ in range(count):
+        scraper = BRVMScraper(config)
+        if drivers is not None:
+            scraper.drivers = drivers
+        t0 = time.perf_counter()
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            scraper.scrape_data(datetime(2023, 3, 24), datetime(2023, 3, 31), 7)
+        durations.append(time.perf_counter() - t0)
+    return durations
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    max_pages = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    if not (shutil.which('chromedriver') or shutil.which('google-chrome') or shutil.which('chromium')):
+        print("Chrome introuvable : benchmark ignoré")
+        return 0
+
+    drivers = DriverManager(keep_warm=True, max_pages=max_pages)
+    with serving(site=RecordedSite()) as base_url, bench_workdir():
+        try:
+            cold = runs(base_url, count)
+            warm = runs(base_url, count, drivers)
+            report = drivers.report()
+        finally:
+            drivers.close()
+
+    print(f"{'run':<6}{'à froid (s)':>14}{'chaud (s)':>12}")
+    for i, (a, b) in enumerate(zip(cold, warm), 1):
+        print(f"{i:<6}{a:>14.2f}{b:>12.2f}")
+    print(f"Navigateur chaud : {report['started']} démarrages, {report['reused']} réutilisations, "
+          f"recyclages {report['recycled'] or 0}")
+    if report['startup_s']:
+        print(f"Démarrage : {report['startup_s']['mean']:.2f}s en moyenne (max {report['startup_s']['max']:.2f}s)")
+    if report['recycle_s']:
+        print(f"Recyclage : {report['recycle_s']['mean']:.2f}s en moyenne")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
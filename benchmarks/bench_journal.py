@@ -0,0 +1,85 @@
+"""
+Benchmark de l'ingestion des fenêtres : ancienne méthode (concat + réécriture
+complète du CSV temporaire à chaque fenêtre) contre le journal en ajout seul.
+
+Usage : python benchmarks/bench_journal.py [nb_fenetres] [lignes_par_fenetre]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from BRVM_scraper import ChunkJournal
+from brvm_output import PartitionSpool
+
+
+def make_window(index, rows):
+    """Génère une fenêtre synthétique au format de raw_frame"""
+    start = datetime(2010, 1, 1) + timedelta(days=index * rows)
+    return pd.DataFrame({
+        'Date': [(start + timedelta(days=i)).strftime('%d/%m/%Y') for i in range(rows)],
+        'Ouverture': ['1250.00'] * rows,
+        'Plus Haut': ['1280.00'] * rows,
+        'Plus Bas': ['1240.00'] * rows,
+        'Clôture': ['1275.00'] * rows,
+        'Volume': ['15420'] * rows,
+        'ACTION': ['BICC'] * rows,
+    })
+
+
+def run_legacy(windows, path):
+    all_data = pd.DataFrame()
+    timings = []
+    for window in windows:
+        t0 = time.perf_counter()
+        all_data = pd.concat([all_data, window], ignore_index=True)
+        all_data.to_csv(path, index=False, encoding='utf-8-sig')
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def run_journal(windows, path):
+    journal = ChunkJournal(path, spool=PartitionSpool(path + '.parts'))
+    timings = []
+    for window in windows:
+        t0 = time.perf_counter()
+        journal.append(window)
+        timings.append(time.perf_counter() - t0)
+    journal.close()
+    t0 = time.perf_counter()
+    journal.spool.sort_partitions()
+    journal.spool.merge_csv(path + '.final.csv')
+    return timings, time.perf_counter() - t0
+
+
+def report(name, timings, checkpoints):
+    cells = []
+    for cp in checkpoints:
+        chunk = timings[max(0, cp - 50):cp]
+        cells.append(f"{1000 * sum(chunk) / len(chunk):8.2f}")
+    print(f"{name:<10}" + "".join(cells) + f"   total {sum(timings):.2f}s")
+
+
+def main():
+    n_windows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 21
+    windows = [make_window(i, rows) for i in range(n_windows)]
+    checkpoints = [cp for cp in (50, 250, 500, 1000, 2000, 5000) if cp <= n_windows]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = run_legacy(windows, os.path.join(tmp, 'legacy.csv'))
+        journal, concat_time = run_journal(windows, os.path.join(tmp, 'journal.csv'))
+
+    print(f"{n_windows} fenêtres x {rows} lignes — coût moyen par fenêtre (ms) autour de la fenêtre n°")
+    print(f"{'':<10}" + "".join(f"{cp:>8}" for cp in checkpoints))
+    report('legacy', legacy, checkpoints)
+    report('journal', journal, checkpoints)
+    print(f"Tri des partitions et fusion finale : {concat_time * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark de l'extraction de 'tblhistos' sur les pages enregistrées :
+ancien parseur (BeautifulSoup sur toute la page, nettoyage cellule par cellule)
+contre le parseur rapide (fragment de la table avec lxml, nettoyage vectorisé).
+
+Usage : python benchmarks/bench_parse.py [repetitions]
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+from BRVM_scraper import parse_histos_html
+from fixture_server import FIXTURES_DIR
+
+
+def legacy_parse(html):
+    """Ancienne version de parse_table"""
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', id='tblhistos')
+    if not table:
+        return pd.DataFrame()
+
+    headers = [th.text.strip() for th in table.find('thead').find_all('th')]
+    rows = []
+    for tr in table.find('tbody').find_all('tr'):
+        cells = [td.text.strip().replace('\xa0', '').replace(',', '.') for td in tr.find_all('td')]
+        if cells:
+            rows.append(cells)
+
+    return pd.DataFrame(rows, columns=headers)
+
+
+def timeit(func, pages, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    return (time.perf_counter() - t0) / (repeat * len(pages))
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    pages = []
+    for name in sorted(os.listdir(FIXTURES_DIR)):
+        if name.startswith('historiques_'):
+            with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+                pages.append(f.read())
+
+    # Les deux parseurs doivent donner les mêmes valeurs
+    for page in pages:
+        legacy = legacy_parse(page)
+        fast = parse_histos_html(page)
+        for column in legacy.columns:
+            expected = legacy[column] if column == 'Date' else pd.to_numeric(legacy[column])
+            assert (expected.values == fast[column].values).all(), column
+
+    legacy_time = timeit(legacy_parse, pages, repeat)
+    fast_time = timeit(parse_histos_html, pages, repeat)
+    print(f"{len(pages)} pages, {repeat} répétitions")
+    print(f"ancien parseur : {legacy_time * 1000:7.2f} ms/page")
+    print(f"parseur rapide : {fast_time * 1000:7.2f} ms/page  (x{legacy_time / fast_time:.1f})")
+    print("types :", dict(parse_histos_html(pages[0]).dtypes.astype(str)))
+
+
+if __name__ == "__main__":
+    main()
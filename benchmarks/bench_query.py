@@ -0,0 +1,81 @@
+"""
+Benchmark des requêtes par action : filtrage pandas du CSV chargé en mémoire
+contre get_series sur les séries mappées (brvm_query), pour des plages d'un
+mois et de l'historique complet, plus resample et align.
+
+Usage : python benchmarks/bench_query.py [nb_actions] [nb_annees]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from brvm_query import SeriesStore, write_series
+
+
+def make_dataset(n_actions, years):
+    """Séances ouvrées synthétiques au format de stock_data.csv"""
+    days = pd.bdate_range(date(2024 - years, 1, 1), date(2023, 12, 31))
+    rng = np.random.default_rng(0)
+    frames = []
+    for k in range(n_actions):
+        close = 1000 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+        frames.append(pd.DataFrame({
+            'Date': days.strftime('%d/%m/%Y'),
+            'Ouverture': close * 0.99, 'Plus Haut': close * 1.02, 'Plus Bas': close * 0.97,
+            'Clôture': close, 'Volume': rng.integers(0, 50000, len(days)),
+            'ACTION': f'T{k:03d}',
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def timed(func, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    n_actions = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    data = make_dataset(n_actions, years)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'series')
+        t0 = time.perf_counter()
+        write_series((part for _, part in data.groupby('ACTION')), root)
+        build = time.perf_counter() - t0
+        store = SeriesStore(root)
+
+        typed = data.assign(Date=pd.to_datetime(data['Date'], format='%d/%m/%Y'))
+        month = ('2020-03-01', '2020-03-31')
+        first, last = typed['Date'].min(), typed['Date'].max()
+        action = 'T007'
+
+        def pandas_range(start, end):
+            mask = (typed['ACTION'] == action) & (typed['Date'] >= start) & (typed['Date'] <= end)
+            return typed.loc[mask]
+
+        print(f"{len(data)} lignes ({n_actions} actions x {years} ans), séries écrites en {build * 1000:.0f} ms")
+        print(f"{'requête':<28}{'pandas (ms)':>14}{'mappé (ms)':>14}")
+        rows = [
+            ('un mois', lambda: pandas_range(*month), lambda: store.get_series(action, *month)),
+            ('historique complet', lambda: pandas_range(first, last), lambda: store.get_series(action)),
+        ]
+        for label, baseline, mapped in rows:
+            assert len(baseline()) == len(mapped()['Date'])
+            print(f"{label:<28}{timed(baseline, 20):>14.3f}{timed(mapped, 2000):>14.4f}")
+        print(f"{'resample mensuel':<28}{'':>14}{timed(lambda: store.resample(action, 'M'), 200):>14.4f}")
+        print(f"{'rendements':<28}{'':>14}{timed(lambda: store.returns(action), 200):>14.4f}")
+        actions = store.actions[:10]
+        print(f"{'align 10 actions':<28}{'':>14}{timed(lambda: store.align(actions), 50):>14.4f}")
+
+
+if __name__ == "__main__":
+    main()
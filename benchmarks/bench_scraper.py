@@ -0,0 +1,197 @@
+"""
+Benchmark de bout en bout de scrape_data contre le serveur local (fixture_server) :
+débit en fenêtres/s, temps par phase, pic mémoire Python (tracemalloc) et
+exactitude du résultat comparé aux données servies.
+
+Chaque résultat est une ligne JSON (révision git, scénario, mesures) ajoutée au
+fichier --output, pour comparer les versions entre elles avec --compare.
+
+Usage : python benchmarks/bench_scraper.py [--backend http|snapshot|selenium] [--tickers N]
+        [--years N] [--interval J] [--workers N] [--latency-ms MS] [--error-rate R]
+        [--output benchmarks/results.jsonl] [--compare benchmarks/results.jsonl]
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(ROOT_DIR)
+from BRVM_scraper import BRVMScraper
+from fixture_server import RecordedSite, SyntheticSite, bench_workdir, expected_frame, serving
+
+# Métriques comparées avec --compare (sens : 1 = plus grand est meilleur)
+COMPARED = {'windows_per_s': 1, 'elapsed_s': -1, 'peak_python_mb': -1}
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return rev + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'inconnue'
+
+
+def check_output(data, expected):
+    """Compare les lignes scrapées aux lignes servies, sur la clé (ACTION, Date)"""
+    import pandas as pd
+
+    keys = ['ACTION', 'Date']
+    if data.empty:
+        return {'ok': expected.empty, 'records': 0, 'expected': len(expected),
+                'missing': len(expected), 'unexpected': 0, 'duplicates': 0, 'value_mismatches': 0}
+    merged = expected.merge(data, on=keys, how='outer', suffixes=('', '_scraped'), indicator=True)
+    both = merged[merged['_merge'] == 'both']
+    mismatches = 0
+    for column in expected.columns:
+        if column in keys or column + '_scraped' not in both:
+            continue
+        scraped = pd.to_numeric(both[column + '_scraped'], errors='coerce')
+        mismatches += int(((scraped - both[column]).abs() > 0.005).sum())
+    result = {
+        'records': len(data),
+        'expected': len(expected),
+        'missing': int((merged['_merge'] == 'left_only').sum()),
+        'unexpected': int((merged['_merge'] == 'right_only').sum()),
+        'duplicates': int(data.duplicated(subset=keys).sum()),
+        'value_mismatches': mismatches,
+    }
+    result['ok'] = not (result['missing'] or result['unexpected'] or result['duplicates'] or mismatches)
+    return result
+
+
+def run(args):
+    import pandas as pd
+
+    if args.tickers:
+        end = date(2023, 12, 31)
+        start = date(end.year - args.years + 1, 1, 1)
+        site = SyntheticSite(args.tickers, start=start, end=end, density=args.density, seed=args.seed)
+    else:
+        site = RecordedSite()
+        start, end = date(2023, 1, 1), date(2023, 3, 31)
+    with serving(site=site, latency=args.latency_ms / 1000, error_rate=args.error_rate,
+                 page_limit=args.page_limit, seed=args.seed) as base_url, bench_workdir():
+        config = {
+            'backend': args.backend,
+            'base_url': base_url,
+            'workers': args.workers,
+            'headless': True,
+            'timeout': args.timeout,
+            'lean_session': args.lean,
+            'output_format': 'csv',
+            'metrics_trace': False,
+            'store': None if args.no_store else 'stock_data.db',
+        }
+        scraper = BRVMScraper(config)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        # Logs du scraper et des workers écartés : seul le rapport JSON est affiché
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = scraper.scrape_data(datetime.combine(start, datetime.min.time()),
+                                         datetime.combine(end, datetime.min.time()), args.interval)
+        elapsed = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        data = (pd.read_csv('stock_data.csv', encoding='utf-8-sig')
+                if result.get('success') and os.path.exists('stock_data.csv') else pd.DataFrame())
+
+    windows = scraper._total_combinations
+    return {
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'scenario': {
+            'backend': args.backend,
+            'tickers': len(site.tickers),
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'interval': args.interval,
+            'workers': args.workers,
+            'density': args.density if args.tickers else None,
+            'latency_ms': args.latency_ms,
+            'error_rate': args.error_rate,
+            'page_limit': args.page_limit,
+            'lean': args.lean,
+            'store': not args.no_store,
+        },
+        'windows': windows,
+        'elapsed_s': round(elapsed, 3),
+        'windows_per_s': round(windows / elapsed, 2) if elapsed else None,
+        'phases_s': {name: stats['seconds'] for name, stats in result['metrics']['phases'].items()},
+        'phase_calls': {name: stats['count'] for name, stats in result['metrics']['phases'].items()},
+        'counters': result['metrics']['counters'],
+        'peak_python_mb': round(peak / 2**20, 1),
+        # ru_maxrss : Ko sous Linux (le navigateur, processus séparé, n'est pas compté)
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'correctness': check_output(data, expected_frame(site, start, end)),
+    }
+
+
+def compare(report, path):
+    """Affiche l'écart avec le dernier résultat du même scénario enregistré dans path"""
+    previous = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get('scenario') == report['scenario'] and entry is not report:
+                previous = entry
+    if previous is None:
+        print("Aucun résultat précédent pour ce scénario")
+        return
+    print(f"Comparaison avec {previous['revision']} ({previous['timestamp']}) :")
+    for metric, direction in COMPARED.items():
+        old, new = previous.get(metric), report.get(metric)
+        if not old or new is None:
+            continue
+        change = (new - old) / old * 100
+        verdict = 'mieux' if change * direction > 0 else 'moins bien' if change else 'identique'
+        print(f"  {metric:16s} {old:>10} -> {new:<10} ({change:+.1f} %, {verdict})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--backend', choices=('http', 'snapshot', 'selenium'), default='http')
+    parser.add_argument('--tickers', type=int, default=0, help="N actions synthétiques (0 : pages enregistrées)")
+    parser.add_argument('--years', type=int, default=2)
+    parser.add_argument('--density', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--interval', type=int, default=30)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--page-limit', type=int)
+    parser.add_argument('--timeout', type=int, default=10)
+    parser.add_argument('--lean', action='store_true')
+    parser.add_argument('--no-store', action='store_true', help="sans base SQLite (partitions du journal)")
+    parser.add_argument('--output', help="fichier JSON Lines auquel ajouter le résultat")
+    parser.add_argument('--compare', help="fichier JSON Lines de résultats précédents")
+    args = parser.parse_args()
+
+    if args.backend == 'selenium' and not (shutil.which('chromedriver') or shutil.which('google-chrome')
+                                            or shutil.which('chromium')):
+        print("Chrome introuvable : benchmark Selenium ignoré")
+        return 0
+
+    report = run(args)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.compare and os.path.exists(args.compare):
+        compare(report, args.compare)
+    if args.output:
+        with open(args.output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    return 0 if report['correctness']['ok'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
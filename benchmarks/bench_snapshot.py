@@ -0,0 +1,87 @@
+"""
+Mode instantané (backend "snapshot") : une page par séance pour toutes les actions,
+contre le parcours par action et par fenêtre du backend HTTP.
+
+1. Les pages des cotations de fixtures (benchmarks/fixtures/cotations_*.html, écrites
+   à la main d'après la mise en page supposée du site, pas capturées) sont lues avec
+   parse_snapshot_html et comparées aux pages d'historique ; une page de week-end
+   (séance précédente affichée) doit être reconnue sans séance, une page d'une autre
+   mise en page (sans table ou sans date de séance) doit être refusée.
+2. scrape_data est lancé dans les deux modes contre le serveur local : nombre de
+   pages, durée et exactitude du résultat.
+
+Usage : python benchmarks/bench_snapshot.py [nb_actions] [nb_annees] [latence_ms]
+"""
+import argparse
+import glob
+import os
+import sys
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+from brvm_snapshot import SnapshotBackend
+from fixture_server import FIXTURES_DIR, RecordedSite, expected_frame
+from bench_scraper import check_output, run
+
+
+def check_fixtures():
+    """Compare chaque page des cotations de fixtures aux historiques de fixtures"""
+    site = RecordedSite()
+    backend = SnapshotBackend()
+    backend.tickers = {name: code for code, name in site.tickers}
+    ok = True
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, 'cotations_*.html'))):
+        day = datetime.strptime(os.path.basename(path)[len('cotations_'):-len('.html')], '%Y-%m-%d').date()
+        with open(path, encoding='utf-8') as f:
+            data = backend.parse_day(day, f.read())
+        expected = expected_frame(site, day, day)
+        if data is None:
+            result = {'ok': expected.empty, 'records': 0, 'expected': len(expected)}
+        else:
+            result = check_output(data, expected)
+        ok &= result['ok']
+        print(f"{os.path.basename(path):<28} {'séance' if data is not None else 'sans séance':<12} "
+              f"{result['records']:>4} lignes / {result['expected']:>4} attendues  {'OK' if result['ok'] else 'ÉCART'}")
+
+    # Mise en page inattendue : erreur, jamais un jour sans séance
+    for name, page in (('sans table', '<html><body><span id="dateSeance">31/03/2023</span></body></html>'),
+                       ('sans date de séance', '<html><body><table id="tblcotations"></table></body></html>')):
+        try:
+            backend.parse_day(datetime(2023, 3, 31).date(), page)
+            refused = False
+        except ValueError:
+            refused = True
+        ok &= refused
+        print(f"{'page ' + name:<41} {'refusée' if refused else 'acceptée':>24}  {'OK' if refused else 'ÉCART'}")
+    backend.close()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('tickers', nargs='?', type=int, default=40)
+    parser.add_argument('years', nargs='?', type=int, default=1)
+    parser.add_argument('latency_ms', nargs='?', type=float, default=20)
+    options = parser.parse_args()
+
+    ok = check_fixtures()
+    print(f"\n{options.tickers} actions x {options.years} an(s), latence {options.latency_ms:.0f} ms")
+    print(f"{'mode':<10}{'pages':>8}{'durée (s)':>12}{'pages/s':>10}  exactitude")
+    for backend in ('http', 'snapshot'):
+        args = argparse.Namespace(
+            backend=backend, tickers=options.tickers, years=options.years, density=1.0, seed=0,
+            interval=30, workers=1, latency_ms=options.latency_ms, error_rate=0.0, page_limit=None,
+            timeout=10, lean=False, no_store=False,
+        )
+        report = run(args)
+        pages = report['counters'].get('pages', 0)
+        correctness = report['correctness']
+        ok &= correctness['ok']
+        print(f"{backend:<10}{pages:>8}{report['elapsed_s']:>12.2f}{pages / report['elapsed_s']:>10.1f}  "
+              f"{'OK' if correctness['ok'] else 'ÉCART'} ({correctness['records']}/{correctness['expected']})")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark du démarrage : temps d'import de BRVM_scraper et temps jusqu'à la
+première fenêtre de l'interface. Chaque mesure est faite dans un nouveau
+processus Python (médiane de plusieurs essais).
+
+Usage : python benchmarks/bench_startup.py [--runs N] [--max-import-ms MS] [--max-window-ms MS]
+Le code de sortie vaut 1 si un seuil est dépassé ou si un module lourd est chargé à l'import.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('pandas', 'numpy', 'selenium', 'lxml', 'bs4', 'requests')
+
+IMPORT_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import BRVM_scraper
+elapsed = time.perf_counter() - t0
+print(json.dumps({'import': elapsed, 'heavy': [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+WINDOW_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError as e:
+    print(json.dumps({'error': str(e)}))
+    raise SystemExit
+import brvm_gui
+app = brvm_gui.BRVMScraperGUI(root)
+root.update()
+elapsed = time.perf_counter() - t0
+root.destroy()
+print(json.dumps({'window': elapsed}))
+"""
+
+
+def probe(code):
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT_DIR,
+        capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()
+    return json.loads(output[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-import-ms', type=float, default=200)
+    parser.add_argument('--max-window-ms', type=float, default=1500)
+    args = parser.parse_args()
+    failed = False
+
+    imports = [probe(IMPORT_PROBE) for _ in range(args.runs)]
+    import_ms = statistics.median(r['import'] for r in imports) * 1000
+    heavy = sorted({m for r in imports for m in r['heavy']})
+    print(f"import BRVM_scraper      : {import_ms:8.1f} ms (seuil {args.max_import_ms:.0f} ms)")
+    if heavy:
+        print(f"⚠ modules lourds chargés à l'import : {', '.join(heavy)}")
+        failed = True
+    failed |= import_ms > args.max_import_ms
+
+    windows = [probe(WINDOW_PROBE) for _ in range(args.runs)]
+    if 'error' in windows[0]:
+        print(f"première fenêtre         : non mesurée (pas d'affichage : {windows[0]['error']})")
+    else:
+        window_ms = statistics.median(r['window'] for r in windows) * 1000
+        print(f"première fenêtre         : {window_ms:8.1f} ms (seuil {args.max_window_ms:.0f} ms)")
+        failed |= window_ms > args.max_window_ms
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
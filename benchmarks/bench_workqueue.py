@@ -0,0 +1,136 @@
+"""
+File partagée (brvm_cli.py queue) : plusieurs processus workers se partagent un
+rattrapage d'historique contre le serveur local, puis la base commune est exportée.
+
+1. Même rattrapage avec 1 puis N workers : durée, répartition des fenêtres et exactitude.
+2. Panne : un worker est tué (SIGKILL) pendant qu'il détient des baux ; ses fenêtres
+   doivent être reprises par les autres à l'expiration des baux, sans perte ni doublon.
+
+Usage : python benchmarks/bench_workqueue.py [--tickers N] [--years N] [--workers N]
+        [--latency-ms MS] [--error-rate R] [--lease S]
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.append(ROOT_DIR)
+from brvm_workqueue import WorkQueue
+from fixture_server import SyntheticSite, bench_workdir, expected_frame, serving
+from bench_scraper import check_output
+
+CLI = os.path.join(ROOT_DIR, 'brvm_cli.py')
+
+
+def cli(workdir, *args):
+    """Lance brvm_cli.py dans workdir et renvoie le processus (logs écartés)"""
+    return subprocess.Popen(
+        [sys.executable, CLI, *args, '--backend', 'http', '--config', 'config.json'],
+        cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+
+
+def cli_json(workdir, *args):
+    out, _ = cli(workdir, *args).communicate()
+    return json.loads(out)
+
+
+def leased_by(path, worker):
+    queue = WorkQueue(path)
+    try:
+        return queue.conn.execute(
+            "SELECT COUNT(*) FROM tasks WHERE status = 'leased' AND worker = ?", (worker,)
+        ).fetchone()[0]
+    finally:
+        queue.close()
+
+
+def scenario(base_url, site, start, end, options, workers, kill=False):
+    import pandas as pd
+
+    with bench_workdir(prefix='brvm_bench_queue_', chdir=False) as workdir:
+        with open(os.path.join(workdir, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump({'base_url': base_url, 'raw_cache': None, 'metrics_trace': False,
+                       'queue_lease_seconds': options.lease, 'queue_batch': 4, 'queue_poll_seconds': 0.2,
+                       'retry_delay': 0.2, 'retry_attempts': 5}, f)
+        init = cli_json(workdir, 'queue', 'init', '--start', start.isoformat(), '--end', end.isoformat(),
+                        '--interval', '30')
+
+        t0 = time.perf_counter()
+        killed = 0
+        if kill:
+            # La victime réserve des baux puis meurt sans les rendre
+            victim = cli(workdir, 'queue', 'work', '--name', 'victime')
+            while not leased_by(os.path.join(workdir, 'stock_data_queue.db'), 'victime'):
+                time.sleep(0.05)
+            time.sleep(0.3)
+            killed = leased_by(os.path.join(workdir, 'stock_data_queue.db'), 'victime')
+            victim.send_signal(signal.SIGKILL)
+            victim.wait()
+        processes = [cli(workdir, 'queue', 'work', '--name', f'w{i + 1}') for i in range(workers)]
+        for process in processes:
+            process.communicate()
+        elapsed = time.perf_counter() - t0
+
+        status = cli_json(workdir, 'queue', 'status')
+        export = cli_json(workdir, 'queue', 'export')
+        data = pd.read_csv(os.path.join(workdir, 'stock_data.csv'), encoding='utf-8-sig') \
+            if os.path.exists(os.path.join(workdir, 'stock_data.csv')) else pd.DataFrame()
+
+    return {
+        'workers': workers,
+        'killed_leases': killed,
+        'tasks': init['planned'],
+        'elapsed_s': elapsed,
+        'queue': status['queue'],
+        'done_by_worker': status['done_by_worker'],
+        'exit_code': export['exit_code'],
+        'correctness': check_output(data, expected_frame(site, start, end)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tickers', type=int, default=20)
+    parser.add_argument('--years', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--lease', type=int, default=3, help="durée des baux en secondes")
+    options = parser.parse_args()
+
+    end = date(2023, 12, 31)
+    start = date(end.year - options.years + 1, 1, 1)
+    site = SyntheticSite(options.tickers, start=start, end=end, seed=0)
+    with serving(site=site, latency=options.latency_ms / 1000, error_rate=options.error_rate) as base_url:
+        reports = [
+            ('1 worker', scenario(base_url, site, start, end, options, 1)),
+            (f'{options.workers} workers', scenario(base_url, site, start, end, options, options.workers)),
+            (f'{options.workers} workers + panne', scenario(base_url, site, start, end, options, options.workers,
+                                                            kill=True)),
+        ]
+
+    print(f"{options.tickers} actions x {options.years} an(s), latence {options.latency_ms:.0f} ms, "
+          f"erreurs {options.error_rate:.0%}, baux de {options.lease}s")
+    print(f"{'scénario':<24}{'tâches':>8}{'durée (s)':>11}{'reprises':>10}{'abandons':>10}  exactitude  répartition")
+    ok = True
+    for name, report in reports:
+        correctness = report['correctness']
+        ok &= correctness['ok'] and report['queue']['done'] == report['tasks']
+        print(f"{name:<24}{report['tasks']:>8}{report['elapsed_s']:>11.2f}{report['queue']['reclaimed']:>10}"
+              f"{report['queue']['dead']:>10}  {'OK' if correctness['ok'] else 'ÉCART'} "
+              f"({correctness['records']}/{correctness['expected']})  "
+              + ", ".join(f"{worker} {count}" for worker, count in report['done_by_worker'].items()))
+        if report['killed_leases']:
+            print(f"{'':<24}victime tuée avec {report['killed_leases']} baux en cours")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,436 @@
+"""
+Serveur local qui remplace sikafinance.com pour les benchmarks et les vérifications
+hors ligne. Il imite la page principale (liste 'dpShares' et lien HISTORIQUES),
+la vue HISTORIQUES (champs datefrom / dateto, bouton btnChange, table 'tblhistos',
+alerte "Pas de données"), la requête rejouée par le backend HTTP et la page des
+cotations d'une séance pour toutes les actions (backend "snapshot").
+
+Deux sources de données :
+- RecordedSite : pages de benchmarks/fixtures, écrites à la main d'après la mise en
+  page supposée du site (pas des captures) ;
+- SyntheticSite : données générées de façon déterministe (nombre d'actions,
+  période et densité de cotation configurables).
+La latence, le taux d'erreurs et la limite de lignes par page sont réglables.
+
+Usage : python benchmarks/fixture_server.py [port] [--synthetic N] [--latency-ms MS] [--error-rate R]
+"""
+import argparse
+import bisect
+import contextlib
+import hashlib
+import html
+import os
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+ARTICLES_PATH = "/premium/articles"
+HISTOS_PREFIX = "/marches/historiques/"
+SNAPSHOT_PATH = "/marches/cotations"
+NO_DATA_MESSAGE = "Pas de données à ces dates là"
+# Séances renvoyées par un site qui ignore les dates demandées (start_server(ignore_dates=True))
+DEFAULT_ROWS = 20
+HEADERS = ['Date', 'Ouverture', 'Plus Haut', 'Plus Bas', 'Clôture', 'Volume', 'Capitalisation']
+
+OPTION_RE = re.compile(r'<option value="([^"]+)">([^<]+)</option>')
+TH_RE = re.compile(r'<th>(.*?)</th>', re.S)
+ROW_RE = re.compile(r'<tr><td>(\d{2}/\d{2}/\d{4})</td>(.*?)</tr>', re.S)
+TD_RE = re.compile(r'<td>(.*?)</td>', re.S)
+SESSIONS_LOCK = threading.Lock()
+
+
+def format_number(value, decimals=2):
+    """Format du site : espace insécable pour les milliers, virgule décimale"""
+    text = f"{value:,.{decimals}f}" if decimals else f"{int(value):,d}"
+    return text.replace(',', '&nbsp;').replace('.', ',')
+
+
+class RecordedSite:
+    """Données lues dans les pages synthétiques de benchmarks/fixtures"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR):
+        self.fixtures_dir = fixtures_dir
+        with open(os.path.join(fixtures_dir, 'articles.html'), encoding='utf-8') as f:
+            self.tickers = OPTION_RE.findall(f.read())
+        self.headers = HEADERS
+        self.histories = {}
+        for code, _ in self.tickers:
+            path = os.path.join(fixtures_dir, f'historiques_{code}.html')
+            with open(path, encoding='utf-8') as f:
+                page = f.read()
+            self.headers = [h.strip() for h in TH_RE.findall(page)]
+            self.histories[code] = [
+                (datetime.strptime(day, '%d/%m/%Y').date(), [day] + TD_RE.findall(cells))
+                for day, cells in ROW_RE.findall(page)
+            ]
+
+    def history(self, code):
+        """Lignes (date, cellules HTML) de la plus récente à la plus ancienne"""
+        return self.histories.get(code)
+
+    def saved_snapshot(self, day):
+        """Page des cotations de fixtures pour ce jour (cotations_AAAA-MM-JJ.html), ou None"""
+        path = os.path.join(self.fixtures_dir, f'cotations_{day.isoformat()}.html')
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+
+class SyntheticSite:
+    """
+    Données générées de façon déterministe : chaque action cote les jours ouvrés
+    de la période avec une probabilité density (actions peu liquides si density < 1).
+    """
+
+    def __init__(self, tickers=40, start=date(2010, 1, 1), end=None, density=1.0, seed=0):
+        self.headers = HEADERS
+        self.start = start
+        self.end = end or date.today()
+        self.density = density
+        self.seed = seed
+        self.tickers = [(f"T{i:03d}", f"VALEUR SYNTHETIQUE {i:03d}") for i in range(tickers)]
+        self.histories = {}
+        self._lock = threading.Lock()
+
+    def generate(self, code):
+        digest = hashlib.sha256(f"{self.seed}:{code}".encode()).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+        price = rng.uniform(500, 30000)
+        rows = []
+        day = self.start
+        while day <= self.end:
+            if day.weekday() < 5 and rng.random() < self.density:
+                close = round(price * rng.uniform(0.97, 1.03), 2)
+                high = round(max(price, close) * rng.uniform(1.0, 1.01), 2)
+                low = round(min(price, close) * rng.uniform(0.99, 1.0), 2)
+                volume = rng.randint(0, 20000)
+                cells = [
+                    day.strftime('%d/%m/%Y'), format_number(price), format_number(high),
+                    format_number(low), format_number(close), format_number(volume, 0),
+                    format_number(round(close * volume), 0),
+                ]
+                rows.append((day, cells))
+                price = close
+            day += timedelta(days=1)
+        rows.reverse()
+        return rows
+
+    def history(self, code):
+        if code not in dict(self.tickers):
+            return None
+        with self._lock:
+            if code not in self.histories:
+                self.histories[code] = self.generate(code)
+            return self.histories[code]
+
+
+def expected_frame(site, start, end):
+    """Données attendues après scraping de [start, end] (même format que raw_frame)"""
+    import pandas as pd
+
+    records = []
+    for code, name in site.tickers:
+        for day, cells in site.history(code):
+            if start <= day <= end:
+                values = [html.unescape(c).replace('\xa0', '').replace(',', '.') for c in cells[1:]]
+                records.append([cells[0]] + [float(v) for v in values] + [name])
+    return pd.DataFrame(records, columns=site.headers + ['ACTION'])
+
+
+def session_rows(site, day):
+    """
+    Séance affichée par la page des cotations pour le jour demandé : la dernière
+    séance à cette date ou avant (le site montre la précédente les jours fériés).
+    Renvoie (date de séance, [(code, libellé, cellules)]) ou (None, []).
+    """
+    with SESSIONS_LOCK:
+        if getattr(site, 'sessions', None) is None:
+            sessions = {}
+            for code, name in site.tickers:
+                for row_day, cells in site.history(code):
+                    sessions.setdefault(row_day, []).append((code, name, cells))
+            site.sessions = sessions
+            site.session_days = sorted(sessions)
+    i = bisect.bisect_right(site.session_days, day)
+    if not i:
+        return None, []
+    session = site.session_days[i - 1]
+    return session, site.sessions[session]
+
+
+def render_rows(rows):
+    return "\n".join(
+        "        <tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+        for _, cells in rows
+    )
+
+
+def render_select(site, selected=None, onchange=""):
+    options = ['          <option value="">-- Choisir une valeur --</option>']
+    for code, name in site.tickers:
+        mark = ' selected' if code == selected else ''
+        options.append(f'          <option value="{code}"{mark}>{html.escape(name)}</option>')
+    return (f'<select id="dpShares" name="dpShares" onchange="{onchange}">\n'
+            + "\n".join(options) + "\n      </select>")
+
+
+def render_articles(site):
+    first = site.tickers[0][0] if site.tickers else ''
+    select = render_select(site, onchange="document.getElementById('lnkHisto').href = '/marches/historiques/' + this.value;")
+    return f'''<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>Articles premium - Sikafinance</title></head>
+<body>
+  <div class="bloc_recherche">
+      {select}
+  </div>
+  <ul class="menu_valeur">
+    <li><a href="#">COTATION</a></li>
+    <li><a id="lnkHisto" href="{HISTOS_PREFIX}{first}">HISTORIQUES</a></li>
+  </ul>
+</body>
+</html>
+'''
+
+
+HISTOS_SCRIPT = """
+  <script>
+  document.getElementById('btnChange').addEventListener('click', function () {
+    var url = window.location.pathname + '?fragment=1'
+      + '&datefrom=' + encodeURIComponent(document.getElementById('datefrom').value)
+      + '&dateto=' + encodeURIComponent(document.getElementById('dateto').value);
+    var xhr = new XMLHttpRequest();
+    xhr.open('GET', url);
+    xhr.onload = function () {
+      var notif = document.querySelector('.notif_err');
+      var msg = document.getElementById('alertMsg');
+      var body = document.querySelector('#tblhistos tbody');
+      if (xhr.status === 204) {
+        body.innerHTML = '';
+        msg.textContent = '""" + NO_DATA_MESSAGE + """';
+        notif.style.display = 'block';
+        setTimeout(function () { notif.style.display = 'none'; }, 2000);
+      } else if (xhr.status === 200) {
+        notif.style.display = 'none';
+        body.innerHTML = xhr.responseText;
+      }
+    };
+    xhr.send();
+  });
+  </script>
+"""
+
+
+def render_histos(site, code, rows, no_data=False, date_from='', date_to=''):
+    alert = (f'<div class="notif_err" style="display:block"><span id="alertMsg">{NO_DATA_MESSAGE}</span></div>'
+             if no_data else '<div class="notif_err" style="display:none"><span id="alertMsg"></span></div>')
+    headers = "".join(f"<th>{h}</th>" for h in site.headers)
+    select = render_select(site, selected=code, onchange="if (this.value) { window.location.href = '/marches/historiques/' + this.value; }")
+    return f'''<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>{code} - Historiques - Sikafinance</title></head>
+<body>
+  <div class="bloc_recherche">
+      {select}
+  </div>
+  <ul class="menu_valeur">
+    <li><a href="#">COTATION</a></li>
+    <li><a href="{HISTOS_PREFIX}{code}">HISTORIQUES</a></li>
+  </ul>
+  <div class="histo_form">
+    <input type="date" id="datefrom" name="datefrom" value="{date_from}">
+    <input type="date" id="dateto" name="dateto" value="{date_to}">
+    <button id="btnChange" type="button">Changer</button>
+  </div>
+  {alert}
+  <table id="tblhistos" class="tbl_histo">
+    <thead>
+      <tr>{headers}</tr>
+    </thead>
+    <tbody>
+{render_rows(rows)}
+    </tbody>
+  </table>
+{HISTOS_SCRIPT}
+</body>
+</html>
+'''
+
+
+def render_snapshot(site, session, rows):
+    """Page des cotations de toutes les actions pour une séance (ou sans séance)"""
+    headers = "".join(f"<th>{h}</th>" for h in ['Code', 'Valeur'] + site.headers[1:])
+    body = "\n".join(
+        "        <tr>" + "".join(f"<td>{cell}</td>" for cell in [code, html.escape(name)] + cells[1:]) + "</tr>"
+        for code, name, cells in rows
+    )
+    seance = session.strftime('%d/%m/%Y') if session else ''
+    alert = '' if session else f'<div class="notif_err"><span id="alertMsg">{NO_DATA_MESSAGE}</span></div>'
+    return f'''<!DOCTYPE html>
+<html lang="fr">
+<head><meta charset="utf-8"><title>Cotations - Sikafinance</title></head>
+<body>
+  <div class="seance">Séance du <span id="dateSeance">{seance}</span></div>
+  {alert}
+  <table id="tblcotations" class="tbl_cotations">
+    <thead>
+      <tr>{headers}</tr>
+    </thead>
+    <tbody>
+{body}
+    </tbody>
+  </table>
+</body>
+</html>
+'''
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    site = None
+    latency = 0.0
+    error_rate = 0.0
+    page_limit = None
+    ignore_dates = False
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if url.path == ARTICLES_PATH:
+            return self.respond(200, render_articles(self.site))
+        if url.path == SNAPSHOT_PATH:
+            return self.snapshot(params)
+        if not url.path.startswith(HISTOS_PREFIX):
+            return self.respond(404, '<html><body>Not found</body></html>')
+
+        code = url.path[len(HISTOS_PREFIX):]
+        history = self.site.history(code)
+        if history is None:
+            return self.respond(404, '<html><body>Not found</body></html>')
+        if 'datefrom' not in params:
+            return self.respond(200, render_histos(self.site, code, []))
+
+        with self.rng_lock:
+            failed = self.rng.random() < self.error_rate
+        if failed:
+            return self.respond(500, '<html><body>Erreur serveur</body></html>')
+
+        date_from = datetime.strptime(params['datefrom'], '%Y-%m-%d').date()
+        date_to = datetime.strptime(params.get('dateto') or '9999-12-31', '%Y-%m-%d').date()
+        if self.ignore_dates:
+            # Site qui ne tient pas compte des dates : toujours ses dernières séances
+            rows = history[:DEFAULT_ROWS]
+        else:
+            rows = [row for row in history if date_from <= row[0] <= date_to]
+        if self.page_limit:
+            rows = rows[:self.page_limit]
+
+        if params.get('fragment'):
+            return self.respond(200, render_rows(rows)) if rows else self.respond(204, '')
+        return self.respond(200, render_histos(
+            self.site, code, rows, no_data=not rows,
+            date_from=params['datefrom'], date_to=params.get('dateto', '')
+        ))
+
+    def snapshot(self, params):
+        with self.rng_lock:
+            failed = self.rng.random() < self.error_rate
+        if failed:
+            return self.respond(500, '<html><body>Erreur serveur</body></html>')
+        day = datetime.strptime(params['date'], '%Y-%m-%d').date() if params.get('date') else date.today()
+        saved = getattr(self.site, 'saved_snapshot', lambda day: None)(day)
+        if saved is not None:
+            return self.respond(200, saved)
+        return self.respond(200, render_snapshot(self.site, *session_rows(self.site, day)))
+
+    def respond(self, status, page):
+        body = page.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=0, site=None, latency=0.0, error_rate=0.0, page_limit=None, seed=0, ignore_dates=False):
+    """
+    Démarre le serveur dans un thread ; renvoie (serveur, url de base).
+    ignore_dates : l'historique ne tient pas compte de datefrom / dateto (renvoie toujours
+    les DEFAULT_ROWS dernières séances), pour vérifier que le scraper le détecte.
+    """
+    handler = type('ConfiguredFixtureHandler', (FixtureHandler,), {
+        'site': site or RecordedSite(),
+        'latency': latency,
+        'error_rate': error_rate,
+        'page_limit': page_limit,
+        'ignore_dates': ignore_dates,
+        'rng': random.Random(seed),
+        'rng_lock': threading.Lock(),
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@contextlib.contextmanager
+def serving(**options):
+    """Serveur démarré le temps du bloc (options de start_server) ; fournit son url de base"""
+    server, base_url = start_server(**options)
+    try:
+        yield base_url
+    finally:
+        server.shutdown()
+
+
+@contextlib.contextmanager
+def bench_workdir(prefix='brvm_bench_', chdir=True):
+    """
+    Répertoire temporaire où le scraper écrit ses fichiers (CSV, base, index) ; avec
+    chdir, il devient le répertoire courant le temps du bloc. Supprimé à la sortie.
+    """
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix=prefix)
+    try:
+        if chdir:
+            os.chdir(workdir)
+        yield workdir
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serveur local imitant sikafinance.com")
+    parser.add_argument('port', nargs='?', type=int, default=8765)
+    parser.add_argument('--synthetic', type=int, metavar='N', help="N actions synthétiques au lieu des pages de fixtures")
+    parser.add_argument('--density', type=float, default=1.0)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--page-limit', type=int)
+    args = parser.parse_args()
+
+    site = SyntheticSite(args.synthetic, density=args.density) if args.synthetic else RecordedSite()
+    server, base_url = start_server(args.port, site, args.latency_ms / 1000, args.error_rate, args.page_limit)
+    print(f"Serveur de fixtures sur {base_url} (Ctrl+C pour arrêter)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
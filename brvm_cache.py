@@ -0,0 +1,171 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+# Types de réponse : fragment HTML de 'tblhistos' (backend HTTP), cellules lues dans
+# le navigateur (backend Selenium) ou "Pas de données à ces dates là"
+KINDS = ('html', 'cells', 'empty')
+
+def encode_payload(kind, payload):
+    if kind == 'html':
+        return payload.encode('utf-8')
+    if kind == 'cells':
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return b''
+
+def decode_payload(kind, data):
+    if kind == 'html':
+        return data.decode('utf-8')
+    if kind == 'cells':
+        return json.loads(data.decode('utf-8'))
+    return None
+
+def is_table(kind, payload):
+    """
+    Vrai si la réponse contient une table (fragment HTML ou en-têtes lus dans le
+    navigateur), ou le message explicite 'Pas de données' : seules ces réponses sont
+    mises en cache. Une page sans table (erreur du site, consentement) n'est pas une fenêtre.
+    """
+    if kind == 'empty':
+        return True
+    if kind == 'html':
+        return bool(payload)
+    return bool(payload and payload.get('headers'))
+
+class RawCache:
+    """
+    Cache des réponses brutes de la table 'tblhistos', compressées (gzip) et adressées
+    par leur contenu : objects/<ab>/<sha256>.gz, un contenu identique n'est stocké
+    qu'une fois. Un index SQLite associe (action, date_from, date_to) au condensat.
+    Seule une fenêtre récupérée après sa clôture (date_to antérieure de plus de closed_days
+    à la récupération) est relue : elle est immuable. Une fenêtre encore ouverte est
+    toujours redemandée au site (une séance a pu s'y ajouter depuis), sa réponse en
+    cache ne sert qu'à la reconstruction hors ligne (reparse).
+    Sur un stockage réseau partagé entre machines, wal=False (journal DELETE).
+    """
+    def __init__(self, root='stock_data_cache', closed_days=7, wal=True):
+        self.root = root
+        self.closed_days = closed_days
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(root, 'index.db'), timeout=30, check_same_thread=False)
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS windows ("
+            "action TEXT NOT NULL, date_from TEXT NOT NULL, date_to TEXT NOT NULL, "
+            "kind TEXT NOT NULL, digest TEXT NOT NULL, fetched_at TEXT NOT NULL, "
+            "PRIMARY KEY (action, date_from, date_to)) WITHOUT ROWID"
+        )
+        self.conn.commit()
+
+    def object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.gz')
+
+    def closed(self, date_to, fetched_at):
+        """La fenêtre était-elle close (plus modifiable par le site) lors de sa récupération ?"""
+        limit = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=self.closed_days)
+        return fetched_at >= limit
+
+    def get(self, action, date_from, date_to):
+        """Réponse en cache (kind, payload) d'une fenêtre close, sinon None"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT kind, digest, fetched_at FROM windows WHERE action = ? AND date_from = ? AND date_to = ?",
+                (action, date_from, date_to)
+            ).fetchone()
+        if row is None:
+            return None
+        kind, digest, fetched_at = row
+        if not self.closed(date_to, datetime.fromisoformat(fetched_at)):
+            return None
+        try:
+            payload = self.read_object(kind, digest)
+        except OSError:
+            # Objet supprimé à la main : la fenêtre sera récupérée à nouveau
+            return None
+        # Page sans table mise en cache par une version précédente : récupérée à nouveau
+        return (kind, payload) if is_table(kind, payload) else None
+
+    def read_object(self, kind, digest):
+        with gzip.open(self.object_path(digest), 'rb') as f:
+            return decode_payload(kind, f.read())
+
+    def put(self, action, date_from, date_to, kind, payload, fetched_at=None):
+        """Enregistre la réponse d'une fenêtre ; renvoie son condensat"""
+        if kind not in KINDS:
+            raise ValueError(f"Type de réponse inconnu : {kind}")
+        if not is_table(kind, payload):
+            raise ValueError("Réponse sans table : non mise en cache")
+        data = encode_payload(kind, payload)
+        digest = hashlib.sha256(kind.encode('ascii') + b'\0' + data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(gzip.compress(data, mtime=0))
+            os.replace(tmp_path, path)
+        fetched_at = (fetched_at or datetime.now()).isoformat(timespec='seconds')
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO windows (action, date_from, date_to, kind, digest, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (action, date_from, date_to, kind, digest, fetched_at)
+            )
+        return digest
+
+    def actions(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT action FROM windows ORDER BY action")]
+
+    def count(self, actions=None):
+        sql, params = "SELECT COUNT(*) FROM windows", []
+        if actions is not None:
+            sql += f" WHERE action IN ({', '.join('?' for _ in actions)})"
+            params = list(actions)
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()[0]
+
+    def entries(self, actions=None):
+        """
+        Parcourt les fenêtres en cache, les plus anciennes récupérations d'abord
+        (une fenêtre récupérée plus tard l'emporte donc en cas de recouvrement).
+        Renvoie des tuples (action, date_from, date_to, kind, payload).
+        """
+        sql = "SELECT action, date_from, date_to, kind, digest FROM windows"
+        params = []
+        if actions is not None:
+            sql += f" WHERE action IN ({', '.join('?' for _ in actions)})"
+            params = list(actions)
+        sql += " ORDER BY fetched_at, action, date_from"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        for action, date_from, date_to, kind, digest in rows:
+            try:
+                payload = self.read_object(kind, digest)
+            except OSError:
+                continue
+            if not is_table(kind, payload):
+                continue
+            yield action, date_from, date_to, kind, payload
+
+    def stats(self):
+        """Nombre de fenêtres indexées, d'objets distincts et taille compressée (octets)"""
+        with self._lock:
+            windows = self.conn.execute("SELECT COUNT(*) FROM windows").fetchone()[0]
+        objects, size = 0, 0
+        for directory, _, names in os.walk(os.path.join(self.root, 'objects')):
+            for name in names:
+                if name.endswith('.gz'):
+                    objects += 1
+                    size += os.path.getsize(os.path.join(directory, name))
+        return {'windows': windows, 'objects': objects, 'bytes': size}
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,391 @@
+"""
+Ligne de commande du scraper BRVM, sans interface graphique.
+
+  python brvm_cli.py scrape --start 2023-01-01 [--end 2024-06-30] [--tickers SNTS,BICC] ...
+  python brvm_cli.py daily [--at 17:30] [--once]
+  python brvm_cli.py reparse [--tickers SNTS]   (reconstruction hors ligne depuis le cache)
+  python brvm_cli.py tickers [--refresh]        (liste des actions en cache)
+  python brvm_cli.py queue init --start 2010-01-01 [--end ...]   (rattrapage partagé :
+  python brvm_cli.py queue work [--name W1]       fenêtres mises en file, un ou plusieurs
+  python brvm_cli.py queue status                 workers par machine, puis export de
+  python brvm_cli.py queue export                 la base commune)
+
+Les logs sont écrits sur la sortie d'erreur et le résumé JSON du run sur la
+sortie standard (et dans --summary-file). Codes de sortie : voir EXIT_CODES.
+"""
+import argparse
+import contextlib
+import json
+import os
+import re
+import signal
+import sys
+import threading
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from brvm_files import write_json_atomic
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_PARTIAL = 3
+EXIT_INTERRUPTED = 130
+EXIT_CODES = {
+    EXIT_OK: 'succès',
+    EXIT_FAILED: 'échec (aucune donnée ou erreur)',
+    EXIT_USAGE: 'arguments invalides',
+    EXIT_PARTIAL: 'succès partiel (fenêtres irrécupérables)',
+    EXIT_INTERRUPTED: 'interrompu',
+}
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"date invalide '{value}' (format AAAA-MM-JJ)")
+
+def parse_time(value):
+    try:
+        return datetime.strptime(value, '%H:%M').time()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"heure invalide '{value}' (format HH:MM)")
+
+def parse_tickers(values):
+    """--tickers accepte des listes séparées par des virgules, éventuellement répétées"""
+    if not values:
+        return None
+    return [ticker.strip() for value in values for ticker in value.split(',') if ticker.strip()]
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Scraper des cotations BRVM (sikafinance.com) en ligne de commande",
+        epilog="Codes de sortie : " + ", ".join(f"{code} = {label}" for code, label in EXIT_CODES.items())
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--tickers', action='append', metavar='LISTE',
+                        help="actions à scraper (codes ou libellés, séparés par des virgules) ; toutes par défaut")
+    common.add_argument('--backend', choices=('selenium', 'http', 'snapshot'), default='selenium')
+    common.add_argument('--workers', type=int, default=1, help="sessions parallèles")
+    common.add_argument('--format', dest='output_format', choices=('csv', 'parquet', 'feather'), default='csv',
+                        help="format de sortie")
+    common.add_argument('--timeout', type=int, default=10, help="délai d'attente en secondes")
+    common.add_argument('--retry-attempts', type=int, default=3)
+    common.add_argument('--lean', action='store_true', help="session Chrome légère")
+    common.add_argument('--show-browser', action='store_true', help="désactive le mode headless")
+    common.add_argument('--config', help="fichier JSON de configuration complémentaire (clés du scraper)")
+    common.add_argument('--summary-file', default='brvm_run_summary.json',
+                        help="fichier du résumé JSON du dernier run ('' pour ne pas l'écrire)")
+
+    scrape = commands.add_parser('scrape', parents=[common], help="scraping d'une période")
+    scrape.add_argument('--start', type=parse_date, required=True, help="date de début (AAAA-MM-JJ)")
+    scrape.add_argument('--end', type=parse_date, default=None, help="date de fin (défaut : aujourd'hui)")
+    scrape.add_argument('--interval', type=int, default=30, help="taille des fenêtres en jours")
+    scrape.add_argument('--incremental', action='store_true', help="ne scrape que les périodes manquantes")
+    scrape.add_argument('--adaptive', action='store_true', help="fenêtres adaptatives")
+
+    daily = commands.add_parser('daily', parents=[common],
+                                help="mise à jour incrémentale quotidienne après la clôture")
+    daily.add_argument('--at', type=parse_time, default=parse_time('17:30'),
+                       help="heure locale de lancement chaque jour de bourse (défaut 17:30)")
+    daily.add_argument('--lookback', type=int, default=7,
+                       help="jours relus à chaque mise à jour (couvre jours fériés et retards de publication)")
+    daily.add_argument('--once', action='store_true', help="une seule mise à jour immédiate (cron)")
+
+    commands.add_parser('reparse', parents=[common],
+                        help="reconstruit les données depuis le cache des réponses brutes, sans accès au site")
+
+    work_queue = commands.add_parser('queue', parents=[common],
+                                     help="rattrapage partagé entre plusieurs processus ou machines")
+    work_queue.add_argument('step', choices=('init', 'work', 'status', 'export'),
+                            help="init : met les fenêtres en file ; work : lance un worker ; "
+                                 "status : état de la file ; export : sortie consolidée")
+    work_queue.add_argument('--queue-file', help="base SQLite de la file (défaut stock_data_queue.db)")
+    work_queue.add_argument('--start', type=parse_date, help="date de début (init)")
+    work_queue.add_argument('--end', type=parse_date, default=None, help="date de fin (init ; défaut : aujourd'hui)")
+    work_queue.add_argument('--interval', type=int, default=30, help="taille des fenêtres en jours (init)")
+    work_queue.add_argument('--incremental', action='store_true', help="n'ajoute que les périodes manquantes (init)")
+    work_queue.add_argument('--name', help="nom du worker (défaut : machine-pid)")
+    work_queue.add_argument('--lease', type=int, help="durée des baux en secondes (défaut 120)")
+    work_queue.add_argument('--batch', type=int, help="fenêtres réservées par lot (défaut 10)")
+
+    tickers = commands.add_parser('tickers', parents=[common], help="liste des actions (code et libellé)")
+    tickers.add_argument('--refresh', action='store_true',
+                         help="relit la liste sur le site même si le cache est à jour")
+    return parser
+
+def build_config(args):
+    config = {}
+    if args.config:
+        with open(args.config, encoding='utf-8') as f:
+            config.update(json.load(f))
+    config.update({
+        'headless': not args.show_browser,
+        'timeout': args.timeout,
+        'retry_attempts': args.retry_attempts,
+        'backend': args.backend,
+        'workers': args.workers,
+        'output_format': args.output_format,
+        'lean_session': args.lean or config.get('lean_session', False),
+    })
+    if args.command == 'scrape':
+        config['incremental'] = args.incremental or config.get('incremental', False)
+        config['adaptive_windows'] = args.adaptive or config.get('adaptive_windows', False)
+    elif args.command == 'queue':
+        config['incremental'] = args.incremental or config.get('incremental', False)
+        for key, value in (('queue_file', args.queue_file), ('queue_lease_seconds', args.lease),
+                           ('queue_batch', args.batch)):
+            if value is not None:
+                config[key] = value
+    elif args.command == 'daily':
+        # Seules les séances récentes (refresh_days) sont rescrapées
+        config['incremental'] = True
+        config.setdefault('refresh_days', args.lookback)
+    return config
+
+def exit_code(result):
+    if result.get('cancelled'):
+        return EXIT_INTERRUPTED
+    if result.get('unknown_tickers'):
+        return EXIT_USAGE
+    if not result.get('success'):
+        return EXIT_FAILED
+    if result.get('failed_windows') or result.get('pending_windows'):
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+class StopOnSignal:
+    """
+    SIGINT / SIGTERM : arrêt coopératif du scraping en cours (données sauvegardées).
+    Un second signal interrompt immédiatement.
+    """
+    def __init__(self):
+        self.scraper = None
+        self.event = threading.Event()
+
+    def __enter__(self):
+        self.previous = {sig: signal.signal(sig, self.handle) for sig in (signal.SIGINT, signal.SIGTERM)}
+        return self
+
+    def __exit__(self, *exc):
+        for sig, handler in self.previous.items():
+            signal.signal(sig, handler)
+
+    def handle(self, signum, frame):
+        if self.event.is_set():
+            raise KeyboardInterrupt
+        self.event.set()
+        if self.scraper is not None:
+            threading.Thread(target=self.scraper.stop, daemon=True).start()
+
+def run_summary(scraper, result, started_at, summary_file, **fields):
+    """
+    Résumé JSON d'une commande : statut, horaires, paramètres (fields) puis résultat,
+    écrit dans summary_file s'il est donné. Une action demandée introuvable sur le
+    site fait échouer la commande (arguments invalides). Renvoie (code de sortie, résumé).
+    """
+    if scraper.unknown_tickers:
+        result = dict(result, unknown_tickers=scraper.unknown_tickers)
+    code = exit_code(result)
+    summary = {
+        'status': EXIT_CODES[code],
+        'exit_code': code,
+        'started_at': started_at.isoformat(timespec='seconds'),
+        'finished_at': datetime.now().isoformat(timespec='seconds'),
+    }
+    summary.update(fields)
+    summary.update({key: value for key, value in result.items() if key != 'success'})
+    if summary_file:
+        write_json_atomic(summary_file, summary, indent=1, default=str)
+    return code, summary
+
+def run_once(config, start_date, end_date, interval, tickers, stopper, summary_file, drivers=None):
+    """
+    Un run de scraping ; renvoie (code de sortie, résumé JSON).
+    drivers : gestionnaire de navigateurs partagé entre les runs (navigateur gardé chaud).
+    """
+    from BRVM_scraper import BRVMScraper
+
+    started_at = datetime.now()
+    scraper = BRVMScraper(config)
+    if drivers is not None:
+        scraper.drivers = drivers
+    stopper.scraper = scraper
+    try:
+        if stopper.event.is_set():
+            result = {'success': False, 'cancelled': True, 'message': 'Interrompu avant le démarrage'}
+        else:
+            result = scraper.scrape_data(start_date, end_date, interval, tickers=tickers)
+    except Exception as e:
+        result = {'success': False, 'message': f'Erreur inattendue: {e}'}
+    finally:
+        stopper.scraper = None
+
+    return run_summary(
+        scraper, result, started_at, summary_file,
+        start_date=start_date.strftime('%Y-%m-%d'),
+        end_date=end_date.strftime('%Y-%m-%d'),
+        interval_days=interval,
+        tickers=tickers,
+        backend=config.get('backend'),
+        workers=config.get('workers'),
+        output_format=config.get('output_format'),
+    )
+
+def run_reparse(config, tickers, stopper, summary_file):
+    """Reconstruction hors ligne ; renvoie (code de sortie, résumé JSON)"""
+    from BRVM_scraper import BRVMScraper
+
+    started_at = datetime.now()
+    scraper = BRVMScraper(config)
+    stopper.scraper = scraper
+    try:
+        result = scraper.reparse_cache(tickers=tickers)
+    except Exception as e:
+        result = {'success': False, 'message': f'Erreur inattendue: {e}'}
+    finally:
+        stopper.scraper = None
+
+    return run_summary(scraper, result, started_at, summary_file,
+                       mode='reparse', tickers=tickers, output_format=config.get('output_format'))
+
+def run_queue(args, config, tickers, stopper, end_date):
+    """Étapes de la file partagée (init, work, status, export) ; renvoie (code de sortie, résumé JSON)"""
+    from BRVM_scraper import BRVMScraper
+    from brvm_workqueue import WorkQueue
+
+    started_at = datetime.now()
+    task_queue = WorkQueue.from_config(config)
+    scraper = BRVMScraper(config)
+    stopper.scraper = scraper
+    try:
+        if args.step == 'init':
+            result = scraper.enqueue_backfill(task_queue, args.start, end_date, args.interval, tickers=tickers)
+        elif args.step == 'work':
+            result = scraper.work_queue(task_queue, worker=args.name)
+        elif args.step == 'export':
+            result = scraper.export_queue(task_queue)
+        else:
+            result = {'success': True, 'queue': task_queue.stats(), 'done_by_worker': task_queue.done_by_worker()}
+    except Exception as e:
+        result = {'success': False, 'message': f'Erreur inattendue: {e}'}
+    finally:
+        stopper.scraper = None
+        task_queue.close()
+
+    summary_file = args.summary_file if args.step != 'status' else None
+    if args.step == 'work' and summary_file == 'brvm_run_summary.json':
+        # Plusieurs workers dans le même dossier : un résumé par worker
+        summary_file = "brvm_run_summary_" + re.sub(r'[^\w.-]', '_', str(result.get('worker', os.getpid()))) + ".json"
+    return run_summary(scraper, result, started_at, summary_file,
+                       mode=f'queue {args.step}', queue_file=task_queue.path)
+
+def run_tickers(args, config):
+    """Liste des actions du cache, relue sur le site si elle est absente, périmée ou si --refresh"""
+    from BRVM_scraper import BRVMScraper
+
+    scraper = BRVMScraper(config)
+    universe = scraper.ticker_universe()
+    try:
+        codes = scraper.refresh_universe() if args.refresh or not universe.fresh else universe.codes
+    except Exception as e:
+        return EXIT_FAILED, {'status': EXIT_CODES[EXIT_FAILED], 'exit_code': EXIT_FAILED,
+                             'message': f'Erreur inattendue: {e}'}
+    universe = scraper.ticker_universe()
+    return EXIT_OK, {
+        'refreshed_at': universe.refreshed_at.isoformat(timespec='seconds') if universe.refreshed_at else None,
+        'tickers': [{'code': code, 'name': name} for name, code in codes.items()],
+    }
+
+def last_trading_day(day):
+    """Dernier jour ouvré (lundi-vendredi) à la date day ou avant"""
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+def next_run(now, at):
+    """Prochaine date de lancement : jour ouvré, à l'heure at, strictement après now"""
+    candidate = datetime.combine(now.date(), at)
+    if candidate <= now:
+        candidate += timedelta(days=1)
+    while candidate.weekday() >= 5:
+        candidate += timedelta(days=1)
+    return candidate
+
+def run_daily(args, config, tickers, stopper, out):
+    """Mise à jour après la clôture : relit les derniers jours de chaque action et ajoute la dernière séance"""
+    def update(drivers=None):
+        end_date = datetime.combine(last_trading_day(datetime.now().date()), datetime.min.time())
+        start_date = end_date - timedelta(days=args.lookback)
+        # Une seule fenêtre par action
+        return run_once(config, start_date, end_date, args.lookback + 1, tickers, stopper, args.summary_file,
+                        drivers=drivers)
+
+    if args.once:
+        return update()
+
+    # Service : le navigateur reste ouvert (vérifié, recyclé si besoin) d'une mise à jour à l'autre
+    from brvm_driver import DriverManager
+    drivers = DriverManager.from_config(config, keep_warm=config.get('backend', 'selenium') == 'selenium')
+    code, summary = EXIT_OK, None
+    try:
+        while not stopper.event.is_set():
+            scheduled = next_run(datetime.now(), args.at)
+            print(f"⏰ Prochaine mise à jour : {scheduled:%Y-%m-%d %H:%M}", file=sys.stderr, flush=True)
+            if stopper.event.wait((scheduled - datetime.now()).total_seconds()):
+                return EXIT_INTERRUPTED, summary
+            code, summary = update(drivers)
+            print(json.dumps(summary, ensure_ascii=False, default=str), file=out, flush=True)
+        return EXIT_INTERRUPTED, summary
+    finally:
+        drivers.close()
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.timeout < 1:
+        parser.error("--workers et --timeout doivent être positifs")
+    if args.command == 'scrape':
+        end_date = args.end or datetime.combine(datetime.now().date(), datetime.min.time())
+        if args.start >= end_date:
+            parser.error("la date de début doit être antérieure à la date de fin")
+        if args.interval < 1:
+            parser.error("--interval doit être positif")
+    if args.command == 'daily' and args.lookback < 1:
+        parser.error("--lookback doit être positif")
+    if args.command == 'queue':
+        end_date = args.end or datetime.combine(datetime.now().date(), datetime.min.time())
+        if args.step == 'init' and (args.start is None or args.start >= end_date):
+            parser.error("queue init : --start est requis et doit être antérieur à la date de fin")
+        if args.interval < 1 or (args.lease is not None and args.lease < 1) or (args.batch is not None and args.batch < 1):
+            parser.error("--interval, --lease et --batch doivent être positifs")
+
+    try:
+        config = build_config(args)
+    except (OSError, ValueError) as e:
+        parser.error(f"configuration illisible : {e}")
+    tickers = parse_tickers(args.tickers)
+
+    # Logs sur la sortie d'erreur : la sortie standard ne contient que le résumé JSON
+    out = sys.stdout
+    with StopOnSignal() as stopper, contextlib.redirect_stdout(sys.stderr):
+        if args.command == 'scrape':
+            code, summary = run_once(config, args.start, end_date, args.interval, tickers,
+                                     stopper, args.summary_file)
+        elif args.command == 'reparse':
+            code, summary = run_reparse(config, tickers, stopper, args.summary_file)
+        elif args.command == 'tickers':
+            code, summary = run_tickers(args, config)
+        elif args.command == 'queue':
+            code, summary = run_queue(args, config, tickers, stopper, end_date)
+        else:
+            code, summary = run_daily(args, config, tickers, stopper, out)
+
+    if summary is not None and (args.command != 'daily' or args.once):
+        print(json.dumps(summary, ensure_ascii=False, default=str))
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
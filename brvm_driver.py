@@ -0,0 +1,210 @@
+import threading
+import time
+from collections import Counter
+
+# Options de la configuration qui changent le navigateur créé par setup_driver
+DRIVER_OPTIONS = ('headless', 'lean_session', 'profile_dir', 'blocked_urls', 'block_stylesheets', 'timeout')
+
+_psutil = None
+
+def load_psutil():
+    """psutil est optionnel : sans lui, le recyclage se fait au nombre de pages seulement"""
+    global _psutil
+    if _psutil is None:
+        try:
+            import psutil
+            _psutil = psutil
+        except ImportError:
+            _psutil = False
+    return _psutil or None
+
+def driver_rss_mb(driver):
+    """
+    Mémoire résidente (Mo) de chromedriver et de tous les processus Chrome qu'il a
+    lancés, ou None si elle n'est pas mesurable (psutil absent, processus terminé).
+    """
+    psutil = load_psutil()
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if psutil is None or process is None:
+        return None
+    try:
+        root = psutil.Process(process.pid)
+        total = root.memory_info().rss
+        for child in root.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+    except psutil.Error:
+        return None
+    return total / 2**20
+
+class DriverManager:
+    """
+    Cycle de vie des navigateurs. Avec keep_warm, un navigateur rendu en fin de run
+    reste ouvert et sert au run suivant (interface graphique, mise à jour quotidienne) :
+    il est vérifié avant d'être réutilisé et le run commence sans démarrage à froid.
+    Un navigateur est recyclé (fermé puis relancé) après max_pages pages chargées ou
+    au-delà de max_rss_mb Mo de mémoire résidente (avec psutil).
+    Les navigateurs sont rangés par clé (options du navigateur et numéro de worker).
+    Un navigateur chaud dont les options ne sont plus celles du run (réglages changés
+    dans l'interface après le préchauffage) est fermé par close_idle.
+    """
+    def __init__(self, keep_warm=True, max_pages=500, max_rss_mb=None):
+        self.keep_warm = keep_warm
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.idle = {}
+        self.info = {}
+        self.started = 0
+        self.reused = 0
+        self.recycled = Counter()
+        self.startup_times = []
+        self.recycle_times = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config, keep_warm=False):
+        return cls(
+            keep_warm=keep_warm,
+            max_pages=config.get('driver_max_pages', 500),
+            max_rss_mb=config.get('driver_max_rss_mb')
+        )
+
+    @staticmethod
+    def healthy(driver):
+        """La session répond-elle encore ?"""
+        try:
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def start(self, key, factory):
+        t0 = time.perf_counter()
+        driver = factory()
+        seconds = time.perf_counter() - t0
+        with self._lock:
+            self.info[driver] = {'key': key, 'pages': 0, 'started_at': time.time()}
+            self.started += 1
+            self.startup_times.append(seconds)
+        return driver
+
+    def acquire(self, key, factory, log=None):
+        """
+        Navigateur pour la clé key : le navigateur chaud s'il répond et n'a pas à être
+        recyclé, sinon un nouveau navigateur créé par factory().
+        Renvoie (driver, 'warm' | 'recycled' | 'started').
+        """
+        with self._lock:
+            driver = self.idle.pop(key, None)
+        if driver is not None:
+            t0 = time.perf_counter()
+            reason = self.recycle_reason(driver) or (None if self.healthy(driver) else ('session', "session perdue"))
+            if reason is None:
+                with self._lock:
+                    self.reused += 1
+                if log:
+                    log(f"🔥 Navigateur chaud réutilisé (vérifié en {(time.perf_counter() - t0) * 1000:.0f} ms)")
+                return driver, 'warm'
+            return self.recycle(driver, key, factory, reason, log), 'recycled'
+        return self.start(key, factory), 'started'
+
+    def note_page(self, driver):
+        info = self.info.get(driver)
+        if info is not None:
+            info['pages'] += 1
+
+    def pages(self, driver):
+        info = self.info.get(driver)
+        return info['pages'] if info else 0
+
+    def recycle_reason(self, driver):
+        """Motif de recyclage (type, message) : pages chargées ou mémoire ; None si inutile"""
+        pages = self.pages(driver)
+        if self.max_pages and pages >= self.max_pages:
+            return 'pages', f"{pages} pages chargées"
+        if self.max_rss_mb:
+            rss = driver_rss_mb(driver)
+            if rss is not None and rss >= self.max_rss_mb:
+                return 'memoire', f"{rss:.0f} Mo de mémoire"
+        return None
+
+    def recycle(self, driver, key, factory, reason, log=None):
+        """
+        Ferme driver et le remplace par un nouveau navigateur (reason : motif renvoyé
+        par recycle_reason) ; la durée de l'opération est mesurée.
+        """
+        t0 = time.perf_counter()
+        self.quit(driver)
+        new_driver = self.start(key, factory)
+        seconds = time.perf_counter() - t0
+        kind, message = reason
+        with self._lock:
+            self.recycled[kind] += 1
+            self.recycle_times.append(seconds)
+        if log:
+            log(f"♻️ Navigateur recyclé ({message}) en {seconds:.1f}s")
+        return new_driver
+
+    def release(self, driver):
+        """Fin de run : le navigateur est gardé chaud (un par clé) ou fermé"""
+        info = self.info.get(driver)
+        if self.keep_warm and info is not None:
+            with self._lock:
+                if info['key'] not in self.idle:
+                    self.idle[info['key']] = driver
+                    return
+        self.quit(driver)
+
+    def prewarm(self, key, factory):
+        """Démarre à l'avance le navigateur de la clé key s'il n'y en a pas de chaud"""
+        if not self.keep_warm:
+            return
+        with self._lock:
+            if key in self.idle:
+                return
+        driver = self.start(key, factory)
+        self.release(driver)
+
+    def forget(self, driver):
+        with self._lock:
+            self.info.pop(driver, None)
+            for key, idle in list(self.idle.items()):
+                if idle is driver:
+                    del self.idle[key]
+
+    def quit(self, driver):
+        self.forget(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def close_idle(self, keep):
+        """Ferme les navigateurs gardés chauds dont la clé ne vérifie pas keep(key)"""
+        with self._lock:
+            drivers = [driver for key, driver in self.idle.items() if not keep(key)]
+            self.idle = {key: driver for key, driver in self.idle.items() if keep(key)}
+        for driver in drivers:
+            self.quit(driver)
+
+    def close(self):
+        """Ferme les navigateurs gardés chauds"""
+        self.close_idle(lambda key: False)
+
+    def report(self):
+        """Démarrages, réutilisations et recyclages, avec leurs durées (secondes)"""
+        def summary(times):
+            if not times:
+                return None
+            return {'count': len(times), 'last': round(times[-1], 3),
+                    'mean': round(sum(times) / len(times), 3), 'max': round(max(times), 3)}
+        with self._lock:
+            return {
+                'started': self.started,
+                'reused': self.reused,
+                'recycled': dict(self.recycled),
+                'startup_s': summary(self.startup_times),
+                'recycle_s': summary(self.recycle_times),
+                'warm': len(self.idle),
+            }
@@ -0,0 +1,18 @@
+import json
+import os
+import threading
+
+def write_json_atomic(path, obj, indent=None, default=None):
+    """
+    Écrit obj en JSON dans path via un fichier temporaire propre au processus et au
+    thread, remplacé d'un coup : un lecteur ne voit jamais de fichier à moitié écrit,
+    et deux processus qui écrivent en même temps ne se disputent pas le fichier temporaire.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, ensure_ascii=False, indent=indent, default=default)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
@@ -2,14 +2,38 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from tkinter.ttk import Progressbar
 import threading
+import queue
+import logging
+from logging.handlers import RotatingFileHandler
 from datetime import datetime, timedelta
 import os
 import sys
-import pandas as pd
 
-# Import du scraper original
+# Le scraper (et pandas, Selenium...) est importé après l'affichage de la fenêtre
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from BRVM_scraper import BRVMScraper
+from brvm_driver import DriverManager
+
+# Événements du thread de scraping appliqués par lots dans la boucle Tk
+EVENT_POLL_MS = 100
+EVENT_BATCH = 500
+# Nombre de lignes conservées dans la console ; le journal complet va dans logs/
+LOG_MAX_LINES = 2000
+LOG_FILE = os.path.join('logs', 'scraping.log')
+
+def setup_file_logger(path=LOG_FILE, max_bytes=5 * 1024 * 1024, backups=3):
+    """Journal complet dans un fichier tournant (logs/scraping.log)"""
+    logger = logging.getLogger('brvm_scraper')
+    if not logger.handlers:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        except OSError:
+            logger.addHandler(logging.NullHandler())
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
 
 class BRVMScraperGUI:
     def __init__(self, root):
@@ -24,9 +48,54 @@ class BRVMScraperGUI:
         # Variables
         self.scraper = None
         self.is_scraping = False
+        # Navigateurs gardés chauds d'un run à l'autre (fermés avec la fenêtre)
+        self.drivers = DriverManager(keep_warm=True)
+        self.events = queue.Queue()
+        self.file_logger = setup_file_logger()
+        # Liste des actions (libellé -> code) et sélection courante (vide : toutes)
+        self.tickers = {}
+        self.visible_tickers = []
+        self.selected_tickers = set()
         
         # Interface
         self.create_widgets()
+        self.root.after(EVENT_POLL_MS, self.drain_events)
+        
+        # Préchargement du scraper en arrière-plan, une fois la fenêtre dessinée
+        self.root.after_idle(self.preload_scraper)
+        
+    def preload_scraper(self):
+        """
+        Charge le scraper et ses dépendances sans bloquer l'interface, puis démarre
+        le navigateur à l'avance : le premier run commence sans démarrage à froid.
+        """
+        config = self.browser_config()
+
+        def preload():
+            try:
+                import BRVM_scraper
+                # Liste des actions en cache (même ancienne) pour la sélection
+                self.events.put(('tickers', BRVM_scraper.TickerUniverse().codes))
+                BRVM_scraper.load_dependencies()
+                scraper = BRVM_scraper.BRVMScraper(config)
+                self.drivers.prewarm(scraper.driver_key(), scraper.setup_driver)
+            except Exception:
+                # L'erreur éventuelle sera signalée au démarrage du scraping
+                pass
+        threading.Thread(target=preload, daemon=True).start()
+
+    def browser_config(self):
+        """Options du navigateur choisies dans l'interface"""
+        try:
+            timeout = int(self.timeout_var.get() or 10)
+        except ValueError:
+            timeout = 10
+        return {
+            'headless': self.headless_var.get(),
+            'timeout': timeout,
+            'lean_session': self.lean_var.get(),
+            'profile_dir': '.brvm_chrome_profile' if self.lean_var.get() else None,
+        }
         
     def setup_styles(self):
         """Configure les styles pour une interface moderne"""
@@ -82,6 +151,31 @@ class BRVMScraperGUI:
         interval_entry = ttk.Entry(config_frame, textvariable=self.interval_var, width=10)
         interval_entry.grid(row=2, column=1, sticky=tk.W, padx=(10, 0), pady=5)
         
+        # Sélection des actions avec recherche (toutes si aucune n'est sélectionnée)
+        ttk.Label(config_frame, text="🎯 Actions:").grid(row=3, column=0, sticky=(tk.W, tk.N), pady=5)
+        tickers_frame = ttk.Frame(config_frame)
+        tickers_frame.grid(row=3, column=1, sticky=(tk.W, tk.E), padx=(10, 0), pady=5)
+        tickers_frame.columnconfigure(0, weight=1)
+        
+        self.ticker_search_var = tk.StringVar()
+        self.ticker_search_var.trace_add('write', lambda *args: self.filter_tickers())
+        ticker_search_entry = ttk.Entry(tickers_frame, textvariable=self.ticker_search_var, width=30)
+        ticker_search_entry.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        
+        self.refresh_tickers_button = ttk.Button(tickers_frame, text="🔄 Actualiser la liste",
+                                                 command=self.refresh_tickers)
+        self.refresh_tickers_button.grid(row=0, column=1, padx=(10, 0))
+        
+        self.ticker_listbox = tk.Listbox(tickers_frame, selectmode=tk.MULTIPLE, height=5, exportselection=False)
+        self.ticker_listbox.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(5, 0))
+        self.ticker_listbox.bind('<<ListboxSelect>>', self.on_ticker_select)
+        ticker_scrollbar = ttk.Scrollbar(tickers_frame, orient=tk.VERTICAL, command=self.ticker_listbox.yview)
+        ticker_scrollbar.grid(row=1, column=1, sticky=(tk.W, tk.N, tk.S), pady=(5, 0))
+        self.ticker_listbox.config(yscrollcommand=ticker_scrollbar.set)
+        
+        self.tickers_label = ttk.Label(tickers_frame, text="Toutes les actions")
+        self.tickers_label.grid(row=2, column=0, columnspan=2, sticky=tk.W)
+        
         # Options avancées
         options_frame = ttk.LabelFrame(main_frame, text="⚙️ Options avancées", padding="15")
         options_frame.grid(row=2, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 10))
@@ -91,11 +185,37 @@ class BRVMScraperGUI:
                                         variable=self.headless_var)
         headless_check.grid(row=0, column=0, sticky=tk.W)
         
+        self.incremental_var = tk.BooleanVar(value=False)
+        incremental_check = ttk.Checkbutton(options_frame, text="Mode incrémental (reprise, périodes manquantes uniquement)", 
+                                           variable=self.incremental_var)
+        incremental_check.grid(row=0, column=1, sticky=tk.W, padx=(10, 0))
+        
+        self.adaptive_var = tk.BooleanVar(value=False)
+        adaptive_check = ttk.Checkbutton(options_frame, text="Fenêtres adaptatives (taille apprise par action)", 
+                                        variable=self.adaptive_var)
+        adaptive_check.grid(row=1, column=2, sticky=tk.W, padx=(10, 0))
+        
+        self.lean_var = tk.BooleanVar(value=False)
+        lean_check = ttk.Checkbutton(options_frame, text="Session légère (ressources bloquées, profil conservé)", 
+                                    variable=self.lean_var)
+        lean_check.grid(row=2, column=2, sticky=tk.W, padx=(10, 0))
+        
         ttk.Label(options_frame, text="⏳ Timeout (secondes):").grid(row=1, column=0, sticky=tk.W, pady=5)
         self.timeout_var = tk.StringVar(value="10")
         timeout_entry = ttk.Entry(options_frame, textvariable=self.timeout_var, width=10)
         timeout_entry.grid(row=1, column=1, sticky=tk.W, padx=(10, 0), pady=5)
         
+        ttk.Label(options_frame, text="👥 Sessions parallèles:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        self.workers_var = tk.StringVar(value="1")
+        workers_entry = ttk.Entry(options_frame, textvariable=self.workers_var, width=10)
+        workers_entry.grid(row=2, column=1, sticky=tk.W, padx=(10, 0), pady=5)
+        
+        ttk.Label(options_frame, text="🗂️ Format de sortie:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        self.output_format_var = tk.StringVar(value="csv")
+        output_format_combo = ttk.Combobox(options_frame, textvariable=self.output_format_var, width=10,
+                                           values=("csv", "parquet", "feather"), state='readonly')
+        output_format_combo.grid(row=3, column=1, sticky=tk.W, padx=(10, 0), pady=5)
+        
         # Boutons de contrôle
         control_frame = ttk.Frame(main_frame)
         control_frame.grid(row=3, column=0, columnspan=3, pady=10)
@@ -108,6 +228,10 @@ class BRVMScraperGUI:
                                      command=self.stop_scraping, state='disabled')
         self.stop_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.pause_button = ttk.Button(control_frame, text="⏸️ Pause", 
+                                      command=self.toggle_pause, state='disabled')
+        self.pause_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         self.export_button = ttk.Button(control_frame, text="💾 Exporter CSV", 
                                        command=self.export_data, state='disabled')
         self.export_button.pack(side=tk.LEFT)
@@ -122,8 +246,12 @@ class BRVMScraperGUI:
                                        mode='determinate', length=400)
         self.progress_bar.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=5)
         
+        # Débit et temps restant estimé, à côté de la barre
+        self.metrics_label = ttk.Label(progress_frame, text="", width=32)
+        self.metrics_label.grid(row=0, column=1, padx=(10, 0))
+        
         self.progress_label = ttk.Label(progress_frame, text="Prêt à démarrer...")
-        self.progress_label.grid(row=1, column=0, pady=5)
+        self.progress_label.grid(row=1, column=0, columnspan=2, pady=5)
         
         # Zone de statut
         status_frame = ttk.LabelFrame(main_frame, text="📊 Statut", padding="10")
@@ -159,24 +287,142 @@ class BRVMScraperGUI:
         clear_log_button.grid(row=1, column=0, pady=5)
         
     def log_message(self, message):
-        """Ajoute un message au journal"""
-        self.log_text.insert(tk.END, message + "\n")
+        """Ajoute un message au journal (utilisable depuis n'importe quel thread)"""
+        self.file_logger.info(message)
+        self.events.put(('log', message))
+        
+    def post_progress(self, value, message=""):
+        """Callback de progression du scraper : appliqué par drain_events"""
+        self.events.put(('progress', value, message))
+        
+    def post_metrics(self, snapshot):
+        """Callback de métriques du scraper : appliqué par drain_events"""
+        self.events.put(('metrics', snapshot))
+        
+    def drain_events(self):
+        """
+        Applique les événements en attente par lots, depuis la boucle Tk : les lignes
+        de log sont insérées en une fois et seule la dernière progression est affichée.
+        """
+        lines, progress, metrics, done = [], None, None, None
+        try:
+            for _ in range(EVENT_BATCH):
+                event = self.events.get_nowait()
+                if event[0] == 'log':
+                    lines.append(event[1])
+                elif event[0] == 'progress':
+                    progress = event[1:]
+                elif event[0] == 'metrics':
+                    metrics = event[1]
+                elif event[0] == 'tickers':
+                    self.set_tickers(event[1])
+                elif event[0] == 'done':
+                    done = event[1]
+                    break
+        except queue.Empty:
+            pass
+        
+        if lines:
+            self.append_logs(lines)
+        if progress is not None:
+            self.update_progress(*progress)
+        if metrics is not None:
+            self.update_metrics(metrics)
+        if done is not None:
+            self.scraping_completed(done)
+        # Reprise immédiate s'il reste des événements, sinon au prochain tick
+        self.root.after(1 if not self.events.empty() else EVENT_POLL_MS, self.drain_events)
+        
+    def append_logs(self, lines):
+        """Insère un lot de lignes et ne garde que les LOG_MAX_LINES dernières"""
+        self.log_text.insert(tk.END, "\n".join(lines[-LOG_MAX_LINES:]) + "\n")
+        line_count = int(self.log_text.index('end-1c').split('.')[0]) - 1
+        if line_count > LOG_MAX_LINES:
+            self.log_text.delete('1.0', f"{line_count - LOG_MAX_LINES + 1}.0")
         self.log_text.see(tk.END)
-        self.root.update_idletasks()
         
     def update_progress(self, value, message=""):
         """Met à jour la barre de progression"""
         self.progress_var.set(value * 100)
         if message:
             self.progress_label.config(text=message)
-        self.root.update_idletasks()
+        
+    def update_metrics(self, snapshot):
+        """Affiche le débit (fenêtres/s) et le temps restant estimé"""
+        eta = snapshot.get('eta')
+        if eta is None:
+            eta_text = "--:--"
+        else:
+            minutes, seconds = divmod(int(eta), 60)
+            hours, minutes = divmod(minutes, 60)
+            eta_text = f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+        self.metrics_label.config(
+            text=f"⚡ {snapshot['windows_per_s']:.2f} fen./s | ⏳ {eta_text}"
+        )
+        
+    def set_tickers(self, codes):
+        """Remplace la liste des actions proposées (la sélection est conservée si possible)"""
+        self.tickers = dict(codes)
+        self.selected_tickers &= set(self.tickers)
+        self.refresh_tickers_button.config(state='normal')
+        self.filter_tickers()
+        
+    def filter_tickers(self):
+        """Affiche les actions dont le libellé ou le code contient le texte recherché"""
+        query = self.ticker_search_var.get().strip().lower()
+        self.visible_tickers = [
+            name for name, code in sorted(self.tickers.items())
+            if query in name.lower() or query in str(code).lower()
+        ]
+        self.ticker_listbox.delete(0, tk.END)
+        for i, name in enumerate(self.visible_tickers):
+            self.ticker_listbox.insert(tk.END, f"{name} ({self.tickers[name]})")
+            if name in self.selected_tickers:
+                self.ticker_listbox.selection_set(i)
+        self.update_tickers_label()
+        
+    def on_ticker_select(self, event=None):
+        """Reporte la sélection des actions affichées (les actions masquées par la recherche restent sélectionnées)"""
+        selection = set(self.ticker_listbox.curselection())
+        for i, name in enumerate(self.visible_tickers):
+            if i in selection:
+                self.selected_tickers.add(name)
+            else:
+                self.selected_tickers.discard(name)
+        self.update_tickers_label()
+        
+    def update_tickers_label(self):
+        if self.selected_tickers:
+            self.tickers_label.config(text=f"{len(self.selected_tickers)} action(s) sélectionnée(s)")
+        elif self.tickers:
+            self.tickers_label.config(text=f"Toutes les actions ({len(self.tickers)})")
+        else:
+            self.tickers_label.config(text="Toutes les actions (liste non chargée : 🔄 Actualiser)")
+        
+    def refresh_tickers(self):
+        """Relit la liste des actions sur le site, dans un thread séparé"""
+        self.refresh_tickers_button.config(state='disabled')
+        self.log_message("🔄 Actualisation de la liste des actions...")
+        config = self.browser_config()
+        
+        def refresh():
+            codes = self.tickers
+            try:
+                from BRVM_scraper import BRVMScraper
+                scraper = BRVMScraper(config)
+                scraper.drivers = self.drivers
+                scraper.set_callbacks(log_callback=self.log_message)
+                codes = scraper.refresh_universe()
+            except Exception as e:
+                self.log_message(f"❌ Erreur actualisation de la liste : {e}")
+            self.events.put(('tickers', codes))
+        threading.Thread(target=refresh, daemon=True).start()
         
     def update_status(self, **kwargs):
         """Met à jour les informations de statut"""
         for key, value in kwargs.items():
             if key in self.status_labels:
                 self.status_labels[key].config(text=str(value))
-        self.root.update_idletasks()
         
     def validate_inputs(self):
         """Valide les entrées utilisateur"""
@@ -195,16 +441,20 @@ class BRVMScraperGUI:
             if timeout <= 0:
                 raise ValueError("Le timeout doit être un nombre positif")
                 
-            return True, start_date, end_date, interval, timeout
+            workers = int(self.workers_var.get())
+            if workers <= 0:
+                raise ValueError("Le nombre de sessions doit être un nombre positif")
+                
+            return True, start_date, end_date, interval, timeout, workers
             
         except ValueError as e:
             messagebox.showerror("Erreur de validation", str(e))
-            return False, None, None, None, None
+            return False, None, None, None, None, None
             
     def start_scraping(self):
         """Démarre le processus de scraping"""
         # Validation des entrées
-        valid, start_date, end_date, interval, timeout = self.validate_inputs()
+        valid, start_date, end_date, interval, timeout, workers = self.validate_inputs()
         if not valid:
             return
             
@@ -212,53 +462,78 @@ class BRVMScraperGUI:
         self.is_scraping = True
         self.start_button.config(state='disabled')
         self.stop_button.config(state='normal')
+        self.pause_button.config(state='normal', text="⏸️ Pause")
         self.export_button.config(state='disabled')
         
         # Réinitialisation
         self.progress_var.set(0)
         self.progress_label.config(text="Initialisation...")
+        self.metrics_label.config(text="")
         self.update_status(actions_count=0, records_count=0, output_file="En cours...")
         
         # Configuration du scraper
         config = {
-            'headless': self.headless_var.get(),
-            'timeout': timeout
+            **self.browser_config(),
+            'timeout': timeout,
+            'workers': workers,
+            'incremental': self.incremental_var.get(),
+            'adaptive_windows': self.adaptive_var.get(),
+            'output_format': self.output_format_var.get(),
         }
         
+        from BRVM_scraper import BRVMScraper
         self.scraper = BRVMScraper(config)
+        self.scraper.drivers = self.drivers
         self.scraper.set_callbacks(
-            progress_callback=self.update_progress,
-            log_callback=self.log_message
+            progress_callback=self.post_progress,
+            log_callback=self.log_message,
+            metrics_callback=self.post_metrics
         )
         
         # Démarrage dans un thread séparé
+        tickers = sorted(self.selected_tickers) or None
         self.scraping_thread = threading.Thread(
             target=self.run_scraping,
-            args=(start_date, end_date, interval),
+            args=(start_date, end_date, interval, tickers),
             daemon=True
         )
         self.scraping_thread.start()
         
-    def run_scraping(self, start_date, end_date, interval):
+    def run_scraping(self, start_date, end_date, interval, tickers=None):
         """Exécute le scraping dans un thread séparé"""
         try:
-            result = self.scraper.scrape_data(start_date, end_date, interval)
+            result = self.scraper.scrape_data(start_date, end_date, interval, tickers=tickers)
             
-            # Mise à jour de l'interface dans le thread principal
-            self.root.after(0, self.scraping_completed, result)
+            # Mise à jour de l'interface dans le thread principal (après les derniers logs)
+            self.events.put(('done', result))
             
         except Exception as e:
             error_result = {
                 'success': False,
                 'message': f'Erreur inattendue: {str(e)}'
             }
-            self.root.after(0, self.scraping_completed, error_result)
+            self.events.put(('done', error_result))
             
     def scraping_completed(self, result):
         """Called when scraping is completed"""
         self.is_scraping = False
         self.start_button.config(state='normal')
         self.stop_button.config(state='disabled')
+        self.pause_button.config(state='disabled', text="⏸️ Pause")
+        
+        if result.get('cancelled'):
+            # La reprise repart de la dernière fenêtre terminée (index de couverture)
+            self.incremental_var.set(True)
+            self.progress_label.config(text="Arrêté par l'utilisateur")
+            self.log_message("⏹ Scraping arrêté : relancez pour reprendre (mode incrémental activé)")
+            if result['success']:
+                self.update_status(
+                    actions_count=result.get('actions', 0),
+                    records_count=result.get('records', 0),
+                    output_file=result.get('file', 'N/A')
+                )
+                self.export_button.config(state='normal')
+            return
         
         if result['success']:
             self.log_message("✅ Scraping terminé avec succès!")
@@ -284,18 +559,30 @@ class BRVMScraperGUI:
         """Arrête le processus de scraping"""
         if self.is_scraping and self.scraper:
             self.log_message("🛑 Arrêt demandé par l'utilisateur...")
-            # Note: L'arrêt forcé nécessiterait une implémentation plus complexe
-            # du scraper avec des points de vérification
-            self.is_scraping = False
-            self.start_button.config(state='normal')
+            # Fermeture des navigateurs hors de la boucle Tk ; les données collectées
+            # sont sauvegardées puis scraping_completed est appelé via la file d'événements
+            threading.Thread(target=self.scraper.stop, daemon=True).start()
             self.stop_button.config(state='disabled')
-            self.progress_label.config(text="Arrêté par l'utilisateur")
+            self.pause_button.config(state='disabled')
+            self.progress_label.config(text="Arrêt en cours, sauvegarde des données...")
+            
+    def toggle_pause(self):
+        """Met le scraping en pause ou le reprend (entre deux fenêtres)"""
+        if not (self.is_scraping and self.scraper):
+            return
+        if self.scraper.control.paused:
+            self.scraper.resume()
+            self.pause_button.config(text="⏸️ Pause")
+        else:
+            self.scraper.pause()
+            self.pause_button.config(text="▶️ Reprendre")
+            self.progress_label.config(text="En pause")
             
     def export_data(self):
         """Exporte les données vers un fichier CSV"""
         try:
-            # Vérifier si le fichier existe
-            if not os.path.exists('stock_data.csv'):
+            # Vérifier si des données existent (base locale, CSV ou jeu de données partitionné)
+            if not any(os.path.exists(path) for path in ('stock_data.db', 'stock_data.csv', 'stock_data')):
                 messagebox.showerror("Erreur", "Aucun fichier de données trouvé. Effectuez d'abord un scraping.")
                 return
                 
@@ -307,9 +594,22 @@ class BRVMScraperGUI:
             )
             
             if filename:
-                # Copier le fichier
-                import shutil
-                shutil.copy2('stock_data.csv', filename)
+                if os.path.exists('stock_data.db'):
+                    # Export direct depuis la base locale, trié par l'index
+                    from brvm_store import QuoteStore
+                    store = QuoteStore('stock_data.db')
+                    try:
+                        store.export_csv(filename)
+                    finally:
+                        store.close()
+                elif os.path.exists('stock_data.csv'):
+                    # Copier le fichier
+                    import shutil
+                    shutil.copy2('stock_data.csv', filename)
+                else:
+                    # Export CSV depuis le jeu de données colonnaire
+                    from brvm_output import read_partitioned, export_csv
+                    export_csv(read_partitioned('stock_data').sort_values('Date', kind='mergesort'), filename)
                 self.log_message(f"📁 Données exportées vers: {filename}")
                 messagebox.showinfo("Succès", f"Données exportées vers:\n{filename}")
                 
@@ -330,8 +630,12 @@ def main():
     def on_closing():
         if app.is_scraping:
             if messagebox.askokcancel("Quitter", "Un scraping est en cours. Voulez-vous vraiment quitter?"):
+                # Ferme les navigateurs plutôt que de les laisser tourner après la fenêtre
+                app.scraper.stop()
+                app.drivers.close()
                 root.destroy()
         else:
+            app.drivers.close()
             root.destroy()
     
     root.protocol("WM_DELETE_WINDOW", on_closing)
@@ -0,0 +1,114 @@
+"""
+Backend HTTP du scraper : la requête du formulaire HISTORIQUES rejouée sans navigateur.
+
+L'adresse de la page d'historique (/marches/historiques/{ticker}) et ses paramètres
+datefrom / dateto sont une hypothèse sur le site, non vérifiée contre sikafinance.com :
+le serveur local des benchmarks (benchmarks/fixture_server.py) a été écrit d'après elle.
+Ils se règlent avec 'http_histos_path'. Une réponse sans table 'tblhistos' ni message
+"Pas de données" est une erreur (fenêtre reprise), jamais une fenêtre vide ; de même
+une table dont aucune ligne ne tombe dans les dates demandées (paramètres ignorés par
+le site, qui renverrait alors toujours sa période par défaut). Les lignes hors de la
+fenêtre sont écartées.
+"""
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+from BRVM_scraper import (BASE_URL, ARTICLES_PATH, NO_DATA_MESSAGE, histos_fragment, parse_histos_html, raw_frame,
+                          window_rows)
+
+# Page d'historique d'une action : le formulaire HISTORIQUES y envoie datefrom / dateto
+HISTOS_PATH = "/marches/historiques/{ticker}"
+
+class HttpBackend:
+    """
+    Backend sans navigateur : rejoue directement la requête du formulaire
+    HISTORIQUES sur une session HTTP keep-alive et lit la table 'tblhistos'
+    avec le même parseur que le backend Selenium. Le backend est partagé entre
+    les workers, mais chaque thread a sa propre session (requests.Session n'est
+    pas prévue pour être utilisée par plusieurs threads à la fois).
+    """
+    def __init__(self, config=None, base_url=BASE_URL):
+        self.config = config or {}
+        self.base_url = base_url.rstrip('/')
+        self.histos_path = self.config.get('http_histos_path', HISTOS_PATH)
+        self.timeout = self.config.get('timeout', 10)
+        self.tickers = {}
+        self.headers = {
+            'User-Agent': self.config.get('user_agent', 'Mozilla/5.0 (BRVM Scraper)'),
+            'Accept': 'text/html,application/xhtml+xml',
+            'Connection': 'keep-alive',
+        }
+        self._local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """Session keep-alive du thread courant, créée à sa première requête"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            # Une connexion réutilisée par thread : un worker n'envoie qu'une requête à la fois
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def get(self, path, params=None):
+        response = self.session.get(self.base_url + path, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def list_actions(self):
+        """Lit la liste 'dpShares' de la page principale (libellé -> code de l'action)"""
+        soup = BeautifulSoup(self.get(ARTICLES_PATH), 'html.parser')
+        select = soup.find('select', id='dpShares')
+        if select is None:
+            raise ValueError("liste 'dpShares' introuvable")
+
+        self.tickers = {
+            opt.text.strip(): opt['value']
+            for opt in select.find_all('option') if opt.get('value')
+        }
+        return list(self.tickers)
+
+    def fetch_raw(self, option_text, date_from, date_to):
+        """
+        Récupère la table d'historique d'une action entre deux dates (YYYY-MM-DD).
+        Renvoie la réponse brute : ('html', fragment de 'tblhistos') ou ('empty', None)
+        lorsque le site répond 'Pas de données à ces dates là'. Une page sans la table
+        ni ce message (mauvaise adresse, mise en page changée, page de consentement
+        ou captcha) lève ValueError : la fenêtre passe par le registre des échecs.
+        """
+        ticker = self.tickers.get(option_text, option_text)
+        html = self.get(
+            self.histos_path.format(ticker=ticker),
+            params={'datefrom': date_from, 'dateto': date_to}
+        )
+        fragment = histos_fragment(html)
+        if NO_DATA_MESSAGE in html and (not fragment or parse_histos_html(fragment).empty):
+            return 'empty', None
+        if not fragment:
+            raise ValueError(f"table 'tblhistos' absente de la réponse de {self.histos_path.format(ticker=ticker)}")
+        return 'html', fragment
+
+    def fetch_window(self, option_text, date_from, date_to):
+        """
+        Comme fetch_raw, sous forme de DataFrame restreint à la fenêtre (None s'il n'y a
+        pas de données) ; lève ValueError si aucune ligne ne tombe dans la fenêtre
+        """
+        return window_rows(raw_frame(*self.fetch_raw(option_text, date_from, date_to)), date_from, date_to)
+
+    def close(self):
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        self._local = threading.local()
+        for session in sessions:
+            session.close()
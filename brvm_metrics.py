@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from brvm_files import write_json_atomic
+
+class RunMetrics:
+    """
+    Mesures d'un run de scraping : temps par phase (au total, par action et par
+    fenêtre), compteurs (pages, lignes, fenêtres vides, erreurs) et trace des fenêtres.
+    Partagé entre les workers : l'action et la fenêtre en cours sont propres à chaque thread.
+    """
+    def __init__(self, keep_trace=True):
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.keep_trace = keep_trace
+        self.phases = {}
+        self.counters = defaultdict(int)
+        self.actions = {}
+        self.trace = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def action_stats(self, action):
+        if action not in self.actions:
+            self.actions[action] = {'windows': 0, 'rows': 0, 'seconds': 0.0, 'phases': defaultdict(float)}
+        return self.actions[action]
+
+    @contextmanager
+    def phase(self, name):
+        """Chronomètre un bloc et l'impute à la phase name"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, seconds):
+        action = getattr(self._local, 'action', None)
+        window = getattr(self._local, 'window', None)
+        with self._lock:
+            stats = self.phases.setdefault(name, {'count': 0, 'seconds': 0.0, 'max': 0.0})
+            stats['count'] += 1
+            stats['seconds'] += seconds
+            stats['max'] = max(stats['max'], seconds)
+            if action is not None:
+                self.action_stats(action)['phases'][name] += seconds
+        if window is not None:
+            window['phases'][name] = window['phases'].get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def set_action(self, action):
+        """Impute les phases suivantes du thread courant à cette action"""
+        self._local.action = action
+
+    def begin_window(self, action, date_from, date_to):
+        self._local.action = action
+        self._local.window = {
+            'action': action, 'from': date_from, 'to': date_to,
+            'start': round(self.elapsed(), 3), 'phases': {}, 't0': time.perf_counter(),
+        }
+
+    def end_window(self, status, rows=0):
+        """Clôt la fenêtre en cours (status : data, empty, truncated, error ou cancelled)"""
+        window = getattr(self._local, 'window', None)
+        self._local.window = None
+        if window is None:
+            return
+        seconds = time.perf_counter() - window.pop('t0')
+        window.update(status=status, rows=rows, seconds=round(seconds, 4))
+        window['phases'] = {name: round(value, 4) for name, value in window['phases'].items()}
+        with self._lock:
+            self.counters['windows'] += 1
+            self.counters['rows'] += rows
+            if status == 'empty':
+                self.counters['empty_windows'] += 1
+            elif status == 'error':
+                self.counters['errors'] += 1
+            elif status == 'truncated':
+                self.counters['truncated_windows'] += 1
+            elif status == 'cancelled':
+                self.counters['cancelled_windows'] += 1
+            stats = self.action_stats(window['action'])
+            stats['windows'] += 1
+            stats['rows'] += rows
+            stats['seconds'] += seconds
+            if self.keep_trace:
+                self.trace.append(window)
+
+    def snapshot(self, done, total):
+        """Avancement instantané : débit en fenêtres/s et temps restant estimé"""
+        elapsed = self.elapsed()
+        rate = done / elapsed if elapsed > 0 else 0.0
+        remaining = max(total - done, 0)
+        with self._lock:
+            rows = self.counters['rows']
+            errors = self.counters['errors']
+        return {
+            'elapsed': elapsed,
+            'windows_done': done,
+            'windows_total': total,
+            'windows_per_s': rate,
+            'rows': rows,
+            'errors': errors,
+            'eta': remaining / rate if rate > 0 else None,
+        }
+
+    def summary(self):
+        elapsed = self.elapsed()
+        with self._lock:
+            windows = self.counters['windows']
+            return {
+                'started_at': self.started_at.isoformat(timespec='seconds'),
+                'elapsed_s': round(elapsed, 3),
+                'windows_per_s': round(windows / elapsed, 3) if elapsed > 0 else 0.0,
+                'counters': dict(self.counters),
+                'phases': {
+                    name: {'count': s['count'], 'seconds': round(s['seconds'], 4), 'max': round(s['max'], 4)}
+                    for name, s in sorted(self.phases.items())
+                },
+                'actions': {
+                    action: {
+                        'windows': s['windows'], 'rows': s['rows'], 'seconds': round(s['seconds'], 4),
+                        'phases': {name: round(value, 4) for name, value in sorted(s['phases'].items())},
+                    }
+                    for action, s in self.actions.items()
+                },
+            }
+
+    def write(self, path):
+        """Écrit le résumé et la trace des fenêtres en JSON (écriture atomique)"""
+        report = self.summary()
+        with self._lock:
+            report['trace'] = list(self.trace)
+        write_json_atomic(path, report, indent=1)
+        return report
@@ -0,0 +1,361 @@
+import csv
+import heapq
+import os
+import shutil
+import threading
+from urllib.parse import quote, unquote
+
+import numpy as np
+import pandas as pd
+
+# Poids des caractères de JJ/MM/AAAA pour obtenir AAAAMMJJ
+DATE_WEIGHTS = np.array([10, 1, 0, 1000, 100, 0, 10000000, 1000000, 100000, 10000], dtype='int32')
+
+# Extension des fichiers de partition selon le format
+FORMATS = {'parquet': '.parquet', 'feather': '.feather'}
+
+def typed_frame(data):
+    """
+    Convertit les colonnes du scraping en types réels : dates, prix en float,
+    volumes en entiers (nullables) et ACTION en catégorie.
+    """
+    data = data.copy()
+    for column in data.columns:
+        if column == 'Date':
+            data[column] = pd.to_datetime(data[column], format='%d/%m/%Y', errors='coerce')
+        elif column == 'ACTION':
+            data[column] = data[column].astype('category')
+        else:
+            numbers = pd.to_numeric(data[column], errors='coerce')
+            if numbers.isna().sum() > data[column].isna().sum():
+                # Colonne non numérique (ex: variation en texte) : conservée telle quelle
+                continue
+            if 'volume' in column.lower() or pd.api.types.is_integer_dtype(numbers):
+                data[column] = numbers.round().astype('Int64')
+            else:
+                data[column] = numbers.astype('float64')
+    return data
+
+def partition_dir(root, action, year):
+    return os.path.join(root, f"ACTION={quote(str(action), safe='')}", f"year={year}")
+
+def write_partitioned(data, root='stock_data', fmt='parquet'):
+    """
+    Écrit les données typées dans root/ACTION=<action>/year=<année>/part-0.<fmt>.
+    Le jeu de données est reconstruit dans un dossier temporaire puis remplace l'ancien.
+    Renvoie le nombre de partitions écrites.
+    """
+    return write_partitioned_stream(
+        (part for _, part in data.groupby(data['ACTION'].astype(str), sort=True)), root, fmt
+    )
+
+def write_partitioned_stream(frames, root='stock_data', fmt='parquet'):
+    """
+    Comme write_partitioned, à partir d'un itérable de blocs (un par action par exemple) :
+    un seul bloc est en mémoire à la fois. Une même (ACTION, année) ne doit pas être
+    répartie sur plusieurs blocs.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu : {fmt} (formats : {', '.join(FORMATS)})")
+
+    tmp_root = root + '.tmp'
+    if os.path.exists(tmp_root):
+        shutil.rmtree(tmp_root)
+
+    partitions = 0
+    for data in frames:
+        if data.empty:
+            continue
+        data = typed_frame(data)
+        years = data['Date'].dt.year.astype('Int64')
+        for (action, year), part in data.groupby([data['ACTION'].astype(str), years], sort=True, observed=True):
+            directory = partition_dir(tmp_root, action, int(year))
+            os.makedirs(directory, exist_ok=True)
+            part = part.sort_values('Date', kind='mergesort').reset_index(drop=True)
+            path = os.path.join(directory, 'part-0' + FORMATS[fmt])
+            if fmt == 'parquet':
+                part.to_parquet(path, index=False)
+            else:
+                part.to_feather(path)
+            partitions += 1
+
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    if partitions:
+        os.replace(tmp_root, root)
+    return partitions
+
+def list_partitions(root, action=None, year=None):
+    """Renvoie les fichiers de partition correspondant aux filtres (action et/ou année)"""
+    paths = []
+    if not os.path.isdir(root):
+        return paths
+    for action_dir in sorted(os.listdir(root)):
+        if not action_dir.startswith('ACTION='):
+            continue
+        if action is not None and unquote(action_dir[len('ACTION='):]) != action:
+            continue
+        for year_dir in sorted(os.listdir(os.path.join(root, action_dir))):
+            if year is not None and year_dir != f"year={year}":
+                continue
+            directory = os.path.join(root, action_dir, year_dir)
+            paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory)))
+    return paths
+
+def read_partitioned(root='stock_data', action=None, year=None):
+    """Lit seulement les partitions demandées, sans parcourir tout le jeu de données"""
+    frames = []
+    for path in list_partitions(root, action, year):
+        if path.endswith('.parquet'):
+            frames.append(pd.read_parquet(path))
+        elif path.endswith('.feather'):
+            frames.append(pd.read_feather(path))
+    if not frames:
+        return pd.DataFrame()
+    data = pd.concat(frames, ignore_index=True)
+    data['ACTION'] = data['ACTION'].astype('category')
+    return data
+
+def export_csv(data, path):
+    """Export CSV au format historique (dates en JJ/MM/AAAA, UTF-8 avec BOM)"""
+    data = data.copy()
+    if pd.api.types.is_datetime64_any_dtype(data['Date']):
+        data['Date'] = data['Date'].dt.strftime('%d/%m/%Y')
+    data.to_csv(path, index=False, encoding='utf-8-sig')
+
+def date_key(value):
+    """Clé de tri d'une date JJ/MM/AAAA sans conversion (AAAAMMJJ)"""
+    return value[6:10] + value[3:5] + value[:2]
+
+def date_ints(dates):
+    """Dates JJ/MM/AAAA vers des entiers AAAAMMJJ (int32, triables) ; 0 pour une date illisible"""
+    try:
+        raw = np.asarray(dates, dtype='S10')
+    except UnicodeEncodeError:
+        raw = np.asarray([str(d).encode('ascii', 'replace') for d in dates], dtype='S10')
+    # Chiffres lus directement dans les octets, sans analyse de date ligne par ligne
+    chars = raw.view('uint8').reshape(len(raw), 10)
+    digits = chars.astype('int32') - ord('0')
+    keys = digits @ DATE_WEIGHTS
+    valid = (chars[:, [2, 5]] == ord('/')).all(axis=1) & (((digits >= 0) & (digits <= 9)).sum(axis=1) == 8)
+    return np.where(valid, keys, 0).astype('int32')
+
+def row_hashes(frame):
+    """
+    Empreinte (uint64) de chaque ligne, hors ACTION et Date. Les colonnes numériques
+    sont comparées en float64 : 1275 et 1275.0 donnent la même empreinte.
+    """
+    hashes = np.zeros(len(frame), dtype='uint64')
+    for column in sorted(c for c in frame.columns if c not in ('ACTION', 'Date')):
+        values = frame[column].to_numpy()
+        if values.dtype.kind in 'biuf':
+            values = values.astype('float64')
+        else:
+            values = values.astype(str).astype(object)
+        # Combinaison non commutative : l'ordre des colonnes compte
+        hashes = hashes * np.uint64(1000003) ^ pd.util.hash_array(values)
+    return hashes
+
+class RowIndex:
+    """
+    Lignes reçues pendant le run, par action, sous forme compacte : dates triées
+    (int32 AAAAMMJJ) et empreinte de la dernière version de chaque ligne (uint64),
+    soit 12 octets par ligne. Une ligne identique à une ligne déjà reçue est rejetée
+    dès son arrivée ; une ligne modifiée (même date, autres valeurs) est conservée
+    comme mise à jour. records compte les couples (ACTION, Date) distincts.
+    """
+    def __init__(self):
+        self.dates = {}
+        self.hashes = {}
+        self.records = 0
+        self.duplicates = 0
+
+    def filter(self, frame):
+        """Renvoie les lignes de frame à écrire (nouvelles ou modifiées) et met l'index à jour"""
+        if frame.empty:
+            return frame
+        keys = date_ints(frame['Date'])
+        hashes = row_hashes(frame)
+        keep = np.ones(len(frame), dtype=bool)
+        actions = frame['ACTION'].to_numpy()
+        first = actions[0]
+        groups = ([(str(first), np.arange(len(frame)))] if (actions == first).all()
+                  else pd.Series(np.arange(len(frame))).groupby(actions.astype(str), sort=False).indices.items())
+        for action, rows in groups:
+            keep[rows] = self.add(action, keys[rows], hashes[rows])
+        if keep.all():
+            return frame
+        return frame[keep]
+
+    def add(self, action, keys, hashes):
+        """Ajoute les lignes d'une action ; renvoie le masque des lignes à conserver"""
+        known_dates = self.dates.get(action, np.empty(0, dtype='int32'))
+        known_hashes = self.hashes.get(action, np.empty(0, dtype='uint64'))
+
+        # Doublons exacts à l'intérieur du lot, puis avec les lignes déjà reçues
+        pairs = hashes ^ (keys.astype('uint64') * np.uint64(0x9E3779B97F4A7C15))
+        drop = np.ones(len(keys), dtype=bool)
+        drop[np.unique(pairs, return_index=True)[1]] = False
+        positions = np.searchsorted(known_dates, keys)
+        found = positions < len(known_dates)
+        found[found] = known_dates[positions[found]] == keys[found]
+        drop[found] |= known_hashes[positions[found]] == hashes[found]
+        self.duplicates += int(drop.sum())
+
+        # Dernière version de chaque date conservée
+        order = np.argsort(keys[~drop], kind='stable')
+        dates, versions = keys[~drop][order], hashes[~drop][order]
+        if len(dates):
+            last = np.append(dates[1:] != dates[:-1], True)
+            dates, versions = dates[last], versions[last]
+            positions = np.searchsorted(known_dates, dates)
+            exists = positions < len(known_dates)
+            exists[exists] = known_dates[positions[exists]] == dates[exists]
+            known_hashes = known_hashes.copy()
+            known_hashes[positions[exists]] = versions[exists]
+            new = ~exists
+            self.dates[action] = np.insert(known_dates, positions[new], dates[new])
+            self.hashes[action] = np.insert(known_hashes, positions[new], versions[new])
+            self.records += int(new.sum())
+        return ~drop
+
+class PartitionSpool:
+    """
+    Partitions par action des fenêtres scrapées, écrites en ajout dans root/<action>.csv.
+    En fin de run, chaque partition est dédoublonnée et triée seule (sort_partitions),
+    puis merge_csv produit le fichier final trié par (Date, ACTION) par fusion k-voies :
+    la mémoire reste bornée par la plus grosse partition, pas par l'historique complet.
+    """
+    def __init__(self, root='stock_data_parts'):
+        self.root = root
+        self.columns = {}
+        self._lock = threading.Lock()
+        if os.path.exists(root):
+            shutil.rmtree(root)
+        os.makedirs(root)
+
+    def path(self, action):
+        return os.path.join(self.root, quote(str(action), safe='') + '.csv')
+
+    def actions(self):
+        return sorted(unquote(name[:-len('.csv')]) for name in os.listdir(self.root) if name.endswith('.csv'))
+
+    def append(self, frame):
+        """Ajoute des lignes (colonne ACTION obligatoire) à la fin de leur partition"""
+        if frame.empty:
+            return
+        actions = frame['ACTION'].unique()
+        # Cas courant : une fenêtre ne contient qu'une action
+        parts = ([(str(actions[0]), frame)] if len(actions) == 1
+                 else frame.groupby(frame['ACTION'].astype(str), sort=False))
+        with self._lock:
+            if len(actions) > 1 and self.append_lines(frame):
+                return
+            for action, part in parts:
+                columns = self.columns.get(action)
+                if columns is None:
+                    columns = self.columns[action] = list(part.columns)
+                    header = True
+                else:
+                    part = part.reindex(columns=columns)
+                    header = False
+                with open(self.path(action), 'a', encoding='utf-8', newline='') as f:
+                    part.to_csv(f, header=header, index=False)
+
+    def append_lines(self, frame):
+        """
+        Ajout d'un bloc de nombreuses actions (instantané d'une séance) : le bloc est
+        sérialisé en un seul to_csv puis ses lignes sont réparties entre les partitions.
+        Renvoie False si une partition a d'autres colonnes (ajout action par action).
+        """
+        columns = list(frame.columns)
+        groups = frame.groupby(frame['ACTION'].astype(str), sort=False).indices
+        if any(self.columns.get(action, columns) != columns for action in groups):
+            return False
+        lines = frame.to_csv(header=False, index=False).splitlines(keepends=True)
+        if len(lines) != len(frame):
+            # Valeur sur plusieurs lignes : le découpage ligne à ligne ne s'applique pas
+            return False
+        header = frame.head(0).to_csv(index=False)
+        for action, rows in groups.items():
+            new = action not in self.columns
+            if new:
+                self.columns[action] = columns
+            with open(self.path(action), 'a', encoding='utf-8', newline='') as f:
+                f.write((header if new else '') + ''.join(lines[i] for i in rows))
+        return True
+
+    def read(self, action):
+        data = pd.read_csv(self.path(action), dtype=str, keep_default_na=False, encoding='utf-8')
+        # Une seule valeur répétée sur toute la partition
+        data['ACTION'] = data['ACTION'].astype('category')
+        return data
+
+    def sort_partitions(self):
+        """
+        Dédoublonne (clé ACTION, Date : la dernière ligne reçue l'emporte) et trie par date
+        chaque partition, une à la fois. Les doublons exacts ont déjà été rejetés à
+        l'arrivée (RowIndex) : il ne reste que les lignes mises à jour pendant le run.
+        Renvoie (lignes, actions, doublons supprimés).
+        """
+        records = duplicates = 0
+        actions = self.actions()
+        for action in actions:
+            data = self.read(action)
+            before = len(data)
+            # Partition d'une seule action : la date (entier AAAAMMJJ) suffit comme clé
+            keys = date_ints(data['Date'])
+            latest = ~pd.Series(keys).duplicated(keep='last').to_numpy()
+            data, keys = data[latest], keys[latest]
+            data = data.iloc[np.argsort(keys, kind='stable')]
+            tmp_path = self.path(action) + '.tmp'
+            data.to_csv(tmp_path, index=False, encoding='utf-8')
+            os.replace(tmp_path, self.path(action))
+            records += len(data)
+            duplicates += before - len(data)
+        return records, len(actions), duplicates
+
+    def iter_partitions(self):
+        """Renvoie les partitions (déjà triées) une par une, dans l'ordre des actions"""
+        for action in self.actions():
+            yield self.read(action)
+
+    def merge_csv(self, path):
+        """
+        Fusion k-voies (heapq.merge) des partitions triées vers un CSV trié par
+        (Date, ACTION) : une seule ligne par partition est en mémoire. Renvoie le nombre de lignes.
+        """
+        actions = self.actions()
+        files = [open(self.path(action), encoding='utf-8', newline='') for action in actions]
+        try:
+            readers = [csv.reader(f) for f in files]
+            headers = [next(reader, None) or [] for reader in readers]
+            columns = []
+            for header in headers:
+                columns.extend(c for c in header if c not in columns and c != 'ACTION')
+            columns.append('ACTION')
+
+            def rows(action, reader, header):
+                positions = [header.index(c) if c in header else None for c in columns]
+                date_position = header.index('Date')
+                for row in reader:
+                    yield (date_key(row[date_position]), action), [
+                        row[i] if i is not None else '' for i in positions
+                    ]
+
+            streams = [rows(action, reader, header) for action, reader, header in zip(actions, readers, headers) if header]
+            total = 0
+            with open(path, 'w', encoding='utf-8-sig', newline='') as out:
+                writer = csv.writer(out, lineterminator=os.linesep)
+                writer.writerow(columns)
+                for _, row in heapq.merge(*streams, key=lambda item: item[0]):
+                    writer.writerow(row)
+                    total += 1
+            return total
+        finally:
+            for f in files:
+                f.close()
+
+    def discard(self):
+        if os.path.exists(self.root):
+            shutil.rmtree(self.root)
@@ -0,0 +1,223 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from brvm_output import typed_frame
+
+# Colonnes utilisées pour l'agrégation OHLCV
+OHLCV = {'open': 'Ouverture', 'high': 'Plus Haut', 'low': 'Plus Bas', 'close': 'Clôture', 'volume': 'Volume'}
+INDEX_FILE = 'index.json'
+
+def series_dir(root, action):
+    return os.path.join(root, quote(str(action), safe=''))
+
+def write_series(frames, root='stock_data_series'):
+    """
+    Écrit une série par action : root/<action>/Date.npy (datetime64[D], trié) et un
+    fichier .npy par colonne numérique, lisibles en mémoire mappée.
+    frames est un itérable de blocs contenant chacun toutes les lignes d'une ou
+    plusieurs actions (une action ne doit pas être répartie sur plusieurs blocs).
+    Le dossier est reconstruit à côté puis remplace l'ancien. Renvoie le nombre d'actions.
+    """
+    tmp_root = root + '.tmp'
+    if os.path.exists(tmp_root):
+        shutil.rmtree(tmp_root)
+    os.makedirs(tmp_root)
+
+    index = {'built_at': datetime.now().isoformat(timespec='seconds'), 'actions': {}}
+    for data in frames:
+        if data.empty:
+            continue
+        data = typed_frame(data).dropna(subset=['Date'])
+        for action, part in data.groupby(data['ACTION'].astype(str), sort=True, observed=True):
+            part = part.sort_values('Date', kind='mergesort').drop_duplicates(subset=['Date'], keep='last')
+            directory = series_dir(tmp_root, action)
+            os.makedirs(directory)
+            np.save(os.path.join(directory, 'Date.npy'), part['Date'].to_numpy().astype('datetime64[D]'))
+            columns = []
+            for column in part.columns:
+                if column in ('Date', 'ACTION', 'year'):
+                    continue
+                values = part[column]
+                if str(values.dtype) == 'Int64':
+                    values = values.to_numpy(dtype='int64') if not values.isna().any() else values.to_numpy(dtype='float64', na_value=np.nan)
+                elif values.dtype.kind in 'fiu':
+                    values = values.to_numpy()
+                else:
+                    continue
+                np.save(os.path.join(directory, f"{quote(column, safe='')}.npy"), values)
+                columns.append(column)
+            index['actions'][action] = {'rows': len(part), 'columns': columns}
+
+    with open(os.path.join(tmp_root, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    os.replace(tmp_root, root)
+    return len(index['actions'])
+
+def source_frames(store_path='stock_data.db', dataset='stock_data', csv_path='stock_data.csv'):
+    """
+    Blocs par action à partir de la sortie du scraper : base SQLite, sinon jeu de
+    données partitionné, sinon stock_data.csv (lu en une fois).
+    """
+    import pandas as pd
+
+    if store_path and os.path.exists(store_path):
+        from brvm_store import QuoteStore
+        store = QuoteStore(store_path)
+        try:
+            for action in store.actions():
+                yield store.read_frame(actions=[action])
+        finally:
+            store.close()
+    elif os.path.isdir(dataset):
+        from brvm_output import read_partitioned
+        actions = sorted(
+            unquote(name[len('ACTION='):]) for name in os.listdir(dataset) if name.startswith('ACTION=')
+        )
+        for action in actions:
+            yield read_partitioned(dataset, action=action)
+    elif os.path.exists(csv_path):
+        yield pd.read_csv(csv_path, encoding='utf-8-sig')
+
+def build_series(root='stock_data_series', **sources):
+    """Construit (ou reconstruit) les séries mappées depuis la sortie du scraper"""
+    return write_series(source_frames(**sources), root)
+
+class SeriesStore:
+    """
+    Accès aux séries par action en mémoire mappée. Les lectures sont des vues
+    (sans copie) obtenues par recherche dichotomique sur les dates : le coût d'une
+    requête ne dépend que de la taille de la plage demandée, pas du jeu de données.
+    """
+    def __init__(self, root='stock_data_series'):
+        self.root = root
+        with open(os.path.join(root, INDEX_FILE), encoding='utf-8') as f:
+            self.index = json.load(f)
+        self._arrays = {}
+        self._lock = threading.Lock()
+
+    @property
+    def actions(self):
+        return list(self.index['actions'])
+
+    def columns(self, action):
+        return self.index['actions'][action]['columns']
+
+    def arrays(self, action):
+        """Tableaux mappés d'une action (ouverts une fois puis gardés en cache)"""
+        arrays = self._arrays.get(action)
+        if arrays is None:
+            if action not in self.index['actions']:
+                raise KeyError(f"Action inconnue : {action}")
+            directory = series_dir(self.root, action)
+            arrays = {'Date': np.load(os.path.join(directory, 'Date.npy'), mmap_mode='r')}
+            for column in self.columns(action):
+                arrays[column] = np.load(os.path.join(directory, f"{quote(column, safe='')}.npy"), mmap_mode='r')
+            with self._lock:
+                self._arrays[action] = arrays
+        return arrays
+
+    def bounds(self, dates, start=None, end=None):
+        """Indices [i, j) des dates comprises entre start et end (bornes incluses)"""
+        i = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        j = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        return i, j
+
+    def get_series(self, action, start=None, end=None, columns=None):
+        """
+        Série d'une action entre start et end (dates incluses, 'AAAA-MM-JJ', date ou datetime64).
+        Renvoie un dict {colonne: tableau} de vues sur les fichiers mappés, 'Date' compris.
+        """
+        arrays = self.arrays(action)
+        i, j = self.bounds(arrays['Date'], start, end)
+        names = ['Date'] + [c for c in (columns or self.columns(action)) if c != 'Date']
+        return {name: arrays[name][i:j] for name in names}
+
+    def returns(self, action, start=None, end=None, column='Clôture', log=False):
+        """Rendements d'une séance à l'autre ; renvoie (dates, rendements) sans la première séance"""
+        series = self.get_series(action, start, end, [column])
+        prices = np.asarray(series[column], dtype='float64')
+        if log:
+            values = np.diff(np.log(prices))
+        else:
+            values = prices[1:] / prices[:-1] - 1
+        return series['Date'][1:], values
+
+    def resample(self, action, freq='W', start=None, end=None):
+        """
+        Agrégation OHLCV hebdomadaire ('W', semaines du lundi au vendredi) ou
+        mensuelle ('M'). Chaque période est datée de sa dernière séance.
+        """
+        columns = [c for c in OHLCV.values() if c in self.columns(action)]
+        series = self.get_series(action, start, end, columns)
+        dates = series['Date']
+        if not len(dates):
+            return {'Date': dates, **{name: np.array([]) for name in OHLCV}}
+        if freq == 'W':
+            # 1970-01-01 est un jeudi : +3 aligne les semaines sur le lundi
+            keys = (dates.astype('int64') + 3) // 7
+        elif freq == 'M':
+            keys = dates.astype('datetime64[M]').astype('int64')
+        else:
+            raise ValueError(f"Fréquence inconnue : {freq} ('W' ou 'M')")
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+        ends = np.concatenate((starts[1:], [len(dates)])) - 1
+        close = np.asarray(series.get(OHLCV['close']), dtype='float64')
+        opening = np.asarray(series.get(OHLCV['open'], close), dtype='float64')
+        high = np.asarray(series.get(OHLCV['high'], close), dtype='float64')
+        low = np.asarray(series.get(OHLCV['low'], close), dtype='float64')
+        result = {
+            'Date': dates[ends],
+            'open': opening[starts],
+            'high': np.fmax.reduceat(high, starts),
+            'low': np.fmin.reduceat(low, starts),
+            'close': close[ends],
+        }
+        if OHLCV['volume'] in series:
+            result['volume'] = np.add.reduceat(np.nan_to_num(np.asarray(series[OHLCV['volume']], dtype='float64')), starts)
+        return result
+
+    def align(self, actions, column='Clôture', start=None, end=None, how='inner'):
+        """
+        Aligne plusieurs actions sur leurs dates de cotation : 'inner' garde les dates
+        communes à toutes, 'outer' leur union (NaN pour les séances sans cotation).
+        Renvoie (dates, matrice [dates x actions]).
+        """
+        if how not in ('inner', 'outer'):
+            raise ValueError(f"Alignement inconnu : {how} ('inner' ou 'outer')")
+        series = []
+        for action in actions:
+            s = self.get_series(action, start, end, [column])
+            # Vues ndarray simples : l'indexation avancée sur np.memmap est plus lente
+            series.append((np.asarray(s['Date']), np.asarray(s[column])))
+        if not series:
+            return np.array([], dtype='datetime64[D]'), np.empty((0, 0))
+        dates = series[0][0]
+        for s_dates, _ in series[1:]:
+            if how == 'inner':
+                dates = np.intersect1d(dates, s_dates, assume_unique=True)
+            else:
+                dates = np.union1d(dates, s_dates)
+
+        matrix = np.full((len(dates), len(series)), np.nan)
+        for k, (s_dates, values) in enumerate(series):
+            positions = np.searchsorted(s_dates, dates)
+            found = positions < len(s_dates)
+            found[found] = s_dates[positions[found]] == dates[found]
+            matrix[found, k] = values[positions[found]]
+        return dates, matrix
+
+def to_frame(series):
+    """Convertit un résultat (dict de tableaux) en DataFrame pandas indexé par date"""
+    import pandas as pd
+
+    data = {name: np.asarray(values) for name, values in series.items() if name != 'Date'}
+    return pd.DataFrame(data, index=pd.DatetimeIndex(np.asarray(series['Date']), name='Date'))
@@ -0,0 +1,96 @@
+import re
+
+from lxml import html as lxml_html
+
+from BRVM_scraper import NO_DATA_MESSAGE, clean_histos_frame
+from brvm_http import HttpBackend
+
+# Page des cotations de toutes les valeurs pour une séance (paramètre date=AAAA-MM-JJ).
+# Adresse, id de la table et repère de la date de séance sont une hypothèse sur le site,
+# non vérifiée contre sikafinance.com (réglables avec 'snapshot_path' et 'snapshot_table_id') :
+# les pages benchmarks/fixtures/cotations_*.html ont été écrites d'après elle.
+SNAPSHOT_PATH = "/marches/cotations"
+SNAPSHOT_TABLE_ID = "tblcotations"
+# Date de la séance affichée : le site montre la dernière séance les jours sans cotation
+SESSION_DATE_RE = re.compile(r'id=["\']?dateSeance["\']?[^>]*>\s*(\d{2}/\d{2}/\d{4})')
+CODE_COLUMN = 'Code'
+NAME_COLUMN = 'Valeur'
+
+def parse_snapshot_html(html, names=None, table_id=SNAPSHOT_TABLE_ID):
+    """
+    Extrait la table des cotations d'une séance, au schéma de raw_frame
+    (Date, Ouverture, Plus Haut, Plus Bas, Clôture, Volume..., ACTION).
+    names (code -> libellé de la liste 'dpShares') donne à ACTION le même libellé
+    qu'en mode par action. Renvoie (date de séance JJ/MM/AAAA, DataFrame),
+    ou (None, None) si la page affiche le message 'Pas de données'. Une page sans
+    ce message, sans la table ou sans la date de séance lève ValueError (mise en
+    page différente de celle attendue) : le jour passe par le registre des échecs
+    au lieu d'être compté comme un jour sans séance.
+    """
+    import pandas as pd
+
+    if NO_DATA_MESSAGE in html:
+        return None, None
+    start = re.search(r'<table[^>]*\bid=["\']?' + re.escape(table_id) + r'\b', html, re.I)
+    if not start:
+        raise ValueError(f"table '{table_id}' absente de la page des cotations")
+    match = SESSION_DATE_RE.search(html)
+    if not match:
+        raise ValueError("date de séance ('dateSeance') absente de la page des cotations")
+    session = match.group(1)
+    end = html.find('</table>', start.start())
+    table = lxml_html.fragment_fromstring(html[start.start():end + len('</table>') if end >= 0 else len(html)])
+
+    headers = [th.text_content().strip() for th in table.iterfind('.//thead//th')]
+    if NAME_COLUMN not in headers:
+        raise ValueError(f"colonne '{NAME_COLUMN}' absente de la table '{table_id}'")
+    name_index = headers.index(NAME_COLUMN)
+    code_index = headers.index(CODE_COLUMN) if CODE_COLUMN in headers else None
+    value_indexes = [i for i in range(len(headers)) if i not in (name_index, code_index)]
+
+    names = names or {}
+    rows = []
+    for tr in table.iterfind('.//tbody/tr'):
+        cells = [td.text_content() for td in tr.iterfind('td')]
+        if len(cells) != len(headers):
+            continue
+        name = cells[name_index].strip()
+        if code_index is not None:
+            name = names.get(cells[code_index].strip(), name)
+        rows.append([session] + [cells[i] for i in value_indexes] + [name])
+
+    columns = ['Date'] + [headers[i] for i in value_indexes] + ['ACTION']
+    if not rows:
+        return session, pd.DataFrame(columns=columns)
+    return session, clean_histos_frame(pd.DataFrame(rows, columns=columns))
+
+class SnapshotBackend(HttpBackend):
+    """
+    Backend "instantané" : une page par séance donne les cotations de toutes les
+    actions. Un historique se parcourt jour de bourse par jour de bourse au lieu
+    d'action par action et de fenêtre en fenêtre. La liste des actions (list_actions)
+    et la session HTTP sont celles du backend HTTP.
+    """
+    def __init__(self, config=None, **kwargs):
+        super().__init__(config, **kwargs)
+        self.snapshot_path = self.config.get('snapshot_path', SNAPSHOT_PATH)
+        self.table_id = self.config.get('snapshot_table_id', SNAPSHOT_TABLE_ID)
+
+    def fetch_page(self, day):
+        """Page des cotations demandée pour le jour day (date ou datetime)"""
+        return self.get(self.snapshot_path, params={'date': day.strftime('%Y-%m-%d')})
+
+    def parse_day(self, day, html):
+        """
+        Cotations de toutes les actions pour la séance du jour day. Renvoie None si
+        le marché n'a pas coté ce jour-là (la page affiche alors une autre séance, ou aucune).
+        """
+        names = {code: name for name, code in self.tickers.items()}
+        session, data = parse_snapshot_html(html, names, self.table_id)
+        if session != day.strftime('%d/%m/%Y'):
+            return None
+        return data
+
+    def fetch_day(self, day):
+        """Charge et lit la séance du jour day (None s'il n'y a pas eu de séance)"""
+        return self.parse_day(day, self.fetch_page(day))
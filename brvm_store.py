@@ -0,0 +1,145 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+KEY_COLUMNS = ('ACTION', 'Date')
+
+def quote_name(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+class QuoteStore:
+    """
+    Base SQLite locale des cotations avec une clé primaire (ACTION, Date).
+    Les fenêtres y sont écrites par lots d'upserts : les recouvrements et les runs
+    successifs sont dédoublonnés à l'insertion, et les lectures triées passent par l'index.
+    Les dates sont stockées au format ISO (AAAA-MM-JJ) pour rester triables.
+    """
+    def __init__(self, path='stock_data.db', wal=True):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # Sur un stockage réseau partagé entre machines, WAL (mémoire partagée locale) est exclu
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS quotes ("
+            "ACTION TEXT NOT NULL, Date TEXT NOT NULL, "
+            "PRIMARY KEY (ACTION, Date)) WITHOUT ROWID"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_quotes_date ON quotes (Date, ACTION)")
+        self.conn.commit()
+        self.columns = [row[1] for row in self.conn.execute("PRAGMA table_info(quotes)")]
+
+    def ensure_columns(self, columns):
+        if any(column not in self.columns for column in columns):
+            # La base peut être partagée : un autre processus a pu ajouter la colonne
+            self.columns = [row[1] for row in self.conn.execute("PRAGMA table_info(quotes)")]
+        for column in columns:
+            if column not in self.columns:
+                try:
+                    self.conn.execute(f"ALTER TABLE quotes ADD COLUMN {quote_name(column)}")
+                except sqlite3.OperationalError as e:
+                    if 'duplicate column' not in str(e):
+                        raise
+                self.columns.append(column)
+
+    def upsert(self, frame):
+        """
+        Insère ou met à jour une fenêtre (Date au format JJ/MM/AAAA).
+        Renvoie le nombre de lignes nouvelles (les autres remplacent des lignes existantes).
+        """
+        if frame.empty:
+            return 0
+        data = frame.copy()
+        data['Date'] = pd.to_datetime(data['Date'], format='%d/%m/%Y', errors='coerce').dt.strftime('%Y-%m-%d')
+        data = data.dropna(subset=['Date']).drop_duplicates(subset=list(KEY_COLUMNS), keep='last')
+        if data.empty:
+            return 0
+
+        columns = list(data.columns)
+        value_columns = [column for column in columns if column not in KEY_COLUMNS]
+        placeholders = ', '.join('?' for _ in columns)
+        update = ', '.join(f"{quote_name(c)} = excluded.{quote_name(c)}" for c in value_columns)
+        sql = (
+            f"INSERT INTO quotes ({', '.join(quote_name(c) for c in columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT (ACTION, Date) DO " + (f"UPDATE SET {update}" if update else "NOTHING")
+        )
+        rows = data.astype(object).where(data.notna(), None).itertuples(index=False, name=None)
+
+        with self._lock:
+            self.ensure_columns(columns)
+            existing = 0
+            days = data['Date'].unique()
+            if len(days) == 1:
+                # Instantané d'une séance : une seule requête pour toutes les actions
+                actions = data['ACTION'].tolist()
+                existing = self.conn.execute(
+                    f"SELECT COUNT(*) FROM quotes WHERE Date = ? AND ACTION IN ({', '.join('?' for _ in actions)})",
+                    [days[0], *actions]
+                ).fetchone()[0]
+            else:
+                for action, dates in data.groupby('ACTION')['Date']:
+                    # Lignes déjà présentes : requête bornée par la clé primaire, en O(lot)
+                    existing += self.conn.execute(
+                        "SELECT COUNT(*) FROM quotes WHERE ACTION = ? AND Date BETWEEN ? AND ? "
+                        f"AND Date IN ({', '.join('?' for _ in dates)})",
+                        [action, dates.min(), dates.max(), *dates]
+                    ).fetchone()[0]
+            with self.conn:
+                self.conn.executemany(sql, rows)
+        return len(data) - existing
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def actions_count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(DISTINCT ACTION) FROM quotes").fetchone()[0]
+
+    def actions(self):
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT ACTION FROM quotes ORDER BY ACTION")]
+
+    def query(self, actions=None, start=None, end=None, order_by_action=False):
+        """Construit la requête de lecture triée (par date, ou par action puis date)"""
+        clauses, params = [], []
+        if actions:
+            clauses.append(f"ACTION IN ({', '.join('?' for _ in actions)})")
+            params.extend(actions)
+        if start:
+            clauses.append("Date >= ?")
+            params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+        if end:
+            clauses.append("Date <= ?")
+            params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+        columns = [c for c in self.columns if c not in KEY_COLUMNS]
+        sql = f"SELECT Date, {', '.join(quote_name(c) for c in columns)}{', ' if columns else ''}ACTION FROM quotes"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY ACTION, Date" if order_by_action else " ORDER BY Date, ACTION"
+        return sql, params
+
+    def read_frame(self, actions=None, start=None, end=None, order_by_action=False):
+        """Lit les cotations triées ; Date est renvoyée au format JJ/MM/AAAA"""
+        sql, params = self.query(actions, start, end, order_by_action)
+        with self._lock:
+            data = pd.read_sql_query(sql, self.conn, params=params)
+        data['Date'] = pd.to_datetime(data['Date'], format='%Y-%m-%d').dt.strftime('%d/%m/%Y')
+        return data
+
+    def export_csv(self, path, actions=None, start=None, end=None, chunksize=50000):
+        """Exporte vers un CSV au format de stock_data.csv, par blocs. Renvoie le nombre de lignes."""
+        sql, params = self.query(actions, start, end)
+        total = 0
+        with self._lock, open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            for chunk in pd.read_sql_query(sql, self.conn, params=params, chunksize=chunksize):
+                chunk['Date'] = pd.to_datetime(chunk['Date'], format='%Y-%m-%d').dt.strftime('%d/%m/%Y')
+                chunk.to_csv(f, header=(total == 0), index=False)
+                total += len(chunk)
+        return total
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,264 @@
+import sqlite3
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+# Tâche réservée par un worker : lease est le jeton de son bail, reclaimed_from
+# le worker dont le bail avait expiré (None pour une tâche en attente)
+Task = namedtuple('Task', 'id action date_from date_to attempts lease reclaimed_from')
+
+STATUSES = ('pending', 'leased', 'done', 'dead')
+
+class WorkQueue:
+    """
+    File de travail durable et partagée (SQLite) des fenêtres (action, date_from, date_to)
+    d'un rattrapage d'historique. Plusieurs processus, sur une machine ou sur plusieurs
+    machines partageant le stockage, y réservent des tâches sous bail :
+      - claim réserve atomiquement des tâches en attente ou dont le bail a expiré
+        (worker arrêté brutalement), pour lease_seconds secondes ;
+      - heartbeat prolonge les baux des tâches en cours ;
+      - complete est idempotent : une tâche terminée deux fois (bail repris pendant
+        que l'ancien worker finissait) ne compte qu'une fois ;
+      - fail remet la tâche en attente après un délai exponentiel (retry_delay, x2, x4...),
+        ou l'abandonne (dead) après max_attempts tentatives.
+    Les dates des baux sont des horodatages absolus : les horloges des machines doivent
+    être synchronisées. Sur un stockage réseau, wal=False (le mode WAL exige une mémoire
+    partagée locale).
+    """
+    def __init__(self, path='stock_data_queue.db', lease_seconds=120, max_attempts=4, retry_delay=2, wal=True):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._lock = threading.Lock()
+        # Transactions explicites : BEGIN IMMEDIATE prend le verrou d'écriture avant la lecture
+        self.conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)
+        self.conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "id INTEGER PRIMARY KEY, action TEXT NOT NULL, date_from TEXT NOT NULL, date_to TEXT NOT NULL, "
+            "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, "
+            "available_at REAL NOT NULL DEFAULT 0, worker TEXT, lease TEXT, lease_until REAL, "
+            "heartbeat_at REAL, rows INTEGER, error TEXT, reclaims INTEGER NOT NULL DEFAULT 0, done_at REAL, "
+            "UNIQUE (action, date_from, date_to))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, available_at)")
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.get('queue_file', 'stock_data_queue.db'),
+            lease_seconds=config.get('queue_lease_seconds', 120),
+            max_attempts=config.get('queue_max_attempts', int(config.get('retry_attempts', 3)) + 1),
+            retry_delay=float(config.get('retry_delay', 2)),
+            wal=not config.get('network_storage', False)
+        )
+
+    def transaction(self, sql_calls):
+        """Exécute sql_calls(conn) dans une transaction d'écriture ; renvoie son résultat"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = sql_calls(self.conn)
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+    def enqueue(self, windows):
+        """
+        Ajoute les fenêtres (action, date_from, date_to) au format AAAA-MM-JJ. Une fenêtre
+        déjà présente n'est pas dupliquée ; abandonnée (dead), elle est remise en attente.
+        Renvoie le nombre de tâches ajoutées ou remises en attente.
+        """
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT INTO tasks (action, date_from, date_to) VALUES (?, ?, ?) "
+                "ON CONFLICT (action, date_from, date_to) DO UPDATE SET "
+                "status = 'pending', attempts = 0, available_at = 0, error = NULL "
+                "WHERE tasks.status = 'dead'",
+                list(windows)
+            )
+            return conn.total_changes - before
+        return self.transaction(insert)
+
+    def claim(self, worker, limit=1, now=None):
+        """
+        Réserve jusqu'à limit tâches d'une même action (fenêtres consécutives), en attente
+        ou dont le bail a expiré. Les baux expirés d'une tâche ayant atteint max_attempts
+        l'abandonnent. Renvoie la liste des tâches réservées (vide si aucune n'est disponible).
+        """
+        now = time.time() if now is None else now
+        lease = uuid.uuid4().hex
+        claimable = "((status = 'pending' AND available_at <= ?) OR (status = 'leased' AND lease_until < ?))"
+
+        def reserve(conn):
+            conn.execute(
+                "UPDATE tasks SET status = 'dead', error = 'bail expiré (worker arrêté)', "
+                "lease = NULL WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            first = conn.execute(f"SELECT action FROM tasks WHERE {claimable} ORDER BY id LIMIT 1",
+                                 (now, now)).fetchone()
+            if first is None:
+                return []
+            rows = conn.execute(
+                f"SELECT id, action, date_from, date_to, attempts, CASE WHEN status = 'leased' THEN worker END "
+                f"FROM tasks WHERE action = ? AND {claimable} ORDER BY date_from LIMIT ?",
+                (first[0], now, now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease = ?, lease_until = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1, reclaims = reclaims + ? WHERE id = ?",
+                [(worker, lease, now + self.lease_seconds, now, int(row[5] is not None), row[0]) for row in rows]
+            )
+            return [Task(task_id, action, date_from, date_to, attempts + 1, lease, previous)
+                    for task_id, action, date_from, date_to, attempts, previous in rows]
+        return self.transaction(reserve)
+
+    def heartbeat(self, tasks, now=None):
+        """Prolonge les baux encore détenus ; renvoie le nombre de baux prolongés"""
+        now = time.time() if now is None else now
+
+        def extend(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "UPDATE tasks SET lease_until = ?, heartbeat_at = ? WHERE id = ? AND lease = ? AND status = 'leased'",
+                [(now + self.lease_seconds, now, task.id, task.lease) for task in tasks]
+            )
+            return conn.total_changes - before
+        return self.transaction(extend) if tasks else 0
+
+    def complete(self, task, rows=0, worker=None):
+        """Marque la tâche terminée ; renvoie False si elle l'était déjà (idempotent)"""
+        def finish(conn):
+            return conn.execute(
+                "UPDATE tasks SET status = 'done', rows = ?, worker = COALESCE(?, worker), lease = NULL, "
+                "lease_until = NULL, error = NULL, done_at = ? WHERE id = ? AND status != 'done'",
+                (rows, worker, time.time(), task.id)
+            ).rowcount == 1
+        return self.transaction(finish)
+
+    def fail(self, task, error, now=None):
+        """
+        Échec d'une tâche dont le worker détient encore le bail : nouvelle tentative après
+        un délai exponentiel, ou abandon au-delà de max_attempts. Renvoie le nouveau statut
+        (None si le bail a été perdu entre-temps).
+        """
+        now = time.time() if now is None else now
+        status = 'dead' if task.attempts >= self.max_attempts else 'pending'
+        available_at = now + self.retry_delay * 2 ** (task.attempts - 1)
+
+        def record(conn):
+            return conn.execute(
+                "UPDATE tasks SET status = ?, available_at = ?, error = ?, lease = NULL, lease_until = NULL "
+                "WHERE id = ? AND lease = ? AND status = 'leased'",
+                (status, available_at, str(error)[:200], task.id, task.lease)
+            ).rowcount == 1
+        return status if self.transaction(record) else None
+
+    def release(self, tasks):
+        """Rend des tâches non traitées (arrêt du worker) sans compter de tentative"""
+        def give_back(conn):
+            conn.executemany(
+                "UPDATE tasks SET status = 'pending', attempts = attempts - 1, lease = NULL, lease_until = NULL "
+                "WHERE id = ? AND lease = ? AND status = 'leased'",
+                [(task.id, task.lease) for task in tasks]
+            )
+        if tasks:
+            self.transaction(give_back)
+
+    def stats(self, now=None):
+        """Nombre de tâches par statut, baux expirés, reprises et workers actifs"""
+        now = time.time() if now is None else now
+        with self._lock:
+            counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+            expired, workers, reclaims = self.conn.execute(
+                "SELECT SUM(status = 'leased' AND lease_until < ?), "
+                "COUNT(DISTINCT CASE WHEN status = 'leased' AND lease_until >= ? THEN worker END), "
+                "SUM(reclaims) FROM tasks",
+                (now, now)
+            ).fetchone()
+        stats = {status: counts.get(status, 0) for status in STATUSES}
+        stats.update({'total': sum(counts.values()), 'expired': expired or 0,
+                      'active_workers': workers, 'reclaimed': reclaims or 0})
+        return stats
+
+    def drained(self):
+        """Vrai quand plus aucune tâche n'est en attente ni en cours"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT NOT EXISTS (SELECT 1 FROM tasks WHERE status IN ('pending', 'leased'))"
+            ).fetchone()[0] == 1
+
+    def done_by_worker(self):
+        with self._lock:
+            return dict(self.conn.execute(
+                "SELECT worker, COUNT(*) FROM tasks WHERE status = 'done' GROUP BY worker ORDER BY worker"
+            ).fetchall())
+
+    def done_windows(self):
+        """Fenêtres terminées (action, date_from, date_to)"""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT action, date_from, date_to FROM tasks WHERE status = 'done' ORDER BY action, date_from"
+            ).fetchall()
+
+    def dead_tasks(self):
+        """Tâches abandonnées, au format du registre des fenêtres en échec"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT action, date_from, date_to, attempts, error FROM tasks WHERE status = 'dead' "
+                "ORDER BY action, date_from"
+            ).fetchall()
+        return [{'action': action, 'from': date_from, 'to': date_to, 'attempts': attempts, 'error': error}
+                for action, date_from, date_to, attempts, error in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+class LeaseKeeper:
+    """
+    Battement de cœur d'un worker : prolonge toutes les lease_seconds / 3 secondes les baux
+    des tâches qu'il détient. Un worker arrêté brutalement cesse de les prolonger et ses
+    tâches sont reprises par les autres à l'expiration.
+    """
+    def __init__(self, queue, interval=None):
+        self.queue = queue
+        self.interval = interval or max(queue.lease_seconds / 3, 0.1)
+        self.tasks = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def hold(self, tasks):
+        with self._lock:
+            self.tasks.update((task.id, task) for task in tasks)
+
+    def drop(self, task):
+        with self._lock:
+            self.tasks.pop(task.id, None)
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                tasks = list(self.tasks.values())
+            try:
+                self.queue.heartbeat(tasks)
+            except sqlite3.Error:
+                # Base momentanément verrouillée : le prochain battement rattrapera
+                continue